@@ -0,0 +1,102 @@
+"""
+Adaptive Iteration Count
+
+Sequential stopping rules for the benchmark. Instead of a fixed -n, a
+model keeps getting iterations until the confidence interval on its mean
+iteration score is narrow enough, or until it clearly ranks above or below
+every model already benchmarked. A model that scores the same every time
+stops after a few iterations, and noisy models get the runs they need.
+"""
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist, mean, stdev
+from typing import List, Optional
+
+# Iterations before the first stopping check. Two identical scores say
+# little about the variance of a model.
+MIN_ITERATIONS = 3
+
+
+@dataclass
+class ConfidenceInterval:
+    """Two-sided confidence interval for a mean."""
+    mean: float
+    low: float
+    high: float
+
+    @property
+    def width(self) -> float:
+        return self.high - self.low
+
+    @property
+    def half_width(self) -> float:
+        return self.width / 2
+
+    def overlaps(self, other: "ConfidenceInterval") -> bool:
+        return self.low <= other.high and other.low <= self.high
+
+
+def t_critical(df: int, confidence: float = 0.95) -> float:
+    """
+    Two-sided critical value of Student's t distribution.
+
+    Exact for one and two degrees of freedom, and a Cornish-Fisher expansion
+    around the normal quantile above that (within 0.2% of the tabulated
+    95% values from df=3 on, which is plenty for a stopping rule).
+    """
+    if df < 1:
+        raise ValueError("t_critical needs at least one degree of freedom")
+    p = (1 + confidence) / 2
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        a = 2 * p - 1
+        return a * math.sqrt(2 / (1 - a * a))
+    z = NormalDist().inv_cdf(p)
+    return (
+        z
+        + (z ** 3 + z) / (4 * df)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3)
+        + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * df ** 4)
+    )
+
+
+def mean_confidence_interval(values: List[float], confidence: float = 0.95) -> Optional[ConfidenceInterval]:
+    """Student's t interval for the mean of values, or None for fewer than two."""
+    if len(values) < 2:
+        return None
+    center = mean(values)
+    half = t_critical(len(values) - 1, confidence) * stdev(values) / math.sqrt(len(values))
+    return ConfidenceInterval(mean=center, low=center - half, high=center + half)
+
+
+@dataclass
+class StoppingRule:
+    """When to stop giving a model more iterations."""
+    # Full width of the confidence interval to reach, in score points
+    target_width: float
+    max_iterations: int
+    min_iterations: int = MIN_ITERATIONS
+    confidence: float = 0.95
+
+    def check(self, scores: List[float], others: Optional[List[ConfidenceInterval]] = None) -> Optional[str]:
+        """
+        Return why the model can stop after these iteration scores, or None
+        to keep going.
+
+        `others` are the intervals of models already benchmarked. Once this
+        model's interval overlaps none of them, more iterations cannot
+        change where it ranks.
+        """
+        if len(scores) < self.min_iterations:
+            return None
+        interval = mean_confidence_interval(scores, self.confidence)
+        if interval is None:
+            return None
+        if interval.width <= self.target_width:
+            return f"confidence interval ±{interval.half_width:.2f} is within the target"
+        if others and not any(interval.overlaps(other) for other in others):
+            return "ranking against the other models is settled"
+        return None
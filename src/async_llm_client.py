@@ -0,0 +1,467 @@
+"""
+Async LM Studio API Client
+
+An asyncio counterpart of LMStudioClient for driving many concurrent
+requests from one process without a thread per request. It speaks
+HTTP/1.1 directly over asyncio streams, keeps a bounded pool of keep-alive
+connections and shares payload building, response parsing and the
+dataclasses with the synchronous client.
+"""
+
+import asyncio
+import json
+import ssl
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from lazy import lazy_import
+from llm_client import (
+    ChatStream,
+    CompletionResponse,
+    Message,
+    ModelsResponse,
+    Role,
+    _LMStudioClientBase,
+)
+
+requests = lazy_import("requests")
+
+
+class _Connection:
+    """One keep-alive HTTP connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _ConnectionPool:
+    """
+    Bounded pool of connections to one host.
+
+    At most `limit` connections exist at a time; further requests wait for
+    one to be released.
+    """
+
+    def __init__(self, host: str, port: int, ssl_context: Optional[ssl.SSLContext], limit: int):
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> _Connection:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if not conn.reader.at_eof() and not conn.writer.is_closing():
+                    conn.reused = True
+                    return conn
+                conn.close()
+            reader, writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl_context
+            )
+            return _Connection(reader, writer)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: _Connection, reusable: bool) -> None:
+        if reusable:
+            self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self) -> None:
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+
+class _AsyncResponse:
+    """An HTTP response whose body is read lazily from a pooled connection."""
+
+    def __init__(
+        self,
+        pool: _ConnectionPool,
+        conn: _Connection,
+        status_code: int,
+        reason: str,
+        headers: Dict[str, str],
+        timeout: float
+    ):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self._pool = pool
+        self._conn: Optional[_Connection] = conn
+        self._timeout = timeout
+        self._keep_alive = headers.get("connection", "").lower() != "close"
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    async def _read(self, coro):
+        return await asyncio.wait_for(coro, self._timeout)
+
+    async def iter_body(self) -> AsyncIterator[bytes]:
+        """Yield the body in pieces as they arrive, then release the connection."""
+        conn = self._conn
+        if conn is None:
+            return
+        reader = conn.reader
+        complete = False
+        try:
+            if self.headers.get("transfer-encoding", "").lower() == "chunked":
+                while True:
+                    size_line = await self._read(reader.readline())
+                    size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                    if size == 0:
+                        # Skip trailers up to the terminating blank line
+                        while (await self._read(reader.readline())).strip():
+                            pass
+                        break
+                    data = await self._read(reader.readexactly(size))
+                    await self._read(reader.readexactly(2))
+                    yield data
+            elif "content-length" in self.headers:
+                remaining = int(self.headers["content-length"])
+                while remaining > 0:
+                    data = await self._read(reader.read(min(remaining, 65536)))
+                    if not data:
+                        raise requests.RequestException("Connection closed before the response was complete")
+                    remaining -= len(data)
+                    yield data
+            else:
+                self._keep_alive = False
+                while True:
+                    data = await self._read(reader.read(65536))
+                    if not data:
+                        break
+                    yield data
+            complete = True
+        finally:
+            self._release(reusable=complete and self._keep_alive)
+
+    async def read(self) -> bytes:
+        """Read the whole body."""
+        return b"".join([piece async for piece in self.iter_body()])
+
+    async def iter_lines(self) -> AsyncIterator[bytes]:
+        """Yield body lines (without line endings) as they arrive."""
+        pending = b""
+        async for piece in self.iter_body():
+            pending += piece
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line.rstrip(b"\r")
+        if pending:
+            yield pending.rstrip(b"\r")
+
+    def _release(self, reusable: bool) -> None:
+        if self._conn is not None:
+            self._pool.release(self._conn, reusable)
+            self._conn = None
+
+    def close(self) -> None:
+        """Drop the connection without reading the rest of the body."""
+        self._release(reusable=False)
+
+
+class AsyncChatStream(ChatStream):
+    """
+    Async iterator over the content deltas of a streaming chat completion.
+
+    Same attributes as ChatStream; iterate it with `async for`.
+    """
+
+    def __iter__(self):
+        raise TypeError("AsyncChatStream must be iterated with 'async for'")
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        done = False
+        try:
+            async for raw_line in self.response.iter_lines():
+                # Read to the end of the body so the connection can be reused
+                if done:
+                    continue
+                delta = self._handle_line(raw_line)
+                if delta is None:
+                    done = True
+                elif delta:
+                    yield delta
+        except asyncio.TimeoutError:
+            raise requests.RequestException("LM Studio API request failed: read timed out")
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            raise requests.RequestException(f"LM Studio API request failed: {e}")
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid response format from LM Studio API: {e}")
+        finally:
+            self.close()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - close the connection."""
+        self.close()
+
+
+class AsyncLMStudioClient(_LMStudioClientBase):
+    """
+    Asyncio client for LM Studio's local API server.
+
+    Mirrors LMStudioClient: chat_completion, stream_chat_completion,
+    simple_chat and get_models, used as an async context manager. The
+    timeout applies to connecting and to each read from the server.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:1234/v1",
+        timeout: int = 30,
+        api_key: Optional[str] = None,
+        pool_size: int = 10
+    ):
+        """
+        Initialize the async LM Studio client.
+
+        Args:
+            base_url: Base URL for the LM Studio API server
+            timeout: Request timeout in seconds
+            api_key: Optional API key (usually not needed for local LM Studio)
+            pool_size: Maximum number of concurrent connections to the server;
+                requests beyond it wait for a free connection
+        """
+        super().__init__(base_url=base_url, timeout=timeout, api_key=api_key)
+        parts = urlsplit(self.base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {self.base_url}")
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._path = parts.path
+        self._host_header = parts.netloc
+        self._pool_size = pool_size
+        self._ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self._pool: Optional[_ConnectionPool] = None
+
+    def _get_pool(self) -> _ConnectionPool:
+        # Created lazily so the semaphore binds to the running event loop
+        if self._pool is None:
+            self._pool = _ConnectionPool(self._host, self._port, self._ssl, self._pool_size)
+        return self._pool
+
+    async def _request(self, method: str, endpoint: str, payload: Optional[Dict[str, Any]] = None) -> _AsyncResponse:
+        """Send a request and return once the status line and headers have arrived."""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = [
+            f"{method} {self._path}{endpoint} HTTP/1.1",
+            f"Host: {self._host_header}",
+            "Accept: */*",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+        if self.api_key:
+            head.append(f"Authorization: Bearer {self.api_key}")
+        request_bytes = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        pool = self._get_pool()
+        # A reused keep-alive connection may have been closed by the server
+        # while idle; retry such a request once on a fresh connection.
+        for attempt in range(2):
+            conn = await asyncio.wait_for(pool.acquire(), self.timeout)
+            try:
+                conn.writer.write(request_bytes)
+                await asyncio.wait_for(conn.writer.drain(), self.timeout)
+                status_code, reason, headers = await asyncio.wait_for(
+                    self._read_head(conn.reader), self.timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pool.release(conn, reusable=False)
+                if conn.reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                pool.release(conn, reusable=False)
+                raise
+            return _AsyncResponse(pool, conn, status_code, reason, headers, self.timeout)
+        raise AssertionError("unreachable")
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> Tuple[int, str, Dict[str, str]]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        _, status, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readuntil(b"\n")
+            if line in (b"\r\n", b"\n"):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return int(status), reason[0] if reason else "", headers
+
+    async def _send(self, method: str, endpoint: str, payload: Optional[Dict[str, Any]] = None) -> _AsyncResponse:
+        """_request with connection errors and timeouts reported like LMStudioClient does."""
+        url = f"{self.base_url}{endpoint}"
+        try:
+            response = await self._request(method, endpoint, payload)
+        except asyncio.TimeoutError:
+            raise requests.RequestException(f"LM Studio API request failed: timed out for url: {url}")
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            raise requests.RequestException(f"LM Studio API request failed: {e}")
+        if not response.ok:
+            body = await self._read_body(response, url)
+            # The response carries status_code like a requests.Response, so
+            # callers can tell client errors from server errors
+            raise requests.RequestException(
+                self._format_error(response.status_code, response.reason, url, body.decode("utf-8", "replace")),
+                response=response
+            )
+        return response
+
+    async def _read_body(self, response: _AsyncResponse, url: str) -> bytes:
+        try:
+            return await response.read()
+        except asyncio.TimeoutError:
+            raise requests.RequestException(f"LM Studio API request failed: timed out for url: {url}")
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            raise requests.RequestException(f"LM Studio API request failed: {e}")
+
+    async def chat_completion(
+        self,
+        messages: List[Message],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_p: float = 1.0,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stream: bool = False,
+        stop: Optional[Union[str, List[str]]] = None,
+        n: int = 1
+    ) -> CompletionResponse:
+        """
+        Create a chat completion; see LMStudioClient.chat_completion.
+
+        Raises:
+            requests.RequestException: If the API request fails
+            ValueError: If the response format is invalid, or n > 1 with stream
+        """
+        if stream and n > 1:
+            raise ValueError("Several choices (n > 1) cannot be streamed")
+        sampling = dict(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+            frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty,
+            stop=stop
+        )
+        if stream:
+            chat_stream = await self.stream_chat_completion(messages, **sampling)
+            async with chat_stream:
+                async for _ in chat_stream:
+                    pass
+            return chat_stream.to_response()
+
+        payload = self._build_payload(messages, stream=False, n=n, **sampling)
+        url = f"{self.base_url}/chat/completions"
+        response = await self._send("POST", "/chat/completions", payload)
+        body = await self._read_body(response, url)
+        try:
+            return self._parse_completion_response(json.loads(body))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid response format from LM Studio API: {e}")
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Message],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_p: float = 1.0,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stop: Optional[Union[str, List[str]]] = None
+    ) -> AsyncChatStream:
+        """
+        Create a streaming chat completion; see LMStudioClient.stream_chat_completion.
+
+        Raises:
+            requests.RequestException: If the API request fails
+        """
+        payload = self._build_payload(
+            messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+            frequency_penalty=frequency_penalty,
+            presence_penalty=presence_penalty,
+            stream=True,
+            stop=stop
+        )
+        start_time = time.perf_counter()
+        response = await self._send("POST", "/chat/completions", payload)
+        return AsyncChatStream(response, start_time)
+
+    async def get_models(self) -> ModelsResponse:
+        """
+        Get list of available models from LM Studio.
+
+        Raises:
+            requests.RequestException: If the API request fails
+            ValueError: If the response format is invalid
+        """
+        url = f"{self.base_url}/models"
+        response = await self._send("GET", "/models")
+        body = await self._read_body(response, url)
+        try:
+            return self._parse_models_response(json.loads(body))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid response format from LM Studio API: {e}")
+
+    async def simple_chat(
+        self,
+        user_message: str,
+        system_message: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """Simple convenience method for single-turn chat; see LMStudioClient.simple_chat."""
+        messages = []
+
+        if system_message:
+            messages.append(Message(role=Role.SYSTEM, content=system_message))
+
+        messages.append(Message(role=Role.USER, content=user_message))
+
+        response = await self.chat_completion(messages, **kwargs)
+
+        if response.choices:
+            return response.choices[0].message.content
+        else:
+            return ""
+
+    async def close(self) -> None:
+        """Close all idle pooled connections."""
+        if self._pool is not None:
+            self._pool.close()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - close pooled connections."""
+        await self.close()
@@ -0,0 +1,300 @@
+"""
+Endpoint Load Balancing
+
+Spreads benchmark requests over several LM Studio servers. Every endpoint
+has a weight, and each request goes to the endpoint with the fewest
+requests in flight for its weight, among those that serve the model. When
+an endpoint cannot be reached, times out or answers with a server error,
+it is left out of rotation for a while and the request is sent to another
+one.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+
+from lazy import lazy_import
+from llm_client import ChatStream, CompletionResponse, LMStudioClient, Message, ModelInfo, ModelsResponse
+from transport import AUTO
+
+if TYPE_CHECKING:
+    # metrics.py loads http.server, which only a --metrics-port run needs
+    from metrics import BenchmarkMetrics
+
+requests = lazy_import("requests")
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://localhost:1234/v1"
+
+# Seconds a failing endpoint is left out of rotation
+FAILURE_COOLDOWN = 30.0
+
+
+@dataclass
+class EndpointSpec:
+    """A server base URL and its share of the requests."""
+    base_url: str
+    weight: float = 1.0
+
+
+def parse_endpoint_spec(spec: str) -> EndpointSpec:
+    """
+    Parse a command line endpoint spec of the form URL or URL=WEIGHT.
+
+    Args:
+        spec: Endpoint spec, e.g. "http://gpu2:1234/v1=2"
+
+    Returns:
+        EndpointSpec for the spec
+
+    Raises:
+        ValueError: If the weight is not a positive number
+    """
+    base_url, sep, weight = spec.rpartition('=')
+    if not sep:
+        return EndpointSpec(base_url=spec)
+    if not base_url:
+        raise ValueError(f"Missing base URL in endpoint spec: {spec!r}")
+    try:
+        value = float(weight)
+    except ValueError:
+        raise ValueError(f"Invalid weight in endpoint spec: {spec!r}")
+    if not value > 0:
+        raise ValueError(f"Weight must be positive in endpoint spec: {spec!r}")
+    return EndpointSpec(base_url=base_url, weight=value)
+
+
+def is_endpoint_failure(error: "requests.RequestException") -> bool:
+    """
+    Whether a failed request says something about the endpoint rather than
+    the request: no response at all (refused, reset, timed out) or a 5xx.
+    A 4xx would fail the same way everywhere, so it is not retried.
+    """
+    response = getattr(error, "response", None)
+    return response is None or response.status_code >= 500
+
+
+class Endpoint:
+    """One server of the pool, with its client and dispatch counters."""
+
+    def __init__(self, spec: EndpointSpec, client: LMStudioClient):
+        self.base_url = spec.base_url
+        self.weight = spec.weight
+        self.client = client
+        # Model ids reported by the health check; None until it has run
+        self.models: Optional[Set[str]] = None
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def serves(self, model: Optional[str]) -> bool:
+        return model is None or self.models is None or model in self.models
+
+    @property
+    def load(self) -> float:
+        """Requests in flight, counting the next one, per unit of weight."""
+        return (self.outstanding + 1) / self.weight
+
+
+class EndpointPool:
+    """
+    Drop-in replacement for LMStudioClient that sends each request to one
+    of several servers.
+
+    Only chat completions and model listing are dispatched. A request is
+    tried at most once per endpoint; when every endpoint has failed it, the
+    last error is raised. Failover happens before a stream starts, never
+    in the middle of one.
+    """
+
+    def __init__(
+        self,
+        specs: List[EndpointSpec],
+        timeout: int = 30,
+        api_key: Optional[str] = None,
+        pool_size: int = 10,
+        cooldown: float = FAILURE_COOLDOWN,
+        metrics: Optional["BenchmarkMetrics"] = None,
+        transport: str = AUTO
+    ):
+        if not specs:
+            raise ValueError("EndpointPool needs at least one endpoint")
+        self.endpoints = [
+            Endpoint(spec, LMStudioClient(
+                base_url=spec.base_url, timeout=timeout, api_key=api_key, pool_size=pool_size, transport=transport
+            ))
+            for spec in specs
+        ]
+        self.cooldown = cooldown
+        # Live request metrics, updated as requests start and finish
+        self.metrics = metrics
+        self._lock = threading.Lock()
+
+    def check_health(self, models: List[str]) -> None:
+        """
+        Ask every endpoint which models it serves. Endpoints that do not
+        answer get no requests.
+
+        Raises:
+            ValueError: If one of the models is served by no endpoint
+        """
+        for endpoint in self.endpoints:
+            try:
+                endpoint.models = {m.id for m in endpoint.client.get_models().data}
+            except (requests.RequestException, ValueError) as e:
+                endpoint.models = set()
+                log.warning(f"Endpoint {endpoint.base_url} is unavailable: {e}")
+                continue
+            missing = [model for model in models if model not in endpoint.models]
+            status = f"missing {', '.join(missing)}" if missing else "ok"
+            log.info(f"Endpoint {endpoint.base_url} (weight {endpoint.weight:g}): {status}")
+        for model in models:
+            if not any(endpoint.serves(model) for endpoint in self.endpoints):
+                raise ValueError(f"Model {model} is not available on any endpoint")
+
+    def _candidates(self, model: Optional[str], tried: List[Endpoint]) -> List[Endpoint]:
+        """The endpoints serving the model that a request has not tried yet."""
+        return [e for e in self.endpoints if e not in tried and e.serves(model)]
+
+    def _acquire(self, model: Optional[str], tried: List[Endpoint]) -> Optional[Endpoint]:
+        """Pick the least loaded endpoint for a request and count it as in flight."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = self._candidates(model, tried)
+            # With every candidate cooling down, try them anyway rather than fail
+            up = [e for e in candidates if e.down_until <= now] or candidates
+            if not up:
+                return None
+            endpoint = min(up, key=lambda e: (e.load, e.requests / e.weight))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _release(self, endpoint: Endpoint, failed: bool = False) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.failures += 1
+                endpoint.down_until = time.monotonic() + self.cooldown
+
+    def _finish(
+        self,
+        endpoint: Endpoint,
+        model: Optional[str],
+        start: float,
+        error: Optional[BaseException] = None
+    ) -> bool:
+        """
+        Release an endpoint after a request and record the request's
+        metrics. Returns whether the error is the endpoint's fault.
+        """
+        # Checked for None first, so successful requests never load requests
+        endpoint_failed = (
+            error is not None and isinstance(error, requests.RequestException) and is_endpoint_failure(error)
+        )
+        self._release(endpoint, endpoint_failed)
+        if self.metrics is not None:
+            self.metrics.request_finished(model, endpoint.base_url, time.perf_counter() - start, error is not None)
+        return endpoint_failed
+
+    def _dispatch(self, model: Optional[str], send: Callable[[Endpoint], Any], release_on_success: bool = True) -> Any:
+        tried: List[Endpoint] = []
+        while True:
+            endpoint = self._acquire(model, tried)
+            if endpoint is None:
+                raise requests.RequestException(f"No endpoint available for model {model}")
+            tried.append(endpoint)
+            start = time.perf_counter()
+            if self.metrics is not None:
+                self.metrics.request_started(model, endpoint.base_url)
+            try:
+                result = send(endpoint)
+            except requests.RequestException as e:
+                if not self._finish(endpoint, model, start, e):
+                    raise
+                # Only endpoints that were not tried yet can take the request over
+                if not self._candidates(model, tried):
+                    log.warning(f"Endpoint {endpoint.base_url} failed: {e}")
+                    raise
+                log.warning(f"Endpoint {endpoint.base_url} failed, trying another: {e}")
+                continue
+            except BaseException as e:
+                self._finish(endpoint, model, start, e)
+                raise
+            if release_on_success:
+                self._finish(endpoint, model, start)
+            return endpoint, result, start
+
+    def chat_completion(self, messages: List[Message], model: Optional[str] = None, **kwargs) -> CompletionResponse:
+        """LMStudioClient.chat_completion on the least loaded endpoint."""
+        _, response, _ = self._dispatch(model, lambda e: e.client.chat_completion(messages, model=model, **kwargs))
+        return response
+
+    def stream_chat_completion(self, messages: List[Message], model: Optional[str] = None, **kwargs) -> ChatStream:
+        """
+        LMStudioClient.stream_chat_completion on the least loaded endpoint.
+        The endpoint counts the request as in flight until the stream is
+        closed, and as failed if the stream broke off with an error.
+        """
+        endpoint, chat_stream, start = self._dispatch(
+            model, lambda e: e.client.stream_chat_completion(messages, model=model, **kwargs),
+            release_on_success=False
+        )
+        chat_stream.on_close = lambda: self._finish(endpoint, model, start, chat_stream.error)
+        return chat_stream
+
+    def get_models(self) -> ModelsResponse:
+        """
+        The models of every endpoint that answers, in endpoint order.
+
+        Raises:
+            requests.RequestException: If no endpoint answers
+        """
+        seen: Dict[str, ModelInfo] = {}
+        error = None
+        answered = False
+        for endpoint in self.endpoints:
+            try:
+                response = endpoint.client.get_models()
+            except requests.RequestException as e:
+                error = e
+                log.warning(f"Endpoint {endpoint.base_url} is unavailable: {e}")
+                continue
+            answered = True
+            for model in response.data:
+                seen.setdefault(model.id, model)
+        if not answered:
+            raise error
+        return ModelsResponse(object="list", data=list(seen.values()))
+
+    def get_loaded_models(self) -> List[str]:
+        """The models loaded on any endpoint, in endpoint order (see LMStudioClient.get_loaded_models)."""
+        loaded: List[str] = []
+        for endpoint in self.endpoints:
+            loaded.extend(m for m in endpoint.client.get_loaded_models() if m not in loaded)
+        return loaded
+
+    def report(self) -> None:
+        """Log how the requests were spread over the endpoints."""
+        log.info("ENDPOINTS:")
+        for endpoint in self.endpoints:
+            log.info(
+                f"  {endpoint.base_url} (weight {endpoint.weight:g}): "
+                f"{endpoint.requests} requests, {endpoint.failures} failed"
+            )
+
+    def close(self) -> None:
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - close every endpoint's client."""
+        self.close()
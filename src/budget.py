@@ -0,0 +1,74 @@
+"""
+Generation Budget
+
+Caps how much a model may generate per request. Without a cap, a small
+model stuck in a loop keeps generating until the request times out, which
+holds up the server and loses the iteration. The cap is opt-in, since it
+changes what is measured: it is either fixed, or derived from the length of
+the answers a request asks for, plus an allowance for any reasoning the
+model writes before them.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from evaluator import AnswerKey
+from prompts import PromptRequest
+
+# Tokens allowed on top of the answer block, for reasoning and preamble
+DEFAULT_REASONING_TOKENS = 4096
+
+# Tokenizers average about 4 characters per token on English text; 3 keeps
+# the estimate on the generous side for names, numbers and punctuation
+CHARS_PER_TOKEN = 3
+
+# Room for answers that come back longer than the answer key's
+ANSWER_HEADROOM = 2
+
+# The finish reason of a completion cut off at max_tokens
+TRUNCATED_FINISH_REASON = "length"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough upper estimate of the token count of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class GenerationBudget:
+    """Limits on the output of every benchmark request."""
+    # Fixed max_tokens; None derives it from the answers, 0 sets no limit
+    max_tokens: Optional[int] = 0
+    reasoning_tokens: int = DEFAULT_REASONING_TOKENS
+    stop: List[str] = field(default_factory=list)
+
+    def answer_tokens(self, prompt_requests: List[PromptRequest], answer_key: AnswerKey) -> int:
+        """Tokens for the longest answer block any of the requests asks for."""
+        longest = 0
+        for request in prompt_requests:
+            start = request.first_question - 1
+            lines = answer_key.lines[start:start + request.question_count]
+            longest = max(longest, estimate_tokens("\n".join(lines)))
+        return longest * ANSWER_HEADROOM
+
+    def limit(self, prompt_requests: List[PromptRequest], answer_key: AnswerKey) -> Optional[int]:
+        """max_tokens for the requests of a suite, or None for no limit."""
+        if self.max_tokens is not None:
+            return self.max_tokens or None
+        return self.answer_tokens(prompt_requests, answer_key) + self.reasoning_tokens
+
+    def sampling(
+        self,
+        base: Dict[str, Any],
+        prompt_requests: List[PromptRequest],
+        answer_key: AnswerKey
+    ) -> Dict[str, Any]:
+        """The base sampling parameters with this budget's limits added."""
+        sampling = dict(base)
+        limit = self.limit(prompt_requests, answer_key)
+        if limit:
+            sampling["max_tokens"] = limit
+        if self.stop:
+            sampling["stop"] = list(self.stop)
+        return sampling
@@ -0,0 +1,143 @@
+"""
+Bulk Evaluator
+
+Scores whole directories of saved model outputs in one process pool,
+instead of starting one evaluator.py interpreter per file.
+"""
+
+import csv
+import glob
+import json
+import os
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import List, Optional
+
+from evaluator import AnswerKey, read_chunks, score_text
+
+
+@dataclass
+class FileScore:
+    """Evaluation result for one saved output file."""
+    path: str
+    scores: List[float] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return Path(self.path).stem
+
+    @property
+    def score(self) -> float:
+        """Average score over every question of the key, as evaluator.py reports it."""
+        return sum(self.scores) / len(self.scores) if self.scores else 0.0
+
+
+@dataclass
+class QuestionAccuracy:
+    """Aggregate result for one question across all files."""
+    question: str
+    evaluated: int
+    correct: int
+    mean_score: float
+
+    @property
+    def accuracy(self) -> float:
+        return 100.0 * self.correct / self.evaluated if self.evaluated else 0.0
+
+
+def collect_files(target: str) -> List[str]:
+    """
+    Resolve a directory or glob pattern to a sorted list of files.
+
+    A directory is searched recursively; hidden files are skipped.
+    """
+    if os.path.isdir(target):
+        paths = [
+            str(p) for p in Path(target).rglob("*")
+            if p.is_file() and not p.name.startswith('.')
+        ]
+    else:
+        paths = [p for p in glob.glob(target, recursive=True) if os.path.isfile(p)]
+    return sorted(paths)
+
+
+def score_file(path: str, key: AnswerKey) -> FileScore:
+    """Score one saved output file; read errors are recorded, not raised."""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            scores = score_text(read_chunks(f), key, verbose=False)
+    except OSError as e:
+        return FileScore(path=path, error=str(e))
+    return FileScore(path=path, scores=scores)
+
+
+def evaluate_files(paths: List[str], key: AnswerKey, workers: Optional[int] = None) -> List[FileScore]:
+    """
+    Score files across a process pool.
+
+    Returns:
+        FileScores sorted by score (best first), then by path
+    """
+    if not paths:
+        return []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) == 1:
+        results = [score_file(p, key) for p in paths]
+    else:
+        # Scoring a file is cheap, so hand each worker many files per task
+        chunksize = max(1, len(paths) // (workers * 4))
+        # Imported here: multiprocessing is heavy and most commands never score files
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(partial(score_file, key=key), paths, chunksize=chunksize))
+    return sorted(results, key=lambda r: (-r.score, r.path))
+
+
+def question_accuracy(results: List[FileScore], key: AnswerKey) -> List[QuestionAccuracy]:
+    """Compute per-question accuracy over all successfully scored files."""
+    accuracies = []
+    for i, question in enumerate(key.questions):
+        scores = [r.scores[i] for r in results if r.error is None and len(r.scores) > i]
+        accuracies.append(QuestionAccuracy(
+            question=question,
+            evaluated=len(scores),
+            correct=sum(1 for s in scores if s == 100.0),
+            mean_score=sum(scores) / len(scores) if scores else 0.0
+        ))
+    return accuracies
+
+
+def write_csv(results: List[FileScore], path: Path, key: AnswerKey) -> None:
+    """Write one row per file with its overall and per-question scores."""
+    questions = key.questions
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "score", *questions, "error"])
+        for r in results:
+            per_question = [f"{s:.2f}" for s in r.scores]
+            per_question += [""] * (len(questions) - len(per_question))
+            writer.writerow([r.path, f"{r.score:.2f}", *per_question, r.error or ""])
+
+
+def write_json(results: List[FileScore], accuracies: List[QuestionAccuracy], path: Path) -> None:
+    """Write file scores and per-question accuracy as a single JSON document."""
+    data = {
+        "files": [
+            {"path": r.path, "score": r.score, "scores": r.scores, "error": r.error}
+            for r in results
+        ],
+        "questions": [
+            {
+                "question": a.question,
+                "evaluated": a.evaluated,
+                "correct": a.correct,
+                "accuracy": a.accuracy,
+                "mean_score": a.mean_score,
+            }
+            for a in accuracies
+        ],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
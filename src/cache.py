@@ -0,0 +1,179 @@
+"""
+Response Cache
+
+A content-addressed on-disk cache of raw model completions. Entries are
+keyed by model, a hash of the prompt, the sampling parameters and the
+sample index, so re-running a benchmark after changing only the scorer
+does not pay for inference again.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from llm_client import CompletionUsage
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "ai-test-evaluator" / "responses"
+
+
+class CacheMode(Enum):
+    """How the benchmark uses the response cache."""
+    OFF = "off"
+    READ = "read"
+    WRITE = "write"
+    READWRITE = "readwrite"
+
+    @property
+    def readable(self) -> bool:
+        return self in (CacheMode.READ, CacheMode.READWRITE)
+
+    @property
+    def writable(self) -> bool:
+        return self in (CacheMode.WRITE, CacheMode.READWRITE)
+
+
+@dataclass
+class CachedResponse:
+    """A completion stored in the cache."""
+    content: str
+    usage: Optional[CompletionUsage]
+    created: float
+
+
+def prompt_hash(prompt: str) -> str:
+    """Return the SHA-256 hex digest of a prompt."""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+def cache_key(model: str, prompt_digest: str, params: Dict[str, Any], sample: int) -> str:
+    """Build the cache key for one sample of a model/prompt/params combination."""
+    key_data = {
+        "model": model,
+        "prompt": prompt_digest,
+        "params": params,
+        "sample": sample,
+    }
+    encoded = json.dumps(key_data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of completions, one JSON file per entry.
+
+    Files are sharded into subdirectories by the first two characters of the
+    key and written atomically, so concurrent benchmark workers can share a
+    cache. Reading an entry refreshes its modification time; evict() removes
+    entries not used for max_age and then the least recently used entries
+    until the cache fits in max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = 500 * 1024 * 1024,
+        max_age: float = 30 * 24 * 3600
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory holding the cache entries
+            max_bytes: Maximum total size of all entries in bytes
+            max_age: Seconds an entry may go unused before it is evicted
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Corrupt or unreadable entry; treat as a miss
+            return None
+
+        try:
+            usage_data = data.get("usage")
+            cached = CachedResponse(
+                content=data["content"],
+                usage=CompletionUsage(**usage_data) if usage_data else None,
+                created=data["created"]
+            )
+        except (AttributeError, KeyError, TypeError):
+            # Valid JSON but not an entry of this format; treat as a miss
+            return None
+
+        # Refresh the access time used for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return cached
+
+    def put(self, key: str, content: str, usage: Optional[CompletionUsage] = None) -> None:
+        """Store a response under key, replacing any existing entry."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "content": content,
+            "usage": asdict(usage) if usage else None,
+            "created": time.time(),
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def evict(self) -> int:
+        """
+        Remove stale entries and trim the cache to max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.directory.exists():
+            return 0
+
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        # Oldest access first
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
@@ -6,14 +6,49 @@ A command-line interface for the AI Test Evaluator tool.
 """
 
 import argparse
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
+from datetime import datetime
 from pathlib import Path
+import os
+import socket
 import sys
-from typing import Optional
-from llm_client import LMStudioClient, Message, Role
-from evaluator import match_line, GOLD
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from llm_client import CompletionUsage, LMStudioClient, Message, Role
+from budget import DEFAULT_REASONING_TOKENS, TRUNCATED_FINISH_REASON, GenerationBudget
+from balancer import DEFAULT_BASE_URL, EndpointPool, EndpointSpec, parse_endpoint_spec
+from evaluator import ANSWER_RE, AnswerExtractor, AnswerKey
+from cache import DEFAULT_CACHE_DIR, CacheMode, ResponseCache, cache_key, prompt_hash
+from prompts import PromptLayout, PromptRequest, build_requests, extract_question_answer
+from telemetry import RequestMetrics, TelemetryWriter, summarize
+from profiling import EVALUATOR, profiled, span
+from transport import AUTO, TRANSPORTS
+from scheduler import ModelRun, count_model_swaps, parse_model_spec, schedule_models
+from adaptive import MIN_ITERATIONS, ConfidenceInterval, StoppingRule, mean_confidence_interval
+from store import DEFAULT_STORE_PATH, ResultsStore, StoreFilter, StoredIteration
+from suites import DEFAULT_SUITE, SUITES_DIR, Suite, SuiteRegistry, default_registry
+from sweep import SweepPoint, format_max_tokens, parse_max_tokens, sweep_grid
+from jobqueue import DEFAULT_COORDINATOR_PORT, DEFAULT_LEASE, Job, JobQueue, PlanStatus, PlanSuite
 
-CUR_DIR = Path(__file__).resolve().parent
+if TYPE_CHECKING:
+    from metrics import BenchmarkMetrics
+
+# bulk (multiprocessing), metrics and coordinator (http.server) are
+# imported by the commands that use them, to keep them out of startup
+
+# Sampling parameters sent with every benchmark request
+DEFAULT_SAMPLING: Dict[str, Any] = {"temperature": 0.1}
+
+# The first warm-up request: short enough that its latency is mostly the
+# time LM Studio takes to load the model
+WARMUP_MESSAGES = [Message(role=Role.USER, content="Reply with OK.")]
+# Loading a large model can take minutes
+WARMUP_TIMEOUT = 600
 
 # setting logging with a format
 logging.basicConfig(
@@ -53,125 +88,1585 @@ def list_models(base_url: Optional[str] = None) -> None:
         sys.exit(1)
 
 
-def run_benchmark(model: str, base_url: Optional[str] = None, iterations: int = 1) -> None:
-    """Run benchmark evaluation using the specified model."""
+@dataclass
+class IterationResult:
+    """Outcome of a single benchmark iteration."""
+    iteration: int
+    answer_lines: List[str]
+    scores: List[float]
+    elapsed: float
+    time_to_first_token: Optional[float] = None
+    stopped_early: bool = False
+    cached: bool = False
+    truncated: bool = False
+    metrics: Optional[RequestMetrics] = None
+    response: str = ""
+    error: Optional[str] = None
+
+    @property
+    def score(self) -> float:
+        """Average score over all questions of this iteration."""
+        return sum(self.scores) / len(self.scores) if self.scores else 0.0
+
+    @property
+    def correct(self) -> int:
+        """Number of questions answered exactly right."""
+        return sum(1 for s in self.scores if s == 100.0)
+
+
+def extract_answer_lines(response_content: str, count: int) -> List[str]:
+    """
+    Extract the last `count` answer lines from a model response, padded
+    with empty strings. Reasoning blocks are skipped (see AnswerExtractor).
+    """
+    extractor = AnswerExtractor(count)
+    extractor.feed(response_content)
+    extractor.finish()
+    answer_lines = list(extractor.answers)
+
+    log.debug(f"Answer lines are:\n{answer_lines}")
+
+    if len(answer_lines) < count:
+        log.warning(f"Only found {len(answer_lines)} answers, expected {count}")
+        # Pad with empty strings if needed
+        answer_lines.extend([""] * (count - len(answer_lines)))
+    return answer_lines
+
+
+class AnswerBlockTracker(AnswerExtractor):
+    """
+    Follows streamed text and detects when a complete block of `expected`
+    consecutive answers, e.g. Q1..Q16, has been received. Answers drafted
+    inside a reasoning block do not count.
+    """
+
+    def __init__(self, expected: int, first_question: int = 1):
+        super().__init__(expected)
+        self.expected = expected
+        self.first_question = first_question
+        self.complete = False
+        self._next_question = first_question
+
+    def feed(self, delta: str) -> bool:
+        """Add a streamed delta; return True once the answer block is complete."""
+        super().feed(delta)
+        return self.complete
+
+    def _add_answer(self, line: str) -> None:
+        super()._add_answer(line)
+        number = int(ANSWER_RE.match(line).group(1))
+        if number == self.first_question:
+            self._next_question = number + 1
+        elif number == self._next_question:
+            self._next_question += 1
+        else:
+            # Out of sequence; wait for the block to start again
+            self._next_question = self.first_question
+        if self._next_question >= self.first_question + self.expected:
+            self.complete = True
+
+    def _reset(self) -> None:
+        super()._reset()
+        self._next_question = self.first_question
+
+
+@dataclass
+class FetchedResponse:
+    """Raw model output for one iteration, before scoring."""
+    content: str
+    usage: Optional[CompletionUsage] = None
+    time_to_first_token: Optional[float] = None
+    stopped_early: bool = False
+    cached: bool = False
+    # Cut off at max_tokens
+    truncated: bool = False
+
+
+def stream_response(
+    client: LMStudioClient,
+    model: str,
+    request: PromptRequest,
+    sampling: Dict[str, Any]
+) -> FetchedResponse:
+    """
+    Stream a completion, closing the connection as soon as all the answers
+    the request asks for have been seen.
+    """
+    tracker = AnswerBlockTracker(request.question_count, request.first_question)
+    stopped_early = False
+    with client.stream_chat_completion(request.messages, model=model, **sampling) as chat_stream:
+        with span("stream_read", "client", model=model):
+            for delta in chat_stream:
+                if tracker.feed(delta):
+                    stopped_early = True
+                    break
+    return FetchedResponse(
+        content=chat_stream.content,
+        usage=chat_stream.usage,
+        time_to_first_token=chat_stream.time_to_first_token,
+        stopped_early=stopped_early,
+        truncated=chat_stream.finish_reason == TRUNCATED_FINISH_REASON
+    )
+
+
+def fetch_response(
+    client: LMStudioClient,
+    model: str,
+    request: PromptRequest,
+    sampling: Dict[str, Any],
+    stream: bool = False
+) -> FetchedResponse:
+    """Get one completion for a request from the server."""
+    if stream:
+        return stream_response(client, model, request, sampling)
+
+    response = client.chat_completion(request.messages, model=model, **sampling)
+    if not response.choices:
+        return FetchedResponse(content="", usage=response.usage)
+    choice = response.choices[0]
+    return FetchedResponse(
+        content=choice.message.content,
+        usage=response.usage,
+        truncated=choice.finish_reason == TRUNCATED_FINISH_REASON
+    )
+
+
+def combine_responses(parts: List[FetchedResponse], prompt_requests: List[PromptRequest]) -> FetchedResponse:
+    """
+    Join the responses to the requests of one iteration into a single
+    answer block, keeping the answer line of each response.
+    """
+    content = '\n'.join(
+        extract_question_answer(part.content, request.first_question)
+        for part, request in zip(parts, prompt_requests)
+    )
+    usage = None
+    if all(part.usage for part in parts):
+        prompt_tokens = [part.usage.prompt_tokens for part in parts]
+        usage = CompletionUsage(
+            prompt_tokens=None if None in prompt_tokens else sum(prompt_tokens),
+            completion_tokens=sum(part.usage.completion_tokens for part in parts),
+            total_tokens=sum(part.usage.total_tokens for part in parts)
+        )
+    ttfts = [part.time_to_first_token for part in parts if part.time_to_first_token is not None]
+    if len(ttfts) > 1:
+        log.info(
+            f"Time to first token: {ttfts[0]:.2f}s for the first question, "
+            f"{sum(ttfts[1:]) / len(ttfts[1:]):.2f}s on average for the rest"
+        )
+    return FetchedResponse(
+        content=content,
+        usage=usage,
+        time_to_first_token=parts[0].time_to_first_token,
+        stopped_early=all(part.stopped_early for part in parts),
+        truncated=any(part.truncated for part in parts)
+    )
+
+
+def fetch_iteration(
+    client: LMStudioClient,
+    model: str,
+    prompt_requests: List[PromptRequest],
+    sampling: Dict[str, Any],
+    stream: bool = False
+) -> FetchedResponse:
+    """
+    Send the requests of one iteration in order and combine their output.
+
+    With one request per question, the answer line of each response is
+    kept and the lines are joined into a single answer block. The requests
+    run one after another so that the first one fills the server's prefix
+    cache for the rest.
+    """
+    if len(prompt_requests) == 1:
+        return fetch_response(client, model, prompt_requests[0], sampling, stream)
+
+    parts = [fetch_response(client, model, r, sampling, stream) for r in prompt_requests]
+    return combine_responses(parts, prompt_requests)
+
+
+def fetch_choices(
+    client: LMStudioClient,
+    model: str,
+    request: PromptRequest,
+    sampling: Dict[str, Any],
+    count: int
+) -> List[FetchedResponse]:
+    """
+    Get `count` completions of one request, asking for all of them in a
+    single call with the n parameter, so the prompt is prefilled once.
+
+    Servers without n return one choice per call; the missing choices are
+    asked for again until there are enough. The prompt tokens of a call
+    are counted on its first choice only (the others get None) and the
+    completion tokens are shared out evenly, since usage only covers the
+    call as a whole.
+    """
+    choices: List[FetchedResponse] = []
+    while len(choices) < count:
+        wanted = count - len(choices)
+        response = client.chat_completion(request.messages, model=model, n=wanted, **sampling)
+        if not response.choices:
+            raise ValueError("Chat completion returned no choices")
+        returned = response.choices[:wanted]
+        if len(returned) < wanted:
+            log.debug(f"Server returned {len(returned)} of {wanted} choices; asking again for the rest")
+        usage = response.usage
+        for index, choice in enumerate(returned):
+            choice_usage = None
+            if usage is not None:
+                completion_tokens = usage.completion_tokens // len(returned)
+                if index == 0:
+                    completion_tokens += usage.completion_tokens % len(returned)
+                prompt_tokens = usage.prompt_tokens if index == 0 else None
+                choice_usage = CompletionUsage(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    total_tokens=(prompt_tokens or 0) + completion_tokens
+                )
+            choices.append(FetchedResponse(
+                content=choice.message.content,
+                usage=choice_usage,
+                truncated=choice.finish_reason == TRUNCATED_FINISH_REASON
+            ))
+    return choices
+
+
+def fetch_samples(
+    client: LMStudioClient,
+    model: str,
+    prompt_requests: List[PromptRequest],
+    sampling: Dict[str, Any],
+    count: int
+) -> List[FetchedResponse]:
+    """
+    Get `count` independent responses to the requests of one iteration,
+    one per choice of each request.
+    """
+    per_request = [fetch_choices(client, model, r, sampling, count) for r in prompt_requests]
+    if len(prompt_requests) == 1:
+        return per_request[0]
+    return [
+        combine_responses([choices[i] for choices in per_request], prompt_requests)
+        for i in range(count)
+    ]
+
+
+def requests_digest(prompt_requests: List[PromptRequest]) -> str:
+    """Hash every message sent in one iteration, for use in cache keys."""
+    serialized = json.dumps([
+        [[m.role.value, m.content] for m in request.messages]
+        for request in prompt_requests
+    ])
+    return prompt_hash(serialized)
+
+
+def score_response(
+    fetched: FetchedResponse,
+    model: str,
+    answer_key: AnswerKey,
+    iteration: int,
+    elapsed: float
+) -> IterationResult:
+    """Score the answer lines of a response as one iteration."""
+    log.debug(f"Received response from model: {fetched.content}")
+
+    with span("extract_answers", EVALUATOR):
+        answer_lines = extract_answer_lines(fetched.content, len(answer_key))
+    with span("score", EVALUATOR):
+        scores = answer_key.score_answers(answer_lines)
+    result = IterationResult(
+        iteration=iteration,
+        answer_lines=answer_lines,
+        scores=scores,
+        elapsed=elapsed,
+        time_to_first_token=fetched.time_to_first_token,
+        stopped_early=fetched.stopped_early,
+        cached=fetched.cached,
+        truncated=fetched.truncated,
+        response=fetched.content
+    )
+    result.metrics = RequestMetrics.from_timings(
+        model=model,
+        iteration=iteration,
+        latency=elapsed,
+        score=result.score,
+        usage=fetched.usage,
+        time_to_first_token=fetched.time_to_first_token,
+        cached=fetched.cached,
+        stopped_early=fetched.stopped_early,
+        truncated=fetched.truncated
+    )
+    return result
+
+
+def run_iterations(
+    client: LMStudioClient,
+    model: str,
+    prompt_requests: List[PromptRequest],
+    answer_key: AnswerKey,
+    iterations: List[int],
+    stream: bool = False,
+    sampling: Optional[Dict[str, Any]] = None,
+    cache: Optional[ResponseCache] = None,
+    cache_mode: CacheMode = CacheMode.OFF
+) -> List[IterationResult]:
+    """
+    Send the prompt once for several iterations and score every response.
+
+    Each iteration not found in the cache is one choice of the same
+    request (see fetch_choices). The request's latency is split evenly
+    between those iterations, so that summed request times and decode
+    speeds do not depend on how many choices one request asked for. A
+    single iteration is a plain request and can be streamed. Iterations
+    found in the cache are marked cached and share the time of reading
+    it, not of the request.
+    """
+    sampling = sampling if sampling is not None else DEFAULT_SAMPLING
+    keys: Dict[int, str] = {}
+    fetched: Dict[int, FetchedResponse] = {}
+    if cache is not None and cache_mode is not CacheMode.OFF:
+        digest = requests_digest(prompt_requests)
+        keys = {i: cache_key(model, digest, sampling, i) for i in iterations}
+
+    elapsed: Dict[int, float] = {}
+    if keys and cache_mode.readable:
+        start = time.perf_counter()
+        with span("cache_read"):
+            for iteration, key in keys.items():
+                cached = cache.get(key)
+                if cached is not None:
+                    log.info(f"Using cached response for iteration {iteration}")
+                    fetched[iteration] = FetchedResponse(content=cached.content, usage=cached.usage, cached=True)
+        if fetched:
+            read_time = (time.perf_counter() - start) / len(fetched)
+            elapsed.update((i, read_time) for i in fetched)
+
+    missing = [i for i in iterations if i not in fetched]
+    if missing:
+        label = f"iteration {missing[0]}" if len(missing) == 1 else f"iterations {missing[0]}-{missing[-1]}"
+        log.info(f"Sending prompt to model for {label} (this may take a while for large prompts)...")
+        start = time.perf_counter()
+        try:
+            with span("fetch", model=model, iterations=missing):
+                if len(missing) == 1:
+                    responses = [fetch_iteration(client, model, prompt_requests, sampling, stream)]
+                else:
+                    responses = fetch_samples(client, model, prompt_requests, sampling, len(missing))
+        except Exception as e:
+            log.error(f"Chat completion failed for {label}: {e}")
+            log.error("This could be due to:")
+            log.error("1. Model context length limitations")
+            log.error("2. LM Studio server timeout")
+            log.error("3. Model not properly loaded")
+            raise
+        request_time = (time.perf_counter() - start) / len(missing)
+        for iteration, response in zip(missing, responses):
+            fetched[iteration] = response
+            elapsed[iteration] = request_time
+            if keys and cache_mode.writable:
+                with span("cache_write"):
+                    cache.put(keys[iteration], response.content, response.usage)
+            if response.truncated:
+                log.warning(
+                    f"Iteration {iteration} hit the generation budget of {sampling.get('max_tokens')} tokens "
+                    f"and was cut off"
+                )
+
+    return [score_response(fetched[i], model, answer_key, i, elapsed[i]) for i in iterations]
+
+
+def run_iteration(
+    client: LMStudioClient,
+    model: str,
+    prompt_requests: List[PromptRequest],
+    answer_key: AnswerKey,
+    iteration: int,
+    stream: bool = False,
+    sampling: Optional[Dict[str, Any]] = None,
+    cache: Optional[ResponseCache] = None,
+    cache_mode: CacheMode = CacheMode.OFF
+) -> IterationResult:
+    """Send the prompt once and score the answer lines of the response."""
+    return run_iterations(
+        client, model, prompt_requests, answer_key, [iteration], stream,
+        sampling=sampling, cache=cache, cache_mode=cache_mode
+    )[0]
+
+
+def run_checkpointed_iterations(
+    client: LMStudioClient,
+    model: str,
+    prompt_requests: List[PromptRequest],
+    answer_key: AnswerKey,
+    iterations: List[int],
+    stream: bool = False,
+    cache: Optional[ResponseCache] = None,
+    cache_mode: CacheMode = CacheMode.OFF,
+    store: Optional[ResultsStore] = None,
+    run_id: Optional[str] = None,
+    sampling: Optional[Dict[str, Any]] = None,
+    metrics: Optional["BenchmarkMetrics"] = None,
+    suite: Optional[str] = None
+) -> List[IterationResult]:
+    """
+    Run iterations sharing one request and record each in the store and
+    the live metrics as soon as they finish.
+
+    Failed iterations are returned with their error instead of raising, so
+    the rest of the run carries on and a resume can retry them.
+    """
+    start = time.perf_counter()
     try:
-        # Read the prompt from prompt.md
-        prompt_path = CUR_DIR / "prompt.md"
-        if not prompt_path.exists():
-            log.error(f"Prompt file not found: {prompt_path}")
-            sys.exit(1)
-            
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            prompt_content = f.read()
+        with span("iteration", model=model, iterations=iterations):
+            results = run_iterations(
+                client, model, prompt_requests, answer_key, iterations, stream,
+                sampling=sampling, cache=cache, cache_mode=cache_mode
+            )
+    except Exception as e:
+        results = [
+            IterationResult(
+                iteration=iteration,
+                answer_lines=[],
+                scores=[],
+                elapsed=time.perf_counter() - start,
+                error=str(e) or type(e).__name__
+            )
+            for iteration in iterations
+        ]
+    if store is not None:
+        with span("store_write"):
+            for result in results:
+                store.add_iteration(
+                    run_id, model, result.iteration, result.response or None,
+                    result.answer_lines, result.scores, result.metrics, result.error
+                )
+    if metrics is not None:
+        for result in results:
+            metrics.iteration_finished(
+                model, suite, result.elapsed,
+                score=None if result.error is not None else result.score,
+                decode_tokens_per_second=result.metrics.decode_tokens_per_second if result.metrics else None
+            )
+    return results
+
+
+def restore_iteration(stored: StoredIteration) -> IterationResult:
+    """Rebuild the result of an iteration checkpointed by an earlier session."""
+    metrics = stored.metrics
+    return IterationResult(
+        iteration=stored.iteration,
+        answer_lines=stored.answer_lines,
+        scores=stored.scores,
+        elapsed=metrics.latency if metrics and metrics.latency is not None else 0.0,
+        time_to_first_token=metrics.time_to_first_token if metrics else None,
+        stopped_early=metrics.stopped_early if metrics else False,
+        cached=metrics.cached if metrics else False,
+        truncated=metrics.truncated if metrics else False,
+        metrics=metrics,
+        response=stored.response or ""
+    )
+
+
+def report_iteration(result: IterationResult, iterations: int, answer_key: AnswerKey) -> None:
+    """Log the per-question scores of a finished iteration."""
+    log.info("=" * 60)
+    log.info(f"ITERATION {result.iteration}/{iterations}")
+    log.info("=" * 60)
+    log.info(f"Answer lines: {result.answer_lines}")
+    log.info("Evaluating responses...")
+    for i, (answer, gold, score) in enumerate(zip(result.answer_lines, answer_key.lines, result.scores), 1):
+        log.info(f"Q{i}: {score:.2f}% - '{answer}' vs '{gold}'")
+
+    log.info("-" * 60)
+    log.info(f"Iteration {result.iteration} Score: {result.score:.2f}%")
+    log.info(f"Correct answers: {result.correct}/{len(result.scores)}")
+    log.info(f"Request time: {result.elapsed:.2f}s")
+    if result.time_to_first_token is not None:
+        log.info(f"Time to first token: {result.time_to_first_token:.2f}s")
+    if result.stopped_early:
+        log.info("Stopped generation early after a complete answer block")
+    if result.cached:
+        log.info("Response served from cache")
+    metrics = result.metrics
+    if metrics and metrics.completion_tokens is not None:
+        if metrics.prompt_tokens is not None:
+            log.info(f"Tokens: {metrics.prompt_tokens} prompt, {metrics.completion_tokens} completion")
+        else:
+            log.info(f"Tokens: {metrics.completion_tokens} completion (prompt counted on another choice)")
+    if metrics and metrics.decode_tokens_per_second is not None:
+        log.info(f"Decode speed: {metrics.decode_tokens_per_second:.1f} tokens/s")
+
+
+@dataclass
+class ModelSummary:
+    """All iteration results for one model."""
+    model: str
+    results: List[IterationResult]
+    wall_time: float
+    suite: Optional[str] = None
+    # Latency of the first warm-up request, if there was a warm-up
+    load_time: Optional[float] = None
+
+    @property
+    def succeeded(self) -> List[IterationResult]:
+        """The iterations that got a response."""
+        return [r for r in self.results if r.error is None]
+
+    @property
+    def failed(self) -> int:
+        """Number of iterations whose request failed."""
+        return len(self.results) - len(self.succeeded)
+
+    @property
+    def average_score(self) -> float:
+        """Average score of the successful iterations."""
+        scores = [r.score for r in self.succeeded]
+        return sum(scores) / len(scores) if scores else 0.0
+
+    @property
+    def confidence_interval(self) -> Optional[ConfidenceInterval]:
+        """95% confidence interval of the average score."""
+        return mean_confidence_interval([r.score for r in self.succeeded])
+
+
+@dataclass
+class SuiteRun:
+    """One suite of a bench invocation: its requests, stored run and results."""
+    suite: Suite
+    prompt_requests: List[PromptRequest]
+    # Sampling parameters of every request, including the generation budget
+    sampling: Dict[str, Any] = field(default_factory=lambda: dict(DEFAULT_SAMPLING))
+    run_id: Optional[str] = None
+    # Iterations restored from the store, by model and iteration number
+    completed: Dict[str, Dict[int, IterationResult]] = field(default_factory=dict)
+    summaries: List[ModelSummary] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.suite.name
+
+    @property
+    def answer_key(self) -> AnswerKey:
+        return self.suite.answer_key
+
+
+def warm_up(
+    pool: EndpointPool,
+    model: str,
+    suite_runs: List[SuiteRun],
+    count: int,
+    telemetry: Optional[TelemetryWriter] = None
+) -> Optional[float]:
+    """
+    Send `count` warm-up requests for a model to every endpoint serving it,
+    before its measured iterations, and return the load time.
+
+    The first request is tiny, so its latency is mostly the model load; the
+    slowest endpoint's is the load time. The others send the first request
+    of each suite in turn, generating a single token, to fill the prompt
+    cache. Warm-up requests are never scored or counted in the timing
+    statistics, and one that fails only logs a warning.
+    """
+    load_times = []
+    endpoints = [e for e in pool.endpoints if e.serves(model)]
+    for endpoint in endpoints:
+        where = f" on {endpoint.base_url}" if len(endpoints) > 1 else ""
+        # The endpoint's transport, so warm-up loads the model over the same
+        # connections the iterations use, with a timeout long enough for the
+        # load. Not closed here: the pool owns the transport.
+        client = LMStudioClient(
+            base_url=endpoint.base_url, timeout=WARMUP_TIMEOUT, api_key=endpoint.client.api_key,
+            transport=endpoint.client.transport
+        )
+        for number in range(1, count + 1):
+            suite_run = None
+            if number == 1:
+                messages, sampling = WARMUP_MESSAGES, {"temperature": 0.0, "max_tokens": 1}
+            else:
+                suite_run = suite_runs[(number - 2) % len(suite_runs)]
+                messages = suite_run.prompt_requests[0].messages
+                sampling = {**suite_run.sampling, "max_tokens": 1}
+            start = time.perf_counter()
+            try:
+                response = client.chat_completion(messages, model=model, **sampling)
+            except Exception as e:
+                log.warning(f"Warm-up request {number}/{count} for {model}{where} failed: {e}")
+                continue
+            latency = time.perf_counter() - start
+            if number == 1:
+                load_times.append(latency)
+                log.info(f"Warm-up {number}/{count} for {model}{where}: loaded in {latency:.2f}s")
+            else:
+                log.info(f"Warm-up {number}/{count} for {model}{where}: {suite_run.name} prompt cached in {latency:.2f}s")
+            if telemetry is not None:
+                metrics = RequestMetrics.from_timings(model=model, iteration=number, latency=latency, score=0.0, usage=response.usage)
+                metrics.warmup = True
+                metrics.suite = suite_run.name if suite_run else None
+                telemetry.write(metrics)
+    return max(load_times) if load_times else None
+
+
+def benchmark_model(
+    client: LMStudioClient,
+    executor: ThreadPoolExecutor,
+    model: str,
+    suite_run: "SuiteRun",
+    iterations: int,
+    stream: bool = False,
+    cache: Optional[ResponseCache] = None,
+    cache_mode: CacheMode = CacheMode.OFF,
+    telemetry: Optional[TelemetryWriter] = None,
+    store: Optional[ResultsStore] = None,
+    stopping: Optional[StoppingRule] = None,
+    concurrency: int = 1,
+    samples: int = 1,
+    metrics: Optional["BenchmarkMetrics"] = None
+) -> ModelSummary:
+    """
+    Run the iterations of one model on one suite that the suite run has
+    not completed yet on the executor, and report all of them in order.
+
+    Iterations are sent in groups of `samples`, each group as one request
+    asking for that many choices.
+
+    With a stopping rule, `iterations` is the minimum and up to
+    stopping.max_iterations are run. Only `concurrency` groups are queued
+    at a time, and none are added once the rule says to stop. The models
+    already benchmarked on the suite are the rule's comparison.
+    """
+    completed = suite_run.completed.get(model, {})
+    others = [s.confidence_interval for s in suite_run.summaries if s.confidence_interval]
+    results: List[IterationResult] = []
+    last = max(iterations, stopping.max_iterations) if stopping else iterations
+    ahead = max(1, concurrency) * samples if stopping else last
+    # Iteration number to the future of its group and its place in it
+    futures = {}
+    submitted = 0
+    stop_reason = None
+
+    def submit_through(upto: int, partial: bool = True) -> None:
+        """Queue the iterations up to `upto`; a short last group only if partial."""
+        nonlocal submitted
+        upto = min(upto, last)
+        while submitted < upto and (partial or upto == last or upto - submitted >= samples):
+            end = min(submitted + samples, upto)
+            group = [i for i in range(submitted + 1, end + 1) if i not in completed]
+            submitted = end
+            if not group:
+                continue
+            future = executor.submit(
+                run_checkpointed_iterations, client, model, suite_run.prompt_requests, suite_run.answer_key,
+                group, stream, cache=cache, cache_mode=cache_mode, store=store, run_id=suite_run.run_id,
+                sampling=suite_run.sampling, metrics=metrics, suite=suite_run.name
+            )
+            for index, number in enumerate(group):
+                futures[number] = (future, index)
+
+    wall_start = time.perf_counter()
+    # Report in iteration order, whatever order the requests finish in
+    try:
+        submit_through(max(iterations, ahead))
+        iteration = 0
+        while iteration < submitted:
+            iteration += 1
+            if stop_reason is None:
+                # Whole groups only, unless nothing else is queued
+                submit_through(iteration + ahead - 1, partial=iteration == submitted)
+            if iteration in completed:
+                result = completed[iteration]
+                log.info(f"Iteration {iteration}/{last}: {result.score:.2f}% (restored from checkpoint)")
+            else:
+                future, index = futures[iteration]
+                result = future.result()[index]
+                if result.error is not None:
+                    log.error(f"Iteration {iteration}/{last} failed: {result.error}")
+                else:
+                    report_iteration(result, last, suite_run.answer_key)
+                    if telemetry is not None and result.metrics is not None:
+                        result.metrics.suite = suite_run.name
+                        telemetry.write(result.metrics)
+            results.append(result)
+            if stopping is not None and stop_reason is None and iteration >= iterations:
+                stop_reason = stopping.check([r.score for r in results if r.error is None], others)
+                if stop_reason:
+                    log.info(f"Stopping {model} after iteration {iteration}: {stop_reason}")
+    except BaseException:
+        # Finished iterations are already checkpointed; drop the queued ones
+        for pending, _ in futures.values():
+            pending.cancel()
+        raise
+    wall_time = time.perf_counter() - wall_start
+
+    return ModelSummary(model=model, results=results, wall_time=wall_time, suite=suite_run.name)
+
+
+def report_model_summary(summary: ModelSummary, stream: bool = False) -> None:
+    """Log the final results block for one model."""
+    results = summary.succeeded
+    iteration_scores = [r.score for r in results]
+    request_time = sum(r.elapsed for r in results)
+
+    # Calculate and display final results
+    log.info("=" * 60)
+    log.info("FINAL RESULTS")
+    log.info("=" * 60)
+    
+    if len(iteration_scores) > 1:
+        log.info("Individual iteration scores:")
+        for i, score in enumerate(iteration_scores, 1):
+            log.info(f"  Iteration {i}: {score:.2f}%")
+        log.info("-" * 60)
+    
+    log.info(f"Average Score: {summary.average_score:.2f}%")
+    log.info(f"Model: {summary.model}")
+    if summary.suite:
+        log.info(f"Suite: {summary.suite}")
+    log.info(f"Iterations: {len(results)}")
+    if summary.failed:
+        log.info(f"Failed iterations: {summary.failed}/{len(summary.results)}")
+    
+    if len(iteration_scores) > 1:
+        min_score = min(iteration_scores)
+        max_score = max(iteration_scores)
+        log.info(f"Best Score: {max_score:.2f}%")
+        log.info(f"Worst Score: {min_score:.2f}%")
+        log.info(f"Score Range: {max_score - min_score:.2f}%")
+        interval = summary.confidence_interval
+        log.info(f"95% confidence interval: {interval.low:.2f}% - {interval.high:.2f}% (±{interval.half_width:.2f})")
+
+    log.info("-" * 60)
+    if summary.load_time is not None:
+        log.info(f"Model load time (warm-up): {summary.load_time:.2f}s")
+    log.info(f"Wall-clock time: {summary.wall_time:.2f}s")
+    log.info(f"Sum of request times: {request_time:.2f}s")
+    if summary.wall_time > 0:
+        log.info(f"Speedup: {request_time / summary.wall_time:.2f}x")
+    ttfts = [r.time_to_first_token for r in results if r.time_to_first_token is not None]
+    if ttfts:
+        log.info(f"Average time to first token: {sum(ttfts) / len(ttfts):.2f}s")
+    if stream:
+        log.info(f"Stopped early: {sum(1 for r in results if r.stopped_early)}/{len(results)}")
+    truncated = sum(1 for r in results if r.truncated)
+    if truncated:
+        log.info(f"Truncated at the generation budget: {truncated}/{len(results)}")
+    cached = sum(1 for r in results if r.cached)
+    if cached:
+        log.info(f"Cached responses: {cached}/{len(results)}")
+    report_performance([r.metrics for r in results if r.metrics and not r.metrics.cached])
+
+
+def report_performance(metrics: List[RequestMetrics]) -> None:
+    """Log mean/p50/p95 of the per-request performance measurements."""
+    rows = [
+        ("Latency (s)", [m.latency for m in metrics]),
+        ("Time to first token (s)", [m.time_to_first_token for m in metrics]),
+        ("Prompt tokens", [m.prompt_tokens for m in metrics]),
+        ("Completion tokens", [m.completion_tokens for m in metrics]),
+        ("Prefill tokens/s", [m.prefill_tokens_per_second for m in metrics]),
+        ("Decode tokens/s", [m.decode_tokens_per_second for m in metrics]),
+    ]
+    summaries = [(label, summarize(values)) for label, values in rows]
+    if not any(stats for _, stats in summaries):
+        return
+
+    log.info("-" * 60)
+    log.info(f"{'Performance':<24} {'mean':>10} {'p50':>10} {'p95':>10}")
+    for label, stats in summaries:
+        if stats:
+            log.info(f"{label:<24} {stats.mean:>10.2f} {stats.p50:>10.2f} {stats.p95:>10.2f}")
+
+
+def report_comparison(summaries: List[ModelSummary], suite: Optional[str] = None) -> None:
+    """Log a comparative table of all benchmarked models, sorted by score."""
+    ranked = sorted(summaries, key=lambda s: s.average_score, reverse=True)
+    width = max(len("Model"), *(len(s.model) for s in ranked))
+
+    log.info("=" * 60)
+    log.info(f"COMPARISON: {suite}" if suite else "COMPARISON")
+    log.info("=" * 60)
+    log.info(f"| {'Model':<{width}} | Score (%) | Best (%) | Worst (%) | Iterations | Wall time (s) |")
+    log.info(f"| {'-' * width} | --------- | -------- | --------- | ---------- | ------------- |")
+    for summary in ranked:
+        scores = [r.score for r in summary.succeeded] or [0.0]
+        log.info(
+            f"| {summary.model:<{width}} | {summary.average_score:>9.2f} | {max(scores):>8.2f} "
+            f"| {min(scores):>9.2f} | {len(summary.succeeded):>10d} | {summary.wall_time:>13.2f} |"
+        )
+
+
+def run_benchmark(
+    runs: List[ModelRun],
+    endpoints: Optional[List[EndpointSpec]] = None,
+    concurrency: int = 1,
+    stream: bool = False,
+    cache_mode: CacheMode = CacheMode.OFF,
+    cache_dir: Optional[Path] = None,
+    telemetry_path: Optional[Path] = None,
+    layout: PromptLayout = PromptLayout.SINGLE,
+    store_path: Optional[Path] = DEFAULT_STORE_PATH,
+    resume_id: Optional[str] = None,
+    stopping: Optional[StoppingRule] = None,
+    suites: Optional[List[Suite]] = None,
+    budget: Optional[GenerationBudget] = None,
+    samples: int = 1,
+    warmup: int = 0,
+    metrics_port: Optional[int] = None,
+    transport: str = AUTO
+) -> None:
+    """
+    Run benchmark evaluation for each requested model, one model at a time,
+    on every suite.
+
+    With resume_id, iterations that run already completed are restored
+    from the results store and only the missing or failed ones are run.
+    With a stopping rule, each model's iteration count is its minimum and
+    it gets more iterations until the rule is met. Requests are spread
+    over the endpoints, each of which is first checked for the models.
+    The generation budget sets max_tokens and stop sequences per suite.
+    With samples above 1, each request asks for that many choices and
+    every choice is scored as an iteration. With warmup, each model first
+    gets that many unmeasured warm-up requests (see warm_up). With a
+    metrics port, live metrics are served there for Prometheus to scrape.
+    The transport is the HTTP client the requests go through (see
+    transport.create_transport).
+    """
+    endpoints = endpoints or [EndpointSpec(base_url=DEFAULT_BASE_URL)]
+    budget = budget or GenerationBudget()
+    suite_runs: List[SuiteRun] = []
+    try:
+        suite_runs = [
+            SuiteRun(suite=suite, prompt_requests=build_requests(suite.prompt, layout))
+            for suite in (suites or [default_registry().get()])
+        ]
+        # Compile the answer keys before the worker threads need them
+        for suite_run in suite_runs:
+            suite_run.sampling = budget.sampling(DEFAULT_SAMPLING, suite_run.prompt_requests, suite_run.answer_key)
         
-        # Set up the client
-        client_kwargs = {}
-        if base_url:
-            client_kwargs['base_url'] = base_url
-            
-        log.info(f"Running benchmark with model: {model}")
-        log.info(f"Prompt size: {len(prompt_content)} characters")
-        log.info(f"Number of iterations: {iterations}")
+        # Start with the model the server already has loaded, if it is one of ours
+        loaded_model = None
+        requested = {r.model for r in runs}
+        if len(requested) > 1:
+            with EndpointPool(endpoints, transport=transport) as pool:
+                loaded_model = next((m for m in pool.get_loaded_models() if m in requested), None)
+        batches = schedule_models(runs, loaded_model)
+        most_iterations = max(b.iterations for b in batches)
+        if stopping is not None:
+            most_iterations = max(most_iterations, stopping.max_iterations)
+        concurrency = max(1, min(concurrency, most_iterations))
+
+        log.info(f"Running benchmark with model{'s' if len(batches) > 1 else ''}: {', '.join(b.model for b in batches)}")
+        for suite_run in suite_runs:
+            requests_count = len(suite_run.prompt_requests)
+            log.info(
+                f"Suite: {suite_run.name} ({len(suite_run.answer_key)} questions, prompt size: "
+                f"{len(suite_run.suite.prompt)} characters, {requests_count} request{'s' if requests_count > 1 else ''} per iteration)"
+            )
+            max_tokens = suite_run.sampling.get("max_tokens")
+            log.info(f"Generation budget: {f'{max_tokens} tokens per request' if max_tokens else 'unlimited'}")
+        if budget.stop:
+            log.info(f"Stop sequences: {', '.join(repr(s) for s in budget.stop)}")
+        log.info(f"Prompt layout: {layout.value}")
+        if stopping is not None:
+            log.info(
+                f"Iterations: adaptive, until the {stopping.confidence:.0%} confidence interval "
+                f"is within {stopping.target_width:g} points (at most {stopping.max_iterations} per model)"
+            )
+        else:
+            log.info(f"Number of iterations: {sum(b.iterations for b in batches) * len(suite_runs)}")
+        log.info(f"Concurrency: {concurrency}")
+        if len(endpoints) > 1:
+            log.info(f"Endpoints: {len(endpoints)}")
+        log.info(f"Streaming: {'on' if stream else 'off'}")
+        if samples > 1:
+            log.info(f"Choices per request: {samples}")
+        if warmup:
+            log.info(f"Warm-up requests per model: {warmup}")
+        log.info(f"Response cache: {cache_mode.value}")
+        if len(batches) > 1:
+            requested_loads = count_model_swaps([r.model for r in runs], loaded_model)
+            loads = count_model_swaps([b.model for b in batches], loaded_model)
+            if loaded_model:
+                log.info(f"Already loaded on the server: {loaded_model}")
+            log.info(f"Model loads: {loads} (requested order would need {requested_loads})")
         
-        # Use longer timeout for large prompts
-        client_kwargs['timeout'] = 120  # 2 minutes timeout
+        # Use longer timeout for large prompts (2 minutes), and one pooled
+        # connection per worker so requests never queue on the pool
+        client_kwargs = {'timeout': 120, 'pool_size': concurrency, 'transport': transport}
         
-        iteration_scores = []
+        cache = None
+        if cache_mode is not CacheMode.OFF:
+            cache = ResponseCache(cache_dir) if cache_dir else ResponseCache()
         
-        with LMStudioClient(**client_kwargs) as client:
-            for iteration in range(1, iterations + 1):
-                log.info("=" * 60)
-                log.info(f"ITERATION {iteration}/{iterations}")
-                log.info("=" * 60)
-                
-                # Create the message for the LLM
-                messages = [Message(role=Role.USER, content=prompt_content)]
-                
-                # Get response from the model
-                log.info("Sending prompt to model (this may take a while for large prompts)...")
-                try:
-                    response_content = client.simple_chat(
-                        user_message=prompt_content,
-                        model=model,
-                        temperature=0.1
+        with ExitStack() as stack:
+            metrics = None
+            if metrics_port is not None:
+                from metrics import BenchmarkMetrics, MetricsServer
+                metrics = BenchmarkMetrics()
+                server = stack.enter_context(MetricsServer(("", metrics_port), metrics))
+                log.info(f"Serving live metrics on port {server.server_address[1]}")
+            client = stack.enter_context(EndpointPool(endpoints, metrics=metrics, **client_kwargs))
+            client.check_health([b.model for b in batches])
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=concurrency))
+            telemetry = None
+            if telemetry_path:
+                telemetry = stack.enter_context(TelemetryWriter(telemetry_path))
+                log.info(f"Writing telemetry to {telemetry_path}")
+            store = None
+            if resume_id:
+                if not store_path:
+                    raise ValueError("--resume needs the results store")
+                store = stack.enter_context(ResultsStore(store_path))
+                run = store.get_run(resume_id)
+                if run is None:
+                    raise ValueError(f"No run {resume_id} in {store_path}")
+                suite_run = suite_runs[0]
+                if run.prompt_hash != requests_digest(suite_run.prompt_requests):
+                    raise ValueError(f"The prompt has changed since run {resume_id}; start a new run instead")
+                suite_run.run_id = resume_id
+                for stored in store.load_iterations(resume_id):
+                    suite_run.completed.setdefault(stored.model, {})[stored.iteration] = restore_iteration(stored)
+                done = sum(len(c) for c in suite_run.completed.values())
+                log.info(f"Resuming run {resume_id}: {done} iterations already done")
+            elif store_path:
+                store = stack.enter_context(ResultsStore(store_path))
+                # One stored run per suite, each with its own prompt hash
+                for suite_run in suite_runs:
+                    suite_run.run_id = store.start_run(
+                        requests_digest(suite_run.prompt_requests),
+                        layout.value,
+                        {
+                            "sampling": suite_run.sampling,
+                            "stream": stream,
+                            "concurrency": concurrency,
+                            "samples": samples,
+                            "warmup": warmup,
+                            "cache": cache_mode.value,
+                            "models": {b.model: b.iterations for b in batches},
+                            "target_ci": stopping.target_width if stopping else None,
+                            "max_n": stopping.max_iterations if stopping else None,
+                        },
+                        suite=suite_run.name
                     )
-                except Exception as e:
-                    log.error(f"Chat completion failed for iteration {iteration}: {e}")
-                    log.error("This could be due to:")
-                    log.error("1. Model context length limitations")
-                    log.error("2. LM Studio server timeout")
-                    log.error("3. Model not properly loaded")
-                    raise
-
-                log.debug(f"Received response from model: {response_content}")
-
-                # Parse the response to extract Q1: through Q16: lines
-                lines = response_content.strip().split('\n')
-                answer_lines = []
-                
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith('Q') and ':' in line:
-                        # Extract just the answer part after the colon
-                        answer = line.split(':', 1)[1].strip()
-                        answer_lines.append(line)
-
-                log.debug(f"Answer lines are:\n{answer_lines}")
-
-                # Take the last 16 answers (in case there are duplicates or extras)
-                if len(answer_lines) >= len(GOLD):
-                    answer_lines = answer_lines[-len(GOLD):]
-                else:
-                    log.warning(f"Only found {len(answer_lines)} answers, expected {len(GOLD)}")
-                    # Pad with empty strings if needed
-                    while len(answer_lines) < len(GOLD):
-                        answer_lines.append("")
-                
-                # Evaluate using match_line
-                log.info(f"Answer lines: {answer_lines}")
-                log.info("Evaluating responses...")
-                scores = []
-                for i, (answer, gold) in enumerate(zip(answer_lines, GOLD), 1):
-                    score = match_line((answer, gold))
-                    scores.append(score)
-                    log.info(f"Q{i}: {score:.2f}% - '{answer}' vs '{gold}'")
-                
-                # Calculate iteration score
-                iteration_score = sum(scores) / len(scores) if scores else 0.0
-                iteration_scores.append(iteration_score)
-                
-                log.info("-" * 60)
-                log.info(f"Iteration {iteration} Score: {iteration_score:.2f}%")
-                log.info(f"Correct answers: {sum(1 for s in scores if s == 100.0)}/{len(scores)}")
-            
-            # Calculate and display final results
-            log.info("=" * 60)
-            log.info("FINAL RESULTS")
-            log.info("=" * 60)
-            
-            if len(iteration_scores) > 1:
-                log.info("Individual iteration scores:")
-                for i, score in enumerate(iteration_scores, 1):
-                    log.info(f"  Iteration {i}: {score:.2f}%")
-                log.info("-" * 60)
-            
-            average_score = sum(iteration_scores) / len(iteration_scores) if iteration_scores else 0.0
-            log.info(f"Average Score: {average_score:.2f}%")
-            log.info(f"Model: {model}")
-            log.info(f"Iterations: {iterations}")
-            
-            if len(iteration_scores) > 1:
-                min_score = min(iteration_scores)
-                max_score = max(iteration_scores)
-                log.info(f"Best Score: {max_score:.2f}%")
-                log.info(f"Worst Score: {min_score:.2f}%")
-                log.info(f"Score Range: {max_score - min_score:.2f}%")
+                    log.info(f"Recording {suite_run.name} results as run {suite_run.run_id} in {store_path}")
+            # Each model's batch finishes before the next one starts, so
+            # requests for different models are never in flight together.
+            # All suites run while the model is loaded.
+            for batch in batches:
+                load_time = None
+                if warmup:
+                    load_time = warm_up(client, batch.model, suite_runs, warmup, telemetry)
+                for suite_run in suite_runs:
+                    if len(batches) > 1 or len(suite_runs) > 1:
+                        log.info("#" * 60)
+                        if stopping is not None:
+                            iterations = f"adaptive, at most {max(batch.iterations, stopping.max_iterations)} iterations"
+                        else:
+                            iterations = f"{batch.iterations} iterations"
+                        log.info(f"MODEL: {batch.model}, SUITE: {suite_run.name} ({iterations})")
+                        log.info("#" * 60)
+                    summary = benchmark_model(
+                        client, executor, batch.model, suite_run, batch.iterations, stream,
+                        cache=cache, cache_mode=cache_mode, telemetry=telemetry, store=store,
+                        stopping=stopping, concurrency=concurrency, samples=samples, metrics=metrics
+                    )
+                    summary.load_time = load_time
+                    report_model_summary(summary, stream)
+                    suite_run.summaries.append(summary)
+            if store is not None:
+                for suite_run in suite_runs:
+                    if suite_run.run_id:
+                        store.finish_run(suite_run.run_id)
+            if len(endpoints) > 1:
+                client.report()
+
+        for suite_run in suite_runs:
+            if len(suite_run.summaries) > 1:
+                report_comparison(suite_run.summaries, suite_run.name if len(suite_runs) > 1 else None)
+
+        if cache is not None and cache_mode.writable:
+            removed = cache.evict()
+            if removed:
+                log.info(f"Evicted {removed} stale cache entries")
             
     except Exception as e:
         log.error(f"Error running benchmark: {e}")
         sys.exit(1)
 
+    failed_runs = [
+        (suite_run, sum(summary.failed for summary in suite_run.summaries))
+        for suite_run in suite_runs
+    ]
+    failed = sum(count for _, count in failed_runs)
+    if failed:
+        log.error(f"{failed} iteration{'s' if failed > 1 else ''} failed")
+        for suite_run, count in failed_runs:
+            if count and suite_run.run_id:
+                log.error(f"Run them again with: --resume {suite_run.run_id}")
+        sys.exit(1)
+
+
+def load_resumed_run(store_path: Optional[Path], run_id: str):
+    """
+    Return the models, prompt layout, streaming setting, stopping rule,
+    suite, generation budget and choices per request of a stored run, so
+    a resume repeats it with the same settings.
+    """
+    if not store_path or not Path(store_path).exists():
+        log.error(f"Results store not found: {store_path}")
+        sys.exit(1)
+    with ResultsStore(store_path) as store:
+        run = store.get_run(run_id)
+    if run is None:
+        log.error(f"No run {run_id} in {store_path}")
+        sys.exit(1)
+    runs = [ModelRun(model=model, iterations=n) for model, n in run.params["models"].items()]
+    stopping = None
+    if run.params.get("target_ci") is not None:
+        stopping = StoppingRule(target_width=run.params["target_ci"], max_iterations=run.params["max_n"])
+    # The stored max_tokens is the one the run derived; runs from before
+    # generation budgets had none
+    sampling = run.params.get("sampling", {})
+    budget = GenerationBudget(max_tokens=sampling.get("max_tokens", 0), stop=sampling.get("stop", []))
+    return (
+        runs, PromptLayout(run.layout), bool(run.params.get("stream")), stopping, run.suite, budget,
+        run.params.get("samples", 1)
+    )
+
+
+def resolve_model_runs(
+    model_specs: Optional[List[str]],
+    all_models: bool,
+    iterations: int,
+    endpoints: Optional[List[EndpointSpec]] = None
+) -> List[ModelRun]:
+    """Turn --model specs or --all into the list of requested runs; --all takes the models of every endpoint."""
+    if not all_models:
+        try:
+            return [parse_model_spec(spec, iterations) for spec in model_specs]
+        except ValueError as e:
+            log.error(str(e))
+            sys.exit(1)
+
+    try:
+        with EndpointPool(endpoints or [EndpointSpec(base_url=DEFAULT_BASE_URL)]) as client:
+            models_response = client.get_models()
+    except Exception as e:
+        log.error(f"Error listing models: {e}")
+        sys.exit(1)
+
+    if not models_response.data:
+        log.error("No models available.")
+        sys.exit(1)
+    return [ModelRun(model=m.id, iterations=iterations) for m in models_response.data]
+
+
+def report_sweep_point(point: SweepPoint, result: IterationResult, iterations: int) -> None:
+    """Log one finished iteration of a sweep point on a single line."""
+    if result.error is not None:
+        log.error(f"{point.label}, iteration {result.iteration}/{iterations} failed: {result.error}")
+        return
+    speed = ""
+    if result.metrics and result.metrics.decode_tokens_per_second is not None:
+        speed = f", {result.metrics.decode_tokens_per_second:.1f} tokens/s"
+    truncated = ", truncated" if result.truncated else ""
+    log.info(
+        f"{point.label}, iteration {result.iteration}/{iterations}: "
+        f"{result.score:.2f}% in {result.elapsed:.2f}s{speed}{truncated}"
+    )
+
+
+def report_sweep(points: List[SweepPoint], runs: List[SuiteRun]) -> None:
+    """
+    Log a table of every sweep point, best score first and faster points
+    first among equal scores, and name the fastest point that scored 100%
+    on every iteration.
+    """
+    rows = []
+    for point, run in zip(points, runs):
+        summary = run.summaries[0]
+        metrics = [r.metrics for r in summary.succeeded if r.metrics]
+        latency = summarize([m.latency for m in metrics])
+        decode = summarize([m.decode_tokens_per_second for m in metrics])
+        completion = summarize([m.completion_tokens for m in metrics])
+        rows.append((point, run, summary, latency, decode, completion))
+    rows.sort(key=lambda row: (-row[2].average_score, row[3].mean if row[3] else float("inf")))
+
+    log.info("=" * 60)
+    log.info(f"SWEEP: {runs[0].summaries[0].model}, {runs[0].name}")
+    log.info("=" * 60)
+    log.info("| Temperature | top_p | max_tokens | Score (%) | Worst (%) | Decode tokens/s | Latency (s) | Completion tokens | Truncated |")
+    log.info("| ----------- | ----- | ---------- | --------- | --------- | --------------- | ----------- | ----------------- | --------- |")
+    for point, run, summary, latency, decode, completion in rows:
+        scores = [r.score for r in summary.succeeded] or [0.0]
+        truncated = sum(1 for r in summary.succeeded if r.truncated)
+        log.info(
+            f"| {point.temperature:>11g} | {point.top_p:>5g} | {format_max_tokens(run.sampling.get('max_tokens', 0)):>10} "
+            f"| {summary.average_score:>9.2f} | {min(scores):>9.2f} "
+            f"| {f'{decode.mean:.1f}' if decode else '-':>15} | {f'{latency.mean:.2f}' if latency else '-':>11} "
+            f"| {f'{completion.mean:.0f}' if completion else '-':>17} | {truncated:>9d} |"
+        )
+
+    perfect = [
+        row for row in rows
+        if row[2].succeeded and not row[2].failed and min(r.score for r in row[2].succeeded) == 100.0
+    ]
+    log.info("-" * 60)
+    if perfect:
+        log.info(f"Fastest at 100%: {perfect[0][0].label}")
+    else:
+        log.info(f"No point scored 100% on every iteration; best: {rows[0][0].label}")
+
+
+def run_sweep(
+    model: str,
+    points: List[SweepPoint],
+    iterations: int,
+    endpoints: Optional[List[EndpointSpec]] = None,
+    concurrency: int = 1,
+    layout: PromptLayout = PromptLayout.SINGLE,
+    suite: Optional[Suite] = None,
+    reasoning_tokens: int = DEFAULT_REASONING_TOKENS,
+    warmup: int = 0,
+    telemetry_path: Optional[Path] = None,
+    store_path: Optional[Path] = DEFAULT_STORE_PATH
+) -> None:
+    """
+    Benchmark one model at every point of a sampling parameter grid.
+
+    The model is loaded once and every point sends the same prompt, so
+    after the first request the server's prompt cache holds the prefix.
+    Iterations are queued round-robin over the points (iteration 1 of every
+    point, then iteration 2, ...), so the points share the load evenly and
+    an interrupted sweep has results for all of them. Each point is
+    recorded as its own run in the results store.
+    """
+    endpoints = endpoints or [EndpointSpec(base_url=DEFAULT_BASE_URL)]
+    suite = suite or default_registry().get()
+    runs: List[SuiteRun] = []
+    try:
+        prompt_requests = build_requests(suite.prompt, layout)
+        for point in points:
+            sampling = point.budget(reasoning_tokens).sampling(
+                {"temperature": point.temperature, "top_p": point.top_p}, prompt_requests, suite.answer_key
+            )
+            runs.append(SuiteRun(suite=suite, prompt_requests=prompt_requests, sampling=sampling))
+        concurrency = max(1, min(concurrency, iterations * len(points)))
+
+        log.info(f"Sweeping {len(points)} sampling point{'s' if len(points) > 1 else ''} with model: {model}")
+        log.info(f"Suite: {suite.name} ({len(suite.answer_key)} questions)")
+        log.info(f"Prompt layout: {layout.value}")
+        log.info(f"Iterations per point: {iterations}")
+        log.info(f"Concurrency: {concurrency}")
+        if len(endpoints) > 1:
+            log.info(f"Endpoints: {len(endpoints)}")
+
+        with ExitStack() as stack:
+            client = stack.enter_context(EndpointPool(endpoints, timeout=120, pool_size=concurrency))
+            client.check_health([model])
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=concurrency))
+            telemetry = None
+            if telemetry_path:
+                telemetry = stack.enter_context(TelemetryWriter(telemetry_path))
+                log.info(f"Writing telemetry to {telemetry_path}")
+            store = None
+            if store_path:
+                store = stack.enter_context(ResultsStore(store_path))
+                for point, run in zip(points, runs):
+                    run.run_id = store.start_run(
+                        requests_digest(prompt_requests),
+                        layout.value,
+                        {
+                            "sampling": run.sampling,
+                            "stream": False,
+                            "concurrency": concurrency,
+                            "warmup": warmup,
+                            "models": {model: iterations},
+                            "sweep": True,
+                        },
+                        suite=suite.name
+                    )
+                log.info(f"Recording each point as a run in {store_path}")
+
+            load_time = warm_up(client, model, runs[:1], warmup, telemetry) if warmup else None
+            wall_start = time.perf_counter()
+            futures = {}
+            try:
+                for iteration in range(1, iterations + 1):
+                    for index, run in enumerate(runs):
+                        futures[index, iteration] = executor.submit(
+                            run_checkpointed_iterations, client, model, prompt_requests, suite.answer_key,
+                            [iteration], store=store, run_id=run.run_id, sampling=run.sampling
+                        )
+                results: Dict[int, List[IterationResult]] = {index: [] for index in range(len(runs))}
+                for (index, iteration), future in futures.items():
+                    result = future.result()[0]
+                    report_sweep_point(points[index], result, iterations)
+                    if telemetry is not None and result.metrics is not None:
+                        result.metrics.suite = suite.name
+                        telemetry.write(result.metrics)
+                    results[index].append(result)
+            except BaseException:
+                for pending in futures.values():
+                    pending.cancel()
+                raise
+            # The points run side by side, so they share one wall-clock time
+            wall_time = time.perf_counter() - wall_start
+            for index, run in enumerate(runs):
+                run.summaries.append(
+                    ModelSummary(model=model, results=results[index], wall_time=wall_time, suite=suite.name, load_time=load_time)
+                )
+                if store is not None:
+                    store.finish_run(run.run_id)
+            if len(endpoints) > 1:
+                client.report()
+
+        if load_time is not None:
+            log.info(f"Model load time (warm-up): {load_time:.2f}s")
+        log.info(f"Wall-clock time: {wall_time:.2f}s")
+        report_sweep(points, runs)
+
+    except Exception as e:
+        log.error(f"Error running sweep: {e}")
+        sys.exit(1)
+
+    failed = sum(run.summaries[0].failed for run in runs if run.summaries)
+    if failed:
+        log.error(f"{failed} iteration{'s' if failed > 1 else ''} failed")
+        sys.exit(1)
+
+
+def run_plan(
+    runs: List[ModelRun],
+    suites: List[Suite],
+    layout: PromptLayout,
+    budget: GenerationBudget,
+    store_path: Path
+) -> None:
+    """Queue a benchmark plan in the results database for workers to run."""
+    try:
+        plan_suites = []
+        for suite in suites:
+            prompt_requests = build_requests(suite.prompt, layout)
+            plan_suites.append(PlanSuite(
+                name=suite.name,
+                prompt=suite.prompt,
+                answers=suite.answer_key.lines,
+                prompt_hash=requests_digest(prompt_requests),
+                sampling=budget.sampling(DEFAULT_SAMPLING, prompt_requests, suite.answer_key)
+            ))
+        with JobQueue(store_path) as queue:
+            plan_id = queue.create_plan(runs, plan_suites, layout.value)
+            plan = queue.status(plan_id)[0]
+    except Exception as e:
+        log.error(f"Error creating plan: {e}")
+        sys.exit(1)
+    log.info(f"Plan {plan_id}: {plan.total} jobs queued in {store_path}")
+    log.info(f"Models: {', '.join(b.model for b in schedule_models(runs))}")
+    log.info(f"Suites: {', '.join(s.name for s in suites)}")
+
+
+def report_plans(plans: List[PlanStatus]) -> None:
+    """Log the job counts of each plan."""
+    if not plans:
+        log.info("No plans queued.")
+        return
+    log.info(f"| {'Plan':<22} | Queued | Leased |   Done | Failed | Workers")
+    log.info(f"| {'-' * 22} | ------ | ------ | ------ | ------ | -------")
+    for plan in plans:
+        log.info(
+            f"| {plan.plan_id:<22} | {plan.queued:>6d} | {plan.leased:>6d} | {plan.done:>6d} "
+            f"| {plan.failed:>6d} | {', '.join(plan.workers) or '-'}"
+        )
+
+
+def run_coordinator(store_path: Path, host: str, port: int) -> None:
+    """Serve the job queue to remote workers until interrupted."""
+    from coordinator import QueueServer
+    with JobQueue(store_path) as queue:
+        server = QueueServer((host, port), queue)
+        log.info(f"Coordinator serving {store_path} on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+def keep_lease(queue, job: Job, worker: str, duration: float, done: threading.Event) -> None:
+    """Renew a job's lease a few times per lease period until the job is done."""
+    while not done.wait(duration / 3):
+        try:
+            if not queue.renew(job.id, worker, duration):
+                log.warning(f"{worker}: lost the lease of job {job.id}")
+                return
+        except Exception as e:
+            log.warning(f"{worker}: could not renew the lease of job {job.id}: {e}")
+
+
+def run_jobs(
+    queue,
+    client: LMStudioClient,
+    worker: str,
+    models: List[str],
+    lease: float,
+    poll: float,
+    exit_when_done: bool,
+    stop: threading.Event
+) -> int:
+    """
+    Lease and run jobs one at a time until there are none left (with
+    exit_when_done) or stop is set, and return the number completed.
+
+    Jobs for the model the worker ran last come first, so it only swaps
+    models when that one has no jobs left.
+    """
+    # Requests and answer key of each run, built on first use
+    prepared: Dict[str, Any] = {}
+    last_model = None
+    completed = 0
+    while not stop.is_set():
+        try:
+            job = queue.lease(worker, models, lease, prefer=last_model)
+        except Exception as e:
+            log.warning(f"{worker}: could not lease a job: {e}")
+            job = None
+        if job is None:
+            if exit_when_done:
+                break
+            stop.wait(poll)
+            continue
+
+        if job.run_id not in prepared:
+            prepared[job.run_id] = (build_requests(job.prompt, PromptLayout(job.layout)), AnswerKey(job.answers))
+        prompt_requests, answer_key = prepared[job.run_id]
+        done = threading.Event()
+        renewer = threading.Thread(target=keep_lease, args=(queue, job, worker, lease, done), daemon=True)
+        renewer.start()
+        try:
+            result = run_checkpointed_iterations(
+                client, job.model, prompt_requests, answer_key, [job.iteration], sampling=job.sampling
+            )[0]
+        finally:
+            done.set()
+            renewer.join()
+        last_model = job.model
+        if result.metrics is not None:
+            result.metrics.suite = job.suite
+        try:
+            accepted = queue.complete(
+                job.id, worker, result.response or None, result.answer_lines, result.scores,
+                result.metrics, result.error
+            )
+        except Exception as e:
+            log.warning(f"{worker}: could not report job {job.id}, it will be re-queued: {e}")
+            continue
+        outcome = f"failed: {result.error}" if result.error else f"{result.score:.2f}% in {result.elapsed:.2f}s"
+        if not accepted:
+            outcome += " (discarded, the lease had expired)"
+        else:
+            completed += 1
+        log.info(f"{worker}: {job.model}, {job.suite}, iteration {job.iteration}: {outcome}")
+    return completed
+
+
+def run_worker(
+    store_path: Optional[Path],
+    coordinator_url: Optional[str],
+    base_url: str,
+    name: str,
+    concurrency: int = 1,
+    lease: float = DEFAULT_LEASE,
+    poll: float = 5.0,
+    exit_when_done: bool = False
+) -> None:
+    """
+    Run queued jobs for the models of the local LM Studio server, taking
+    them from the results database or from a coordinator. Each of the
+    `concurrency` threads works on one job at a time.
+    """
+    try:
+        with ExitStack() as stack:
+            client = stack.enter_context(LMStudioClient(base_url=base_url, timeout=120, pool_size=concurrency))
+            models = [m.id for m in client.get_models().data]
+            if not models:
+                raise ValueError(f"No models available on {base_url}")
+            if coordinator_url:
+                from coordinator import RemoteQueue
+                queue = stack.enter_context(RemoteQueue(coordinator_url))
+                source = coordinator_url
+            else:
+                queue = stack.enter_context(JobQueue(store_path))
+                source = str(store_path)
+            log.info(f"Worker {name} taking jobs from {source} for: {', '.join(models)}")
+            stop = threading.Event()
+            workers = [name] if concurrency == 1 else [f"{name}/{k}" for k in range(1, concurrency + 1)]
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=concurrency))
+            futures = [
+                executor.submit(run_jobs, queue, client, worker, models, lease, poll, exit_when_done, stop)
+                for worker in workers
+            ]
+            try:
+                completed = sum(f.result() for f in futures)
+            except KeyboardInterrupt:
+                # Jobs in progress finish; unreported ones are re-queued when their lease expires
+                stop.set()
+                raise
+    except KeyboardInterrupt:
+        log.info(f"Worker {name} stopped")
+        return
+    except Exception as e:
+        log.error(f"Error running worker: {e}")
+        sys.exit(1)
+    log.info(f"Worker {name} done: {completed} jobs completed")
+
+
+def run_evaluate(
+    targets: List[str],
+    suite: Suite,
+    workers: Optional[int] = None,
+    csv_path: Optional[Path] = None,
+    json_path: Optional[Path] = None
+) -> None:
+    """Score saved model outputs from directories or glob patterns against a suite's answers."""
+    from bulk import collect_files, evaluate_files, question_accuracy, write_csv, write_json
+    paths = sorted({p for target in targets for p in collect_files(target)})
+    if not paths:
+        log.error(f"No files found for: {', '.join(targets)}")
+        sys.exit(1)
+
+    key = suite.answer_key
+    results = evaluate_files(paths, key, workers)
+    accuracies = question_accuracy(results, key)
+
+    for r in results:
+        if r.error:
+            log.info(f"{r.name} failed: {r.error}")
+        else:
+            log.info(f"{r.name} scored: {r.score:.2f}")
+
+    scored = [r for r in results if r.error is None]
+    log.info("=" * 60)
+    log.info("PER-QUESTION ACCURACY")
+    log.info("=" * 60)
+    for a in accuracies:
+        log.info(f"{a.question:>4}: {a.accuracy:6.2f}% correct ({a.correct}/{a.evaluated}), mean score {a.mean_score:.2f}%")
+    log.info("-" * 60)
+    log.info(f"Files: {len(results)} ({len(results) - len(scored)} failed)")
+    if scored:
+        log.info(f"Average Score: {sum(r.score for r in scored) / len(scored):.2f}%")
+
+    if csv_path:
+        write_csv(results, csv_path, key)
+        log.info(f"Wrote CSV summary to {csv_path}")
+    if json_path:
+        write_json(results, accuracies, json_path)
+        log.info(f"Wrote JSON summary to {json_path}")
+
+
+def run_report(
+    store_path: Path = DEFAULT_STORE_PATH,
+    query: Optional[StoreFilter] = None,
+    show_runs: bool = False,
+    show_questions: bool = False,
+    limit: int = 20
+) -> None:
+    """Summarize stored benchmark results, per model or per run."""
+    if not Path(store_path).exists():
+        log.error(f"Results store not found: {store_path}")
+        sys.exit(1)
+
+    query = query or StoreFilter()
+    with ResultsStore(store_path) as store:
+        if show_runs:
+            runs = store.runs(limit, query)
+            suite_width = max(len("Suite"), *(len(run.suite or "-") for run in runs)) if runs else len("Suite")
+            log.info(f"| {'Run':<22} | {'Started':<16} | {'Suite':<{suite_width}} | Layout       | Iterations | Failed | Prompt       | Models")
+            log.info(f"| {'-' * 22} | {'-' * 16} | {'-' * suite_width} | ------------ | ---------- | ------ | ------------ | ------")
+            for run in runs:
+                started = time.strftime("%Y-%m-%d %H:%M", time.localtime(run.started))
+                log.info(
+                    f"| {run.id:<22} | {started:<16} | {run.suite or '-':<{suite_width}} | {run.layout:<12} "
+                    f"| {run.iterations:>10d} | {run.failed:>6d} | {run.prompt_hash[:12]} | {', '.join(run.models)}"
+                )
+            return
+
+        summaries = store.model_summaries(query)
+        if not summaries:
+            log.info("No stored results match.")
+            return
+        width = max(len("Model"), *(len(s.model) for s in summaries))
+        suite_width = max(len("Suite"), *(len(s.suite or "-") for s in summaries))
+        log.info(f"| {'Suite':<{suite_width}} | {'Model':<{width}} | Score (%) | Best (%) | Worst (%) | Iterations | Runs | Latency (s) | Last run         |")
+        log.info(f"| {'-' * suite_width} | {'-' * width} | --------- | -------- | --------- | ---------- | ---- | ----------- | ---------------- |")
+        for s in summaries:
+            latency = f"{s.mean_latency:>11.2f}" if s.mean_latency is not None else f"{'-':>11}"
+            last_run = time.strftime("%Y-%m-%d %H:%M", time.localtime(s.last_run))
+            log.info(
+                f"| {s.suite or '-':<{suite_width}} | {s.model:<{width}} | {s.mean_score:>9.2f} | {s.best_score:>8.2f} "
+                f"| {s.worst_score:>9.2f} | {s.iterations:>10d} | {s.runs:>4d} | {latency} | {last_run} |"
+            )
+
+        if show_questions:
+            # Question numbers only mean something within one suite
+            for suite in dict.fromkeys(s.suite for s in summaries):
+                log.info("=" * 60)
+                log.info(f"PER-QUESTION ACCURACY: {suite or '-'}")
+                log.info("=" * 60)
+                for a in store.question_accuracy(replace(query, suites=[suite])):
+                    log.info(f"{a.question:>4}: {a.accuracy:6.2f}% correct ({a.correct}/{a.evaluated}), mean score {a.mean_score:.2f}%")
+
+
+def list_suites(registry: SuiteRegistry) -> None:
+    """List the available test suites."""
+    names = registry.names()
+    if not names:
+        log.info("No suites available.")
+        return
+    log.info(f"Available suites ({len(names)} total):")
+    log.info("=" * 60)
+    for i, name in enumerate(names, 1):
+        suite = registry.get(name)
+        log.info(f"{i:2d}. {name}{' (default)' if name == DEFAULT_SUITE else ''}")
+        if suite.title != name:
+            log.info(f"    Title: {suite.title}")
+        if suite.description:
+            log.info(f"    {suite.description}")
+        log.info("")  # Empty line for spacing
+
+
+def build_registry(suite_dirs: Optional[List[Path]]) -> SuiteRegistry:
+    """The default registry, or one that also searches --suite-dir directories first."""
+    if not suite_dirs:
+        return default_registry()
+    return SuiteRegistry([*suite_dirs, SUITES_DIR])
+
+
+def resolve_suites(registry: SuiteRegistry, spec: Optional[str]) -> List[Suite]:
+    """Turn a --suite list into suites, exiting on an unknown name."""
+    try:
+        return registry.resolve(spec)
+    except ValueError as e:
+        log.error(str(e))
+        sys.exit(1)
+
+
+def parse_since(value: str) -> float:
+    """Parse a --since date (YYYY-MM-DD, optionally with a time) to a timestamp."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD[THH:MM]")
+
+
+def parse_max_tokens_arg(value: str) -> Optional[int]:
+    """Parse a --max-tokens value: a token count, 0 for no limit, or auto."""
+    try:
+        return parse_max_tokens(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
 
 def create_model_subparser(subparsers) -> None:
     """Create the model subcommand parser."""
@@ -194,6 +1689,34 @@ def create_model_subparser(subparsers) -> None:
     )
 
 
+def create_suite_subparser(subparsers) -> None:
+    """Create the suite subcommand parser."""
+    suite_parser = subparsers.add_parser(
+        'suite',
+        help='Test suite commands'
+    )
+    
+    suite_parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List all available suites'
+    )
+    
+    add_suite_dir_argument(suite_parser)
+
+
+def add_suite_dir_argument(parser) -> None:
+    """Add the --suite-dir option shared by the suite-aware subcommands."""
+    parser.add_argument(
+        '--suite-dir',
+        type=Path,
+        action='append',
+        default=None,
+        metavar='DIR',
+        help=f'Also look for suites in this directory, before {SUITES_DIR}; can be repeated'
+    )
+
+
 def create_bench_subparser(subparsers) -> None:
     """Create the bench subcommand parser."""
     bench_parser = subparsers.add_parser(
@@ -201,31 +1724,655 @@ def create_bench_subparser(subparsers) -> None:
         help='Run benchmark evaluation with a specified model'
     )
     
-    bench_parser.add_argument(
+    model_group = bench_parser.add_mutually_exclusive_group(required=True)
+    
+    model_group.add_argument(
         '--model',
         type=str,
-        required=True,
-        help='Model name to use for the benchmark (required)'
+        nargs='+',
+        metavar='NAME[=N]',
+        help='One or more models to benchmark, each with an optional iteration count overriding -n'
+    )
+    
+    model_group.add_argument(
+        '--all',
+        action='store_true',
+        help='Benchmark every model reported by the server'
+    )
+    
+    model_group.add_argument(
+        '--resume',
+        type=str,
+        default=None,
+        metavar='RUN_ID',
+        help='Finish a stored run: run only its missing and failed iterations, '
+             'with its models, layout and streaming setting'
     )
     
     bench_parser.add_argument(
         '--base-url',
         type=str,
+        nargs='+',
         default=None,
-        help='Base URL for the LM Studio API (default: http://localhost:1234/v1)'
+        metavar='URL[=WEIGHT]',
+        help='Base URLs of one or more LM Studio servers, each with an optional weight (default 1). '
+             'Requests go to the server with the fewest in flight for its weight, and fail over '
+             'when a server errors or times out (default: http://localhost:1234/v1)'
+    )
+    
+    bench_parser.add_argument(
+        '--suite',
+        type=str,
+        default=DEFAULT_SUITE,
+        metavar='NAME[,NAME...]',
+        help=f'Comma-separated test suites to run; every model runs all of them (default: {DEFAULT_SUITE})'
     )
     
+    add_suite_dir_argument(bench_parser)
+    
     bench_parser.add_argument(
         '-n',
         type=int,
         default=1,
-        help='Number of iterations to run the benchmark (default: 1)'
+        help='Number of iterations to run per model (default: 1)'
     )
-
-
-def main() -> None:
-    """Main CLI entry point."""
-    parser = argparse.ArgumentParser(
+    
+    bench_parser.add_argument(
+        '--target-ci',
+        type=float,
+        default=None,
+        metavar='WIDTH',
+        help='Adaptive mode: keep running iterations until the 95%% confidence interval of the '
+             'average score is at most WIDTH points wide, or the model\'s ranking is settled. '
+             f'-n becomes the minimum (checks start after {MIN_ITERATIONS} scored iterations)'
+    )
+    
+    bench_parser.add_argument(
+        '--max-n',
+        type=int,
+        default=50,
+        help='Most iterations per model in adaptive mode (default: 50)'
+    )
+    
+    bench_parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Maximum number of chat completions in flight at once (default: 1)'
+    )
+    
+    bench_parser.add_argument(
+        '--warmup',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Send N unmeasured warm-up requests per model before its iterations: a tiny one that '
+             'loads the model, whose time is reported as the load time, then the prompt capped at '
+             'one token to fill the prompt cache (default: 0)'
+    )
+    
+    bench_parser.add_argument(
+        '--samples',
+        type=int,
+        default=1,
+        metavar='K',
+        help='Ask for K choices per request (the n parameter) and score each as an iteration, '
+             'so one prompt prefill serves K iterations. Servers without n fall back to one '
+             'request per choice. Not available with --stream (default: 1)'
+    )
+    
+    bench_parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream responses, record time to first token and stop as soon as Q1-Q16 are complete'
+    )
+    
+    bench_parser.add_argument(
+        '--max-tokens',
+        type=parse_max_tokens_arg,
+        default=0,
+        metavar='N',
+        help='Most tokens a model may generate per request, or auto for room for the '
+             'expected answers plus --reasoning-tokens (default: 0, no limit)'
+    )
+    
+    bench_parser.add_argument(
+        '--reasoning-tokens',
+        type=int,
+        default=DEFAULT_REASONING_TOKENS,
+        metavar='N',
+        help=f'Tokens allowed on top of the expected answers for --max-tokens auto (default: {DEFAULT_REASONING_TOKENS})'
+    )
+    
+    bench_parser.add_argument(
+        '--stop',
+        type=str,
+        action='append',
+        default=None,
+        metavar='SEQ',
+        help='Stop generating at this sequence; repeat for several'
+    )
+    
+    bench_parser.add_argument(
+        '--layout',
+        choices=[layout.value for layout in PromptLayout],
+        default=PromptLayout.SINGLE.value,
+        help='How to send the prompt: as one message (single), documents as a cacheable '
+             'system prefix plus the questions (split), or one request per question '
+             'sharing that prefix (per-question) (default: single)'
+    )
+    
+    bench_parser.add_argument(
+        '--per-question',
+        dest='layout',
+        action='store_const',
+        const=PromptLayout.PER_QUESTION.value,
+        help='Shorthand for --layout per-question'
+    )
+    
+    bench_parser.add_argument(
+        '--telemetry',
+        type=Path,
+        default=None,
+        help='Append a JSONL performance record per request to this file'
+    )
+    
+    bench_parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=None,
+        metavar='PORT',
+        help='Serve live metrics (requests in flight, iterations, latency, tokens/s, scores, '
+             'by model and endpoint) in the Prometheus text format at http://HOST:PORT/metrics '
+             'while the benchmark runs'
+    )
+    
+    bench_parser.add_argument(
+        '--transport',
+        choices=TRANSPORTS,
+        default=AUTO,
+        help='HTTP client for the requests: the standard library\'s http.client (lighter, no proxy '
+             'support), requests, or auto for http.client with plain-HTTP servers on this machine '
+             'and requests otherwise (default: auto)'
+    )
+    
+    bench_parser.add_argument(
+        '--profile',
+        type=Path,
+        default=None,
+        metavar='TRACE.json',
+        help='Time the phases of every request (serialization, network wait, response parsing, '
+             'answer extraction, scoring, cache and store access), log a summary and write them '
+             'as a Chrome trace for chrome://tracing or ui.perfetto.dev'
+    )
+    
+    bench_parser.add_argument(
+        '--profile-cpu',
+        type=Path,
+        default=None,
+        metavar='FILE.prof',
+        help='Run cProfile during answer extraction and scoring and write the stats to this file'
+    )
+    
+    bench_parser.add_argument(
+        '--profile-memory',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='Trace allocations with tracemalloc and write the final snapshot to this file'
+    )
+    
+    bench_parser.add_argument(
+        '--cache',
+        choices=[mode.value for mode in CacheMode],
+        default=CacheMode.OFF.value,
+        help='Use the on-disk response cache for reading, writing or both (default: off)'
+    )
+    
+    bench_parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=None,
+        help=f'Directory of the response cache (default: {DEFAULT_CACHE_DIR})'
+    )
+    
+    bench_parser.add_argument(
+        '--store',
+        type=Path,
+        default=DEFAULT_STORE_PATH,
+        help=f'Record runs, responses and scores in this results database (default: {DEFAULT_STORE_PATH})'
+    )
+    
+    bench_parser.add_argument(
+        '--no-store',
+        dest='store',
+        action='store_const',
+        const=None,
+        help='Do not record this run in the results database'
+    )
+
+
+def create_sweep_subparser(subparsers) -> None:
+    """Create the sweep subcommand parser."""
+    sweep_parser = subparsers.add_parser(
+        'sweep',
+        help='Benchmark one model at every combination of a grid of sampling parameters'
+    )
+    
+    sweep_parser.add_argument(
+        '--model',
+        type=str,
+        required=True,
+        help='Model to benchmark'
+    )
+    
+    sweep_parser.add_argument(
+        '--temperature',
+        type=float,
+        nargs='+',
+        default=[DEFAULT_SAMPLING["temperature"]],
+        metavar='T',
+        help=f'Temperatures to try (default: {DEFAULT_SAMPLING["temperature"]})'
+    )
+    
+    sweep_parser.add_argument(
+        '--top-p',
+        type=float,
+        nargs='+',
+        default=[1.0],
+        metavar='P',
+        help='top_p values to try (default: 1.0)'
+    )
+    
+    sweep_parser.add_argument(
+        '--max-tokens',
+        type=parse_max_tokens_arg,
+        nargs='+',
+        default=[0],
+        metavar='N',
+        help='max_tokens values to try: a token count, 0 for no limit, or auto for room for the '
+             'expected answers plus --reasoning-tokens (default: 0)'
+    )
+    
+    sweep_parser.add_argument(
+        '--reasoning-tokens',
+        type=int,
+        default=DEFAULT_REASONING_TOKENS,
+        metavar='N',
+        help=f'Tokens allowed on top of the expected answers for max_tokens auto (default: {DEFAULT_REASONING_TOKENS})'
+    )
+    
+    sweep_parser.add_argument(
+        '-n',
+        type=int,
+        default=3,
+        help='Number of iterations per combination (default: 3)'
+    )
+    
+    sweep_parser.add_argument(
+        '--base-url',
+        type=str,
+        nargs='+',
+        default=None,
+        metavar='URL[=WEIGHT]',
+        help='Base URLs of one or more LM Studio servers, as for bench (default: http://localhost:1234/v1)'
+    )
+    
+    sweep_parser.add_argument(
+        '--suite',
+        type=str,
+        default=DEFAULT_SUITE,
+        metavar='NAME',
+        help=f'Test suite to run (default: {DEFAULT_SUITE})'
+    )
+    
+    add_suite_dir_argument(sweep_parser)
+    
+    sweep_parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Maximum number of chat completions in flight at once, across all combinations (default: 1)'
+    )
+    
+    sweep_parser.add_argument(
+        '--warmup',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Send N unmeasured warm-up requests before the sweep, as for bench (default: 0)'
+    )
+    
+    sweep_parser.add_argument(
+        '--layout',
+        choices=[layout.value for layout in PromptLayout],
+        default=PromptLayout.SINGLE.value,
+        help='How to send the prompt, as for bench (default: single)'
+    )
+    
+    sweep_parser.add_argument(
+        '--telemetry',
+        type=Path,
+        default=None,
+        help='Append a JSONL performance record per request to this file'
+    )
+    
+    sweep_parser.add_argument(
+        '--store',
+        type=Path,
+        default=DEFAULT_STORE_PATH,
+        help=f'Record each combination as a run in this results database (default: {DEFAULT_STORE_PATH})'
+    )
+    
+    sweep_parser.add_argument(
+        '--no-store',
+        dest='store',
+        action='store_const',
+        const=None,
+        help='Do not record the sweep in the results database'
+    )
+
+
+def create_coordinator_subparser(subparsers) -> None:
+    """Create the coordinator subcommand parser."""
+    coordinator_parser = subparsers.add_parser(
+        'coordinator',
+        help='Queue benchmark plans for workers and serve the queue to them'
+    )
+    actions = coordinator_parser.add_subparsers(dest='action', required=True)
+    
+    plan_parser = actions.add_parser(
+        'plan',
+        help='Queue one job per iteration of every model on every suite'
+    )
+    
+    plan_parser.add_argument(
+        '--model',
+        type=str,
+        nargs='+',
+        required=True,
+        metavar='NAME[=N]',
+        help='One or more models, each with an optional iteration count overriding -n'
+    )
+    
+    plan_parser.add_argument(
+        '-n',
+        type=int,
+        default=1,
+        help='Number of iterations per model and suite (default: 1)'
+    )
+    
+    plan_parser.add_argument(
+        '--suite',
+        type=str,
+        default=DEFAULT_SUITE,
+        metavar='NAME[,NAME...]',
+        help=f'Comma-separated test suites to run (default: {DEFAULT_SUITE})'
+    )
+    
+    add_suite_dir_argument(plan_parser)
+    
+    plan_parser.add_argument(
+        '--layout',
+        choices=[layout.value for layout in PromptLayout],
+        default=PromptLayout.SINGLE.value,
+        help='How to send the prompt, as for bench (default: single)'
+    )
+    
+    plan_parser.add_argument(
+        '--max-tokens',
+        type=parse_max_tokens_arg,
+        default=0,
+        metavar='N',
+        help='Most tokens a model may generate per request, as for bench (default: 0, no limit)'
+    )
+    
+    plan_parser.add_argument(
+        '--reasoning-tokens',
+        type=int,
+        default=DEFAULT_REASONING_TOKENS,
+        metavar='N',
+        help=f'Tokens allowed on top of the expected answers for --max-tokens auto (default: {DEFAULT_REASONING_TOKENS})'
+    )
+    
+    plan_parser.add_argument(
+        '--stop',
+        type=str,
+        action='append',
+        default=None,
+        metavar='SEQ',
+        help='Stop generating at this sequence; repeat for several'
+    )
+    
+    serve_parser = actions.add_parser(
+        'serve',
+        help='Serve the job queue to workers on other machines'
+    )
+    
+    serve_parser.add_argument(
+        '--host',
+        type=str,
+        default='127.0.0.1',
+        help='Address to listen on; 0.0.0.0 for every interface (default: 127.0.0.1)'
+    )
+    
+    serve_parser.add_argument(
+        '--port',
+        type=int,
+        default=DEFAULT_COORDINATOR_PORT,
+        help=f'Port to listen on (default: {DEFAULT_COORDINATOR_PORT})'
+    )
+    
+    status_parser = actions.add_parser(
+        'status',
+        help='Show the job counts of the queued plans'
+    )
+    
+    status_parser.add_argument(
+        '--plan',
+        type=str,
+        default=None,
+        metavar='PLAN_ID',
+        help='Only show this plan'
+    )
+    
+    for action_parser in (plan_parser, serve_parser, status_parser):
+        action_parser.add_argument(
+            '--store',
+            type=Path,
+            default=DEFAULT_STORE_PATH,
+            help=f'Results database holding the job queue (default: {DEFAULT_STORE_PATH})'
+        )
+
+
+def create_worker_subparser(subparsers) -> None:
+    """Create the worker subcommand parser."""
+    worker_parser = subparsers.add_parser(
+        'worker',
+        help='Run queued benchmark jobs against a local LM Studio server'
+    )
+    
+    source_group = worker_parser.add_mutually_exclusive_group()
+    
+    source_group.add_argument(
+        '--store',
+        type=Path,
+        default=DEFAULT_STORE_PATH,
+        help=f'Take jobs from the queue in this results database, on the same machine (default: {DEFAULT_STORE_PATH})'
+    )
+    
+    source_group.add_argument(
+        '--coordinator',
+        type=str,
+        default=None,
+        metavar='URL',
+        help=f'Take jobs from a coordinator started with "coordinator serve", e.g. http://host:{DEFAULT_COORDINATOR_PORT}'
+    )
+    
+    worker_parser.add_argument(
+        '--base-url',
+        type=str,
+        default=DEFAULT_BASE_URL,
+        help=f'Base URL of the LM Studio server to run the jobs on (default: {DEFAULT_BASE_URL})'
+    )
+    
+    worker_parser.add_argument(
+        '--name',
+        type=str,
+        default=f"{socket.gethostname()}-{os.getpid()}",
+        help='Worker name shown in the coordinator status (default: HOST-PID)'
+    )
+    
+    worker_parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=1,
+        help='Number of jobs to run at once (default: 1)'
+    )
+    
+    worker_parser.add_argument(
+        '--lease',
+        type=float,
+        default=DEFAULT_LEASE,
+        metavar='SECONDS',
+        help='Lease length; the worker renews it while the job runs, and a job whose worker '
+             f'dies is re-queued once it expires (default: {DEFAULT_LEASE:g})'
+    )
+    
+    worker_parser.add_argument(
+        '--poll',
+        type=float,
+        default=5.0,
+        metavar='SECONDS',
+        help='Wait between checks while no job is queued (default: 5)'
+    )
+    
+    worker_parser.add_argument(
+        '--exit-when-done',
+        action='store_true',
+        help='Exit once no job is left to lease, instead of waiting for more'
+    )
+
+
+def create_evaluate_subparser(subparsers) -> None:
+    """Create the evaluate subcommand parser."""
+    evaluate_parser = subparsers.add_parser(
+        'evaluate',
+        help='Score saved model outputs in bulk'
+    )
+    
+    evaluate_parser.add_argument(
+        'targets',
+        nargs='+',
+        metavar='TARGET',
+        help='Directory (searched recursively) or glob pattern of saved outputs'
+    )
+    
+    evaluate_parser.add_argument(
+        '--suite',
+        type=str,
+        default=DEFAULT_SUITE,
+        help=f'Test suite whose answers to score against (default: {DEFAULT_SUITE})'
+    )
+    
+    add_suite_dir_argument(evaluate_parser)
+    
+    evaluate_parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes (default: number of CPUs)'
+    )
+    
+    evaluate_parser.add_argument(
+        '--csv',
+        type=Path,
+        default=None,
+        help='Write per-file scores to this CSV file'
+    )
+    
+    evaluate_parser.add_argument(
+        '--json',
+        type=Path,
+        default=None,
+        help='Write per-file scores and per-question accuracy to this JSON file'
+    )
+
+
+def create_report_subparser(subparsers) -> None:
+    """Create the report subcommand parser."""
+    report_parser = subparsers.add_parser(
+        'report',
+        help='Summarize stored benchmark results'
+    )
+    
+    report_parser.add_argument(
+        '--store',
+        type=Path,
+        default=DEFAULT_STORE_PATH,
+        help=f'Results database to read (default: {DEFAULT_STORE_PATH})'
+    )
+    
+    report_parser.add_argument(
+        '--model',
+        type=str,
+        nargs='+',
+        default=None,
+        help='Only include these models'
+    )
+    
+    report_parser.add_argument(
+        '--suite',
+        type=str,
+        nargs='+',
+        default=None,
+        help='Only include these suites'
+    )
+    
+    report_parser.add_argument(
+        '--run',
+        type=str,
+        default=None,
+        help='Only include this run id'
+    )
+    
+    report_parser.add_argument(
+        '--prompt',
+        type=str,
+        default=None,
+        help='Only include runs whose prompt hash starts with this'
+    )
+    
+    report_parser.add_argument(
+        '--since',
+        type=parse_since,
+        default=None,
+        help='Only include iterations from this date on (YYYY-MM-DD)'
+    )
+    
+    report_parser.add_argument(
+        '--runs',
+        action='store_true',
+        help='List runs instead of summarizing per model'
+    )
+    
+    report_parser.add_argument(
+        '--questions',
+        action='store_true',
+        help='Also show per-question accuracy'
+    )
+    
+    report_parser.add_argument(
+        '--limit',
+        type=int,
+        default=20,
+        help='Maximum number of runs to list with --runs (default: 20)'
+    )
+
+
+def main() -> None:
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(
         description='AI Test Evaluator - A tool for evaluating AI models',
         prog='ai-test-evaluator'
     )
@@ -246,9 +2393,25 @@ def main() -> None:
     # Add model subcommand
     create_model_subparser(subparsers)
     
+    # Add suite subcommand
+    create_suite_subparser(subparsers)
+    
     # Add bench subcommand
     create_bench_subparser(subparsers)
     
+    # Add sweep subcommand
+    create_sweep_subparser(subparsers)
+    
+    # Add coordinator and worker subcommands
+    create_coordinator_subparser(subparsers)
+    create_worker_subparser(subparsers)
+    
+    # Add evaluate subcommand
+    create_evaluate_subparser(subparsers)
+    
+    # Add report subcommand
+    create_report_subparser(subparsers)
+    
     # Parse arguments
     args = parser.parse_args()
     
@@ -260,9 +2423,108 @@ def main() -> None:
             print("No action specified for model command. Use --help for options.")
             sys.exit(1)
     
+    # Handle suite command
+    elif args.command == 'suite':
+        if args.list:
+            list_suites(build_registry(args.suite_dir))
+        else:
+            print("No action specified for suite command. Use --help for options.")
+            sys.exit(1)
+    
     # Handle bench command
     elif args.command == 'bench':
-        run_benchmark(args.model, args.base_url, args.n)
+        registry = build_registry(args.suite_dir)
+        if args.warmup < 0:
+            parser.error("--warmup cannot be negative")
+        try:
+            endpoints = [parse_endpoint_spec(spec) for spec in args.base_url or []]
+        except ValueError as e:
+            log.error(str(e))
+            sys.exit(1)
+        if args.resume:
+            runs, layout, stream, stopping, suite, budget, samples = load_resumed_run(args.store, args.resume)
+            suites = resolve_suites(registry, suite)
+        else:
+            if args.samples < 1:
+                parser.error("--samples must be at least 1")
+            if args.samples > 1 and args.stream:
+                parser.error("--samples cannot be combined with --stream")
+            runs = resolve_model_runs(args.model, args.all, args.n, endpoints)
+            layout, stream, samples = PromptLayout(args.layout), args.stream, args.samples
+            stopping = None
+            if args.target_ci is not None:
+                stopping = StoppingRule(target_width=args.target_ci, max_iterations=args.max_n)
+            suites = resolve_suites(registry, args.suite)
+            budget = GenerationBudget(
+                max_tokens=args.max_tokens, reasoning_tokens=args.reasoning_tokens, stop=args.stop or []
+            )
+        with profiled(args.profile, args.profile_cpu, args.profile_memory):
+            run_benchmark(
+                runs, endpoints, args.concurrency, stream,
+                CacheMode(args.cache), args.cache_dir, args.telemetry,
+                layout, args.store, args.resume, stopping, suites, budget, samples, args.warmup,
+                args.metrics_port, args.transport
+            )
+    
+    # Handle sweep command
+    elif args.command == 'sweep':
+        if args.n < 1:
+            parser.error("-n must be at least 1")
+        if args.warmup < 0:
+            parser.error("--warmup cannot be negative")
+        try:
+            points = sweep_grid(args.temperature, args.top_p, args.max_tokens)
+        except ValueError as e:
+            parser.error(str(e))
+        try:
+            endpoints = [parse_endpoint_spec(spec) for spec in args.base_url or []]
+        except ValueError as e:
+            log.error(str(e))
+            sys.exit(1)
+        suite = resolve_suites(build_registry(args.suite_dir), args.suite)[0]
+        run_sweep(
+            args.model, points, args.n, endpoints, args.concurrency, PromptLayout(args.layout),
+            suite, args.reasoning_tokens, args.warmup, args.telemetry, args.store
+        )
+    
+    # Handle coordinator command
+    elif args.command == 'coordinator':
+        if args.action == 'plan':
+            runs = resolve_model_runs(args.model, False, args.n)
+            suites = resolve_suites(build_registry(args.suite_dir), args.suite)
+            budget = GenerationBudget(
+                max_tokens=args.max_tokens, reasoning_tokens=args.reasoning_tokens, stop=args.stop or []
+            )
+            run_plan(runs, suites, PromptLayout(args.layout), budget, args.store)
+        elif args.action == 'serve':
+            run_coordinator(args.store, args.host, args.port)
+        else:
+            with JobQueue(args.store) as queue:
+                report_plans(queue.status(args.plan))
+    
+    # Handle worker command
+    elif args.command == 'worker':
+        if args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+        if args.lease <= 0:
+            parser.error("--lease must be positive")
+        run_worker(
+            args.store, args.coordinator, args.base_url, args.name,
+            args.concurrency, args.lease, args.poll, args.exit_when_done
+        )
+    
+    # Handle evaluate command
+    elif args.command == 'evaluate':
+        suite = resolve_suites(build_registry(args.suite_dir), args.suite)[0]
+        run_evaluate(args.targets, suite, args.workers, args.csv, args.json)
+    
+    # Handle report command
+    elif args.command == 'report':
+        query = StoreFilter(
+            models=args.model, suites=args.suite, run_id=args.run,
+            prompt_hash=args.prompt, since=args.since
+        )
+        run_report(args.store, query, args.runs, args.questions, args.limit)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,155 @@
+"""
+Job Queue Coordinator
+
+Gives workers on other machines access to a job queue: QueueServer is a
+small HTTP service in front of a JobQueue, and RemoteQueue is its client,
+with the same worker methods as JobQueue. Kept apart from jobqueue.py so
+that using the queue directly does not load the HTTP server.
+"""
+
+import json
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from jobqueue import DEFAULT_LEASE, Job, JobQueue, PlanStatus
+from lazy import lazy_import
+from telemetry import RequestMetrics
+
+requests = lazy_import("requests")
+
+
+class QueueHandler(BaseHTTPRequestHandler):
+    """JSON API of the coordinator: POST /lease, /renew, /complete; GET /status."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "QueueServer"
+
+    def log_message(self, format, *args):
+        # Workers poll; the coordinator logs jobs, not requests
+        pass
+
+    def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/status":
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        self._send_json(200, {"plans": [asdict(plan) for plan in self.server.queue.status()]})
+
+    def do_POST(self):
+        queue = self.server.queue
+        try:
+            request = self._read_json()
+            path = self.path.rstrip("/")
+            if path == "/lease":
+                job = queue.lease(request["worker"], request["models"], request["duration"], request.get("prefer"))
+                self._send_json(200, {"job": asdict(job) if job else None})
+            elif path == "/renew":
+                self._send_json(200, {"ok": queue.renew(request["job_id"], request["worker"], request["duration"])})
+            elif path == "/complete":
+                metrics = request.get("metrics")
+                ok = queue.complete(
+                    request["job_id"], request["worker"], request.get("response"),
+                    request.get("answer_lines"), request.get("scores"),
+                    RequestMetrics(**metrics) if metrics else None, request.get("error")
+                )
+                self._send_json(200, {"ok": ok})
+            else:
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": {"message": f"Invalid request: {e}"}})
+
+
+class QueueServer(ThreadingHTTPServer):
+    """HTTP service giving remote workers access to a job queue."""
+
+    daemon_threads = True
+
+    def __init__(self, address, queue: JobQueue):
+        super().__init__(address, QueueHandler)
+        self.queue = queue
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class RemoteQueue:
+    """Client of a QueueServer, with the worker methods of JobQueue."""
+
+    def __init__(self, url: str, timeout: int = 30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Raises:
+            requests.RequestException: If the coordinator cannot be reached or answers with an error
+        """
+        response = self.session.post(f"{self.url}{path}", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def lease(
+        self,
+        worker: str,
+        models: List[str],
+        duration: float = DEFAULT_LEASE,
+        prefer: Optional[str] = None
+    ) -> Optional[Job]:
+        job = self._post("/lease", {"worker": worker, "models": models, "duration": duration, "prefer": prefer})["job"]
+        return Job(**job) if job else None
+
+    def renew(self, job_id: int, worker: str, duration: float = DEFAULT_LEASE) -> bool:
+        return self._post("/renew", {"job_id": job_id, "worker": worker, "duration": duration})["ok"]
+
+    def complete(
+        self,
+        job_id: int,
+        worker: str,
+        response: Optional[str] = None,
+        answer_lines: Optional[List[str]] = None,
+        scores: Optional[List[float]] = None,
+        metrics: Optional[RequestMetrics] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        return self._post("/complete", {
+            "job_id": job_id,
+            "worker": worker,
+            "response": response,
+            "answer_lines": answer_lines,
+            "scores": scores,
+            "metrics": asdict(metrics) if metrics else None,
+            "error": error,
+        })["ok"]
+
+    def status(self, plan_id: Optional[str] = None) -> List[PlanStatus]:
+        response = self.session.get(f"{self.url}/status", timeout=self.timeout)
+        response.raise_for_status()
+        plans = [PlanStatus(**plan) for plan in response.json()["plans"]]
+        return [plan for plan in plans if plan_id is None or plan.plan_id == plan_id]
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - close the session."""
+        self.close()
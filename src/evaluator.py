@@ -1,64 +1,270 @@
 #!/usr/bin/env python3
-import fileinput
+import argparse
+import re
 import sys
 
+from collections import deque
 from pathlib import Path
+from typing import Iterable, Iterator, Optional, TextIO
 
-GOLD = [
-    "Q1: 2025-01-31",
-    "Q2: $2,200,000.00",
-    "Q3: CZ-799",
-    "Q4: 25MB",
-    "Q5: I don't know",
-    "Q6: No",
-    "Q7: Evelyn Reed",
-    "Q8: $1,870,000.00",
-    "Q9: General Data Protection Regulation",
-    "Q10: 3",
-    "Q11: Signal",
-    "Q12: Voice notes",
-    "Q13: 100",
-    "Q14: I don't know",
-    "Q15: 15%",
-    "Q16: $1,620,000.00",
-]
-
-def levenshtein(a: str, b: str) -> int:
+def levenshtein(a: str, b: str, max_dist: Optional[int] = None) -> int:
+    """Edit distance between a and b.
+
+    With max_dist, any distance above it is reported as max_dist + 1, which
+    lets hopeless pairs (long garbage lines) bail out early.
+    """
+    if a == b:
+        return 0
+    # Common prefix and suffix never affect the distance.
+    start = 0
+    end_a, end_b = len(a), len(b)
+    while start < end_a and start < end_b and a[start] == b[start]:
+        start += 1
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if len(a) > len(b):
+        a, b = b, a
     n, m = len(a), len(b)
-    if n == 0: return m
-    if m == 0: return n
-    prev = list(range(m + 1))
-    for i, ca in enumerate(a, 1):
-        curr = [i] + [0] * m
-        for j, cb in enumerate(b, 1):
-            curr[j] = min(
-                curr[j - 1] + 1,         # insertion
-                prev[j] + 1,             # deletion
-                prev[j - 1] + (ca != cb) # substitution
-            )
-        prev = curr
-    return prev[m]
-
-def match_line(line_pair: tuple[str, str]):
+    if max_dist is not None and m - n > max_dist:
+        return max_dist + 1
+    if n == 0:
+        return m
+    return _myers(a, b, max_dist)
+
+def _myers(a: str, b: str, max_dist: Optional[int]) -> int:
+    return _myers_search(_myers_pattern(a), len(a), b, max_dist)
+
+def _myers_pattern(a: str) -> dict[str, int]:
+    # Bit i of peq[c] is set where a[i] == c.
+    peq: dict[str, int] = {}
+    for i, ca in enumerate(a):
+        peq[ca] = peq.get(ca, 0) | (1 << i)
+    return peq
+
+def _myers_search(peq: dict[str, int], n: int, b: str, max_dist: Optional[int]) -> int:
+    # Myers/Hyyrö bit-parallel edit distance: column j of the DP matrix is
+    # kept as vertical +1/-1 delta bit-vectors over the n rows of the
+    # pattern. Python ints are unbounded, so one "word" covers a pattern of
+    # any length.
+    m = len(b)
+    mask = (1 << n) - 1
+    last = 1 << (n - 1)
+    pv, mv = mask, 0
+    dist = n
+    for j, cb in enumerate(b, 1):
+        eq = peq.get(cb, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            dist += 1
+        elif mh & last:
+            dist -= 1
+        # Row 0 of the global DP grows by one per column.
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+        # Each remaining column can lower the distance by at most one.
+        if max_dist is not None and dist - (m - j) > max_dist:
+            return max_dist + 1
+    return dist
+
+def match_line(line_pair: tuple[str, str], verbose: bool = True):
     line, gold_line = line_pair
-    total_dist = levenshtein(line, gold_line)
     max_dist = len(max(line, gold_line))
+    # Any distance >= max_dist scores 0, so there is no need to compute it exactly.
+    total_dist = levenshtein(line, gold_line, max_dist - 1) if max_dist else 0
     score = 0.0 if total_dist >= max_dist else (1 - (total_dist / max_dist)) * 100.0
     if score < 100:
         # Some extra punishment for a mismatch.
         score = score / 2
-        print(f"Mismatch in:\n\t- {gold_line}\n\t+ {line}")
+        if verbose:
+            print(f"Mismatch in:\n\t- {gold_line}\n\t+ {line}")
     return score
 
+class AnswerKey:
+    """The gold answer lines of a suite, compiled once for scoring.
+
+    Scores are the same as match_line's; the edit-distance pattern of each
+    gold line is built up front instead of for every answer compared to it.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self.lines = list(lines)
+        self.questions = [line.split(':', 1)[0] for line in self.lines]
+        self._patterns = [_myers_pattern(line) for line in self.lines]
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def distance(self, index: int, line: str, max_dist: Optional[int] = None) -> int:
+        """levenshtein(line, self.lines[index], max_dist)."""
+        gold = self.lines[index]
+        if line == gold:
+            return 0
+        n, m = len(gold), len(line)
+        if max_dist is not None and abs(m - n) > max_dist:
+            return max_dist + 1
+        if n == 0:
+            return m
+        return _myers_search(self._patterns[index], n, line, max_dist)
+
+    def score(self, index: int, line: str, verbose: bool = True) -> float:
+        """match_line((line, self.lines[index]), verbose)."""
+        gold_line = self.lines[index]
+        max_dist = len(max(line, gold_line))
+        total_dist = self.distance(index, line, max_dist - 1) if max_dist else 0
+        score = 0.0 if total_dist >= max_dist else (1 - (total_dist / max_dist)) * 100.0
+        if score < 100:
+            score = score / 2
+            if verbose:
+                print(f"Mismatch in:\n\t- {gold_line}\n\t+ {line}")
+        return score
+
+    def score_answers(self, answers: list[str], verbose: bool = True) -> list[float]:
+        """Score answers against the gold lines in order."""
+        return [self.score(i, answer, verbose) for i, answer in enumerate(answers[:len(self.lines)])]
+
+THINK_OPEN, THINK_CLOSE = "<think>", "</think>"
+ANSWER_RE = re.compile(r"Q(\d+):")
+# Longer lines are cut; no answer comes close.
+MAX_LINE = 4096
+READ_CHUNK = 1 << 16
+
+class AnswerExtractor:
+    """Streaming extractor of the last `count` "Qn:" answer lines of an output.
+
+    Text inside <think>...</think> is skipped, and a </think> without an
+    opening tag drops everything before it. Only the answers, the last
+    non-empty line and the current line are kept, so memory stays flat
+    however long the output is. With `question`, only "Q<question>:" counts.
+    """
+
+    def __init__(self, count: int, question: Optional[int] = None):
+        self.answers: deque[str] = deque(maxlen=count)
+        self.question = question
+        self.last_line = ""
+        self._line = ""
+        self._held = ""
+        self._thinking = False
+
+    def feed(self, text: str) -> None:
+        text = self._held + text
+        self._held = ""
+        pos = 0
+        while True:
+            close = text.find(THINK_CLOSE, pos)
+            opening = -1 if self._thinking else text.find(THINK_OPEN, pos)
+            if opening != -1 and (close == -1 or opening < close):
+                self._visible(text, pos, opening)
+                self._end_line()
+                self._thinking = True
+                pos = opening + len(THINK_OPEN)
+            elif close != -1:
+                # Whatever came before was reasoning.
+                self._reset()
+                self._thinking = False
+                pos = close + len(THINK_CLOSE)
+            else:
+                break
+        # Hold back a tail that may be the start of a tag split across chunks.
+        end = len(text)
+        for k in range(min(len(THINK_CLOSE) - 1, end - pos), 0, -1):
+            tail = text[end - k:]
+            if THINK_OPEN.startswith(tail) or THINK_CLOSE.startswith(tail):
+                self._held = tail
+                end -= k
+                break
+        if not self._thinking:
+            self._visible(text, pos, end)
+
+    def finish(self) -> None:
+        """Flush the held back text and the last line at the end of the output."""
+        if not self._thinking:
+            self._visible(self._held, 0, len(self._held))
+        self._held = ""
+        self._end_line()
+
+    def _visible(self, text: str, start: int, end: int) -> None:
+        while start < end:
+            nl = text.find("\n", start, end)
+            stop = end if nl == -1 else nl
+            room = MAX_LINE - len(self._line)
+            if room > 0:
+                self._line += text[start:min(stop, start + room)]
+            if nl == -1:
+                return
+            self._end_line()
+            start = nl + 1
+
+    def _end_line(self) -> None:
+        line = self._line.strip()
+        self._line = ""
+        if not line:
+            return
+        self.last_line = line
+        match = ANSWER_RE.match(line)
+        if match and (self.question is None or int(match.group(1)) == self.question):
+            self._add_answer(line)
+
+    def _add_answer(self, line: str) -> None:
+        self.answers.append(line)
+
+    def _reset(self) -> None:
+        self.answers.clear()
+        self.last_line = ""
+        self._line = ""
+
+def extract_answers(chunks: Iterable[str], count: int) -> list[str]:
+    extractor = AnswerExtractor(count)
+    for chunk in chunks:
+        extractor.feed(chunk)
+    extractor.finish()
+    return list(extractor.answers)
+
+def read_chunks(f: TextIO, size: int = READ_CHUNK) -> Iterator[str]:
+    return iter(lambda: f.read(size), "")
+
+def score_text(chunks: Iterable[str], key: AnswerKey, verbose: bool = True) -> list[float]:
+    # Missing answers score 0, as in bench, so the average is over every question.
+    answers = extract_answers(chunks, len(key))
+    answers += [""] * (len(key) - len(answers))
+    return key.score_answers(answers, verbose)
+
+def score_lines(lines: Iterable[str], key: AnswerKey, verbose: bool = True) -> list[float]:
+    return score_text((ln if ln.endswith("\n") else ln + "\n" for ln in lines), key, verbose)
+
+def input_chunks(paths: list[str]) -> Iterator[str]:
+    # Files in order, like fileinput; "-" or no files reads stdin.
+    for path in paths or ["-"]:
+        if path == "-":
+            yield from read_chunks(sys.stdin)
+            continue
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            yield from read_chunks(f)
+
 def main():
+    parser = argparse.ArgumentParser(description="Score a model's output against a suite's answer key")
+    parser.add_argument("files", nargs="*", help="Files to score (default: stdin)")
+    parser.add_argument("--suite", default=None, help="Suite whose answers to score against (default: project-cipher)")
+    args = parser.parse_args()
+
+    from suites import default_registry
+    try:
+        key = default_registry().get(args.suite).answer_key
+    except ValueError as e:
+        parser.error(str(e))
+
     name = "Stdin (unkown)"
-    if len(sys.argv) > 1:
-        name = Path(sys.argv[1]).stem
+    if args.files:
+        name = Path(args.files[0]).stem
         print("Evaluating:", name)
-    lines = [ln.rstrip("\n") for ln in fileinput.input()]
-    non_empty = [ln.strip() for ln in lines if ln.strip()][-len(GOLD):]
-    scores = list(map(match_line, zip(non_empty, GOLD)))
-    score = sum(scores) / len(scores)
+    scores = score_text(input_chunks(args.files), key)
+    score = sum(scores) / len(scores) if scores else 0.0
     print(f"{name} scored: {score:.2f}")
 
 if __name__ == "__main__":
@@ -0,0 +1,311 @@
+"""
+Distributed Job Queue
+
+Turns a benchmark plan (models x suites x iterations) into durable jobs,
+one per iteration, that worker processes lease, run against their own LM
+Studio server and complete with the raw response and scores.
+
+The queue lives in the results database. A plan records one run per
+suite, and completing a job stores its iteration in the same transaction,
+so `report` and `bench --resume` work on distributed runs as on local
+ones. A lease lasts until it expires unless the worker renews it; expired
+jobs go back to the queue the next time any worker leases, and a job
+fails for good after MAX_ATTEMPTS.
+
+Workers on the same machine can open the database directly. Workers on
+other machines reach it through the coordinator's HTTP service (see
+coordinator.py).
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from scheduler import ModelRun, schedule_models
+from store import DEFAULT_STORE_PATH, ResultsStore, new_run_id
+from telemetry import RequestMetrics
+
+DEFAULT_COORDINATOR_PORT = 8750
+
+# Seconds a lease lasts; workers renew theirs while the job runs
+DEFAULT_LEASE = 300.0
+
+# Leases a job gets before a failure or an expired lease is final
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plan_suites (
+    run_id TEXT PRIMARY KEY REFERENCES runs (id),
+    plan_id TEXT NOT NULL,
+    layout TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    answers TEXT NOT NULL,
+    sampling TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plan_suites_plan ON plan_suites (plan_id);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    plan_id TEXT NOT NULL,
+    run_id TEXT NOT NULL REFERENCES plan_suites (run_id),
+    model TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (run_id, model, iteration)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, model, id);
+CREATE INDEX IF NOT EXISTS jobs_plan ON jobs (plan_id, status);
+"""
+
+
+class JobStatus(Enum):
+    """Where a job is in its life."""
+    QUEUED = "queued"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class PlanSuite:
+    """One suite of a plan, with everything a worker needs to run and score it."""
+    name: str
+    prompt: str
+    answers: List[str]
+    prompt_hash: str
+    sampling: Dict[str, Any]
+
+
+@dataclass
+class Job:
+    """One leased iteration."""
+    id: int
+    run_id: str
+    model: str
+    iteration: int
+    suite: Optional[str]
+    layout: str
+    prompt: str
+    answers: List[str]
+    sampling: Dict[str, Any]
+    attempt: int
+
+
+@dataclass
+class PlanStatus:
+    """Job counts of one plan."""
+    plan_id: str
+    queued: int
+    leased: int
+    done: int
+    failed: int
+    # Workers holding a lease
+    workers: List[str]
+
+    @property
+    def total(self) -> int:
+        return self.queued + self.leased + self.done + self.failed
+
+
+class JobQueue(ResultsStore):
+    """
+    The results store with a job queue in it.
+
+    Every method runs in one transaction that starts with BEGIN IMMEDIATE,
+    so worker processes sharing the database never lease the same job.
+    """
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH):
+        super().__init__(path)
+        self._db.executescript(SCHEMA)
+
+    def create_plan(self, runs: List[ModelRun], suites: List[PlanSuite], layout: str) -> str:
+        """
+        Queue every iteration of every model on every suite and return the
+        plan id. Jobs are queued one model at a time, so workers going
+        through the queue in order rarely have to swap models.
+        """
+        plan_id = new_run_id()
+        batches = schedule_models(runs)
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            run_ids = []
+            for suite in suites:
+                run_id = new_run_id()
+                self._insert_run(
+                    run_id, suite.prompt_hash, layout,
+                    {
+                        "plan": plan_id,
+                        "sampling": suite.sampling,
+                        "stream": False,
+                        "samples": 1,
+                        "models": {b.model: b.iterations for b in batches},
+                    },
+                    suite.name
+                )
+                self._db.execute(
+                    "INSERT INTO plan_suites (run_id, plan_id, layout, prompt, answers, sampling) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (run_id, plan_id, layout, suite.prompt, json.dumps(suite.answers), json.dumps(suite.sampling))
+                )
+                run_ids.append(run_id)
+            self._db.executemany(
+                "INSERT INTO jobs (plan_id, run_id, model, iteration, status) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (plan_id, run_id, batch.model, iteration, JobStatus.QUEUED.value)
+                    for batch in batches
+                    for run_id in run_ids
+                    for iteration in range(1, batch.iterations + 1)
+                ]
+            )
+        return plan_id
+
+    def _finish_runs(self, run_ids: List[str]) -> None:
+        """Mark the runs whose jobs are all done or failed as finished."""
+        for run_id in set(run_ids):
+            self._db.execute(
+                "UPDATE runs SET finished = ? WHERE id = ? AND finished IS NULL AND NOT EXISTS "
+                "(SELECT 1 FROM jobs WHERE run_id = ? AND status IN (?, ?))",
+                (time.time(), run_id, run_id, JobStatus.QUEUED.value, JobStatus.LEASED.value)
+            )
+
+    def _expire_leases(self, now: float) -> None:
+        """Re-queue the jobs whose lease has expired; fail those out of attempts."""
+        expired = self._db.execute(
+            "SELECT id, run_id, model, iteration, attempts, worker FROM jobs WHERE status = ? AND lease_expires < ?",
+            (JobStatus.LEASED.value, now)
+        ).fetchall()
+        for job in expired:
+            error = f"Lease of worker {job['worker']} expired"
+            if job["attempts"] < MAX_ATTEMPTS:
+                status = JobStatus.QUEUED
+            else:
+                status = JobStatus.FAILED
+                self._insert_iteration(job["run_id"], job["model"], job["iteration"], None, None, None, None, error)
+            self._db.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_expires = NULL, error = ? WHERE id = ?",
+                (status.value, error, job["id"])
+            )
+        self._finish_runs([job["run_id"] for job in expired])
+
+    def lease(
+        self,
+        worker: str,
+        models: List[str],
+        duration: float = DEFAULT_LEASE,
+        prefer: Optional[str] = None
+    ) -> Optional[Job]:
+        """
+        Lease the next queued job for one of the models, a job for the
+        preferred model (the one the worker has loaded) first. Returns None
+        when there is no such job.
+        """
+        if not models:
+            return None
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._expire_leases(now)
+            row = self._db.execute(
+                "SELECT j.id, j.run_id, j.model, j.iteration, j.attempts, r.suite, "
+                "p.layout, p.prompt, p.answers, p.sampling "
+                "FROM jobs j JOIN plan_suites p ON p.run_id = j.run_id JOIN runs r ON r.id = j.run_id "
+                f"WHERE j.status = ? AND j.model IN ({', '.join('?' * len(models))}) "
+                "ORDER BY j.model = ? DESC, j.id LIMIT 1",
+                (JobStatus.QUEUED.value, *models, prefer)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                (JobStatus.LEASED.value, worker, now + duration, row["id"])
+            )
+        return Job(
+            id=row["id"],
+            run_id=row["run_id"],
+            model=row["model"],
+            iteration=row["iteration"],
+            suite=row["suite"],
+            layout=row["layout"],
+            prompt=row["prompt"],
+            answers=json.loads(row["answers"]),
+            sampling=json.loads(row["sampling"]),
+            attempt=row["attempts"] + 1
+        )
+
+    def renew(self, job_id: int, worker: str, duration: float = DEFAULT_LEASE) -> bool:
+        """Extend a lease; False if the worker no longer holds it."""
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time() + duration, job_id, worker, JobStatus.LEASED.value)
+            )
+        return cursor.rowcount > 0
+
+    def complete(
+        self,
+        job_id: int,
+        worker: str,
+        response: Optional[str] = None,
+        answer_lines: Optional[List[str]] = None,
+        scores: Optional[List[float]] = None,
+        metrics: Optional[RequestMetrics] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        """
+        Report the result of a leased job and store its iteration. A failed
+        job is queued again until it runs out of attempts.
+
+        Returns False, storing nothing, if the worker no longer holds the
+        lease: it expired and the job may already be running elsewhere.
+        """
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            job = self._db.execute(
+                "SELECT run_id, model, iteration, attempts FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, JobStatus.LEASED.value)
+            ).fetchone()
+            if job is None:
+                return False
+            if error is None:
+                status = JobStatus.DONE
+            elif job["attempts"] < MAX_ATTEMPTS:
+                status = JobStatus.QUEUED
+            else:
+                status = JobStatus.FAILED
+            self._db.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, lease_expires = NULL, error = ? WHERE id = ?",
+                (status.value, error, job_id)
+            )
+            if status is not JobStatus.QUEUED:
+                self._insert_iteration(
+                    job["run_id"], job["model"], job["iteration"], response, answer_lines, scores, metrics, error
+                )
+                self._finish_runs([job["run_id"]])
+        return True
+
+    def status(self, plan_id: Optional[str] = None) -> List[PlanStatus]:
+        """Job counts per plan, newest plan first, after re-queueing expired leases."""
+        with self._lock, self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._expire_leases(time.time())
+            rows = self._db.execute(
+                "SELECT plan_id, status, count(*) AS jobs, group_concat(DISTINCT worker) AS workers "
+                "FROM jobs WHERE ? IS NULL OR plan_id = ? GROUP BY plan_id, status ORDER BY plan_id DESC",
+                (plan_id, plan_id)
+            ).fetchall()
+        plans: Dict[str, PlanStatus] = {}
+        for row in rows:
+            plan = plans.setdefault(row["plan_id"], PlanStatus(row["plan_id"], 0, 0, 0, 0, []))
+            setattr(plan, row["status"], row["jobs"])
+            if row["status"] == JobStatus.LEASED.value and row["workers"]:
+                plan.workers = sorted(row["workers"].split(","))
+        return list(plans.values())
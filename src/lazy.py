@@ -0,0 +1,50 @@
+"""
+Lazy Imports
+
+Keeps heavy modules (requests, cProfile, tracemalloc, ...) out of CLI
+startup. A module imported with lazy_import is loaded the first time one of
+its attributes is used, so commands that never send a request or profile
+do not pay for it.
+"""
+
+import importlib
+import sys
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Stands in for a module until one of its attributes is first used."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._module
+        if module is None:
+            # The import system's locks make a first use from several threads safe
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> Any:
+    """
+    Import a module on first attribute access.
+
+    Only attribute access is deferred: `except module.Error` clauses and
+    annotations that name the module's types load it when evaluated, so keep
+    such annotations quoted.
+
+    Args:
+        name: Absolute module name, e.g. "requests" or "http.client"
+
+    Returns:
+        The module if it is already imported, otherwise a LazyModule for it
+    """
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
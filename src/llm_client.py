@@ -6,11 +6,17 @@ LM Studio provides an OpenAI-compatible API endpoint.
 """
 
 import json
-import requests
+import time
 from dataclasses import dataclass
-from typing import List, Optional, Dict, Any, Union
+from typing import Callable, Iterator, List, Optional, Dict, Any, Union
 from enum import Enum
 
+from lazy import lazy_import
+from profiling import span
+from transport import AUTO, Transport, create_transport
+
+requests = lazy_import("requests")
+
 
 class Role(Enum):
     """Message roles for chat completion."""
@@ -29,7 +35,9 @@ class Message:
 @dataclass
 class CompletionUsage:
     """Token usage information for a completion."""
-    prompt_tokens: int
+    # None on all but the first choice of a call with several, which
+    # carries the call's prompt
+    prompt_tokens: Optional[int]
     completion_tokens: int
     total_tokens: int
 
@@ -69,7 +77,254 @@ class ModelsResponse:
     data: List[ModelInfo]
 
 
-class LMStudioClient:
+class ChatStream:
+    """
+    Iterator over the content deltas of a streaming chat completion.
+    
+    Metadata (id, model, finish reason, usage) is filled in as chunks arrive.
+    time_to_first_token is measured from just before the request was sent
+    to the first non-empty content delta.
+    """
+    
+    def __init__(self, response: Any, start_time: float):
+        self.response = response
+        self.start_time = start_time
+        self.time_to_first_token: Optional[float] = None
+        self.id = ""
+        self.created = 0
+        self.model = ""
+        self.finish_reason: Optional[str] = None
+        self.usage: Optional[CompletionUsage] = None
+        # Called once when the stream is closed
+        self.on_close: Optional[Callable[[], None]] = None
+        # The error the stream ended with, if it failed partway
+        self.error: Optional[Exception] = None
+        self._parts: List[str] = []
+    
+    def __iter__(self) -> Iterator[str]:
+        done = False
+        try:
+            for raw_line in self.response.iter_lines(chunk_size=None):
+                # Keep reading after [DONE] to the end of the body, so the
+                # connection goes back to the pool instead of being dropped
+                if done:
+                    continue
+                delta = self._handle_line(raw_line)
+                if delta is None:
+                    done = True
+                elif delta:
+                    yield delta
+        except GeneratorExit:
+            # Stopped early by the caller. Matched first so that the clause
+            # below, which loads requests, is not evaluated
+            raise
+        except requests.RequestException as e:
+            self.error = requests.RequestException(f"LM Studio API request failed: {e}", response=e.response)
+            raise self.error
+        except (KeyError, TypeError, ValueError) as e:
+            self.error = ValueError(f"Invalid response format from LM Studio API: {e}")
+            raise self.error
+        finally:
+            self.close()
+    
+    def _handle_line(self, raw_line: bytes) -> Optional[str]:
+        """Process one SSE line; return its content delta, or None at the end of the stream."""
+        if not raw_line.startswith(b"data:"):
+            # Blank separators, comments and event names
+            return ""
+        data = raw_line[5:].strip()
+        if data == b"[DONE]":
+            return None
+        delta = self._handle_chunk(json.loads(data))
+        if delta:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self.start_time
+            self._parts.append(delta)
+        return delta
+    
+    def _handle_chunk(self, chunk: Dict[str, Any]) -> str:
+        """Record chunk metadata and return its content delta."""
+        self.id = chunk.get("id", self.id)
+        self.created = chunk.get("created", self.created)
+        self.model = chunk.get("model", self.model)
+        
+        usage_data = chunk.get("usage")
+        if usage_data:
+            self.usage = CompletionUsage(
+                prompt_tokens=usage_data["prompt_tokens"],
+                completion_tokens=usage_data["completion_tokens"],
+                total_tokens=usage_data["total_tokens"]
+            )
+        
+        delta = ""
+        for choice_data in chunk.get("choices", []):
+            if choice_data.get("index", 0) != 0:
+                continue
+            delta = choice_data.get("delta", {}).get("content") or ""
+            if choice_data.get("finish_reason"):
+                self.finish_reason = choice_data["finish_reason"]
+        return delta
+    
+    @property
+    def content(self) -> str:
+        """All content received so far."""
+        return "".join(self._parts)
+    
+    def to_response(self) -> CompletionResponse:
+        """Assemble the content received so far into a CompletionResponse."""
+        message = Message(role=Role.ASSISTANT, content=self.content)
+        # Servers that ignore stream_options send no usage; report zeros then
+        usage = self.usage or CompletionUsage(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+        return CompletionResponse(
+            id=self.id,
+            object="chat.completion",
+            created=self.created,
+            model=self.model,
+            choices=[CompletionChoice(index=0, message=message, finish_reason=self.finish_reason)],
+            usage=usage
+        )
+    
+    def close(self) -> None:
+        """Close the connection, stopping generation on the server."""
+        self.response.close()
+        on_close, self.on_close = self.on_close, None
+        if on_close is not None:
+            on_close()
+    
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - close the connection."""
+        self.close()
+
+
+class _LMStudioClientBase:
+    """
+    Transport-independent parts of the LM Studio clients: request payloads,
+    response parsing and error reporting.
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:1234/v1",
+        timeout: int = 30,
+        api_key: Optional[str] = None
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.api_key = api_key
+    
+    def _build_payload(
+        self,
+        messages: List[Message],
+        model: Optional[str],
+        temperature: float,
+        max_tokens: Optional[int],
+        top_p: float,
+        frequency_penalty: float,
+        presence_penalty: float,
+        stream: bool,
+        stop: Optional[Union[str, List[str]]],
+        n: int = 1
+    ) -> Dict[str, Any]:
+        """Build the JSON body of a chat completion request."""
+        # Convert messages to dict format
+        message_dicts = [
+            {"role": msg.role.value, "content": msg.content}
+            for msg in messages
+        ]
+        
+        payload: Dict[str, Any] = {
+            "messages": message_dicts,
+            "temperature": temperature,
+            "top_p": top_p,
+            "frequency_penalty": frequency_penalty,
+            "presence_penalty": presence_penalty,
+            "stream": stream
+        }
+        
+        # Add optional parameters
+        if model:
+            payload["model"] = model
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        if stop:
+            payload["stop"] = stop
+        if n > 1:
+            payload["n"] = n
+        if stream:
+            # Ask for a final chunk carrying token usage
+            payload["stream_options"] = {"include_usage": True}
+        
+        return payload
+    
+    def _format_error(self, status_code: int, reason: str, url: str, body: str) -> str:
+        """Describe a failed API response, including the server's error message if any."""
+        try:
+            error_data = json.loads(body)
+        except ValueError:
+            # If we can't parse the error response as JSON
+            return f"LM Studio API request failed: {status_code} {reason} for url: {url}\nResponse: {body[:500]}"
+        error_msg = f"LM Studio API request failed: {status_code} {reason} for url: {url}"
+        if isinstance(error_data, dict) and 'error' in error_data:
+            error_msg += f"\nServer error: {error_data['error']}"
+            if isinstance(error_data['error'], dict) and 'message' in error_data['error']:
+                error_msg += f" - {error_data['error']['message']}"
+        return error_msg
+    
+    def _parse_completion_response(self, data: Dict[str, Any]) -> CompletionResponse:
+        """Parse the API response into a CompletionResponse dataclass."""
+        choices = []
+        for choice_data in data["choices"]:
+            message_data = choice_data["message"]
+            message = Message(
+                role=Role(message_data["role"]),
+                content=message_data["content"]
+            )
+            choice = CompletionChoice(
+                index=choice_data["index"],
+                message=message,
+                finish_reason=choice_data.get("finish_reason")
+            )
+            choices.append(choice)
+        
+        usage_data = data["usage"]
+        usage = CompletionUsage(
+            prompt_tokens=usage_data["prompt_tokens"],
+            completion_tokens=usage_data["completion_tokens"],
+            total_tokens=usage_data["total_tokens"]
+        )
+        
+        return CompletionResponse(
+            id=data["id"],
+            object=data["object"],
+            created=data["created"],
+            model=data["model"],
+            choices=choices,
+            usage=usage
+        )
+    
+    def _parse_models_response(self, data: Dict[str, Any]) -> ModelsResponse:
+        """Parse the models API response into a ModelsResponse dataclass."""
+        models = []
+        for model_data in data["data"]:
+            model = ModelInfo(
+                id=model_data["id"],
+                object=model_data.get("object", "model"),
+                created=model_data.get("created", 0),
+                owned_by=model_data.get("owned_by", "unknown")
+            )
+            models.append(model)
+        
+        return ModelsResponse(
+            object=data["object"],
+            data=models
+        )
+
+
+class LMStudioClient(_LMStudioClientBase):
     """
     Client for interacting with LM Studio's local API server.
     
@@ -81,7 +336,9 @@ class LMStudioClient:
         self, 
         base_url: str = "http://localhost:1234/v1",
         timeout: int = 30,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        pool_size: int = 10,
+        transport: Union[str, Transport] = AUTO
     ):
         """
         Initialize the LM Studio client.
@@ -90,16 +347,22 @@ class LMStudioClient:
             base_url: Base URL for the LM Studio API server
             timeout: Request timeout in seconds
             api_key: Optional API key (usually not needed for local LM Studio)
+            pool_size: Maximum number of pooled connections kept open to the
+                server; should be at least the number of threads sharing
+                this client
+            transport: HTTP transport, or the name of one: "requests",
+                "http.client", or "auto" for http.client with plain-HTTP
+                servers on this machine and requests otherwise
         """
-        self.base_url = base_url.rstrip('/')
-        self.timeout = timeout
-        self.api_key = api_key
+        super().__init__(base_url=base_url, timeout=timeout, api_key=api_key)
         
-        # Set up session for connection reuse
-        self.session = requests.Session()
+        # Set up the transport for connection reuse
+        headers = {"Content-Type": "application/json"}
         if api_key:
-            self.session.headers.update({"Authorization": f"Bearer {api_key}"})
-        self.session.headers.update({"Content-Type": "application/json"})
+            headers["Authorization"] = f"Bearer {api_key}"
+        if isinstance(transport, str):
+            transport = create_transport(transport, self.base_url, headers, pool_size=pool_size)
+        self.transport = transport
     
     def chat_completion(
         self,
@@ -111,7 +374,8 @@ class LMStudioClient:
         frequency_penalty: float = 0.0,
         presence_penalty: float = 0.0,
         stream: bool = False,
-        stop: Optional[Union[str, List[str]]] = None
+        stop: Optional[Union[str, List[str]]] = None,
+        n: int = 1
     ) -> CompletionResponse:
         """
         Create a chat completion using the LM Studio API.
@@ -124,72 +388,131 @@ class LMStudioClient:
             top_p: Nucleus sampling parameter
             frequency_penalty: Frequency penalty (-2.0 to 2.0)
             presence_penalty: Presence penalty (-2.0 to 2.0)
-            stream: Whether to stream the response
+            stream: Whether to stream the response; the streamed deltas are
+                assembled into a single CompletionResponse
             stop: Stop sequences
+            n: Number of choices to generate for the prompt; servers that
+                do not support it return a single choice. Not available
+                with stream
             
         Returns:
             CompletionResponse object with the API response
             
         Raises:
             requests.RequestException: If the API request fails
-            ValueError: If the response format is invalid
+            ValueError: If the response format is invalid, or n > 1 with stream
         """
+        if stream and n > 1:
+            raise ValueError("Several choices (n > 1) cannot be streamed")
+        if stream:
+            with self.stream_chat_completion(
+                messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=top_p,
+                frequency_penalty=frequency_penalty,
+                presence_penalty=presence_penalty,
+                stop=stop
+            ) as chat_stream:
+                for _ in chat_stream:
+                    pass
+                return chat_stream.to_response()
+
         url = f"{self.base_url}/chat/completions"
-        
-        # Convert messages to dict format
-        message_dicts = [
-            {"role": msg.role.value, "content": msg.content}
-            for msg in messages
-        ]
-        
-        payload: Dict[str, Any] = {
-            "messages": message_dicts,
-            "temperature": temperature,
-            "top_p": top_p,
-            "frequency_penalty": frequency_penalty,
-            "presence_penalty": presence_penalty,
-            "stream": stream
-        }
-        
-        # Add optional parameters
-        if model:
-            payload["model"] = model
-        if max_tokens:
-            payload["max_tokens"] = max_tokens
-        if stop:
-            payload["stop"] = stop
+        # Serialized here rather than by the transport, so it can be timed apart
+        # from the network wait
+        with span("serialize", "client"):
+            payload = self._build_payload(
+                messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=top_p,
+                frequency_penalty=frequency_penalty,
+                presence_penalty=presence_penalty,
+                stream=False,
+                stop=stop,
+                n=n
+            )
+            body = json.dumps(payload).encode("utf-8")
         
         try:
-            response = self.session.post(
-                url,
-                json=payload,
-                timeout=self.timeout
-            )
+            with span("http", "client", model=model):
+                response = self.transport.request("POST", url, body, timeout=self.timeout)
+            self._raise_for_error(response, url)
             
-            # Check if the response is an error and log the details
-            if not response.ok:
-                try:
-                    error_data = response.json()
-                    error_msg = f"LM Studio API request failed: {response.status_code} {response.reason} for url: {url}"
-                    if 'error' in error_data:
-                        error_msg += f"\nServer error: {error_data['error']}"
-                        if isinstance(error_data['error'], dict) and 'message' in error_data['error']:
-                            error_msg += f" - {error_data['error']['message']}"
-                    raise requests.RequestException(error_msg)
-                except ValueError:
-                    # If we can't parse the error response as JSON
-                    raise requests.RequestException(f"LM Studio API request failed: {response.status_code} {response.reason} for url: {url}\nResponse: {response.text[:500]}")
-            
-            response.raise_for_status()
-            
-            data = response.json()
-            return self._parse_completion_response(data)
+            with span("decode_json", "client"):
+                data = response.json()
+            with span("parse_response", "client"):
+                return self._parse_completion_response(data)
             
         except requests.RequestException as e:
-            raise requests.RequestException(f"LM Studio API request failed: {e}")
+            raise requests.RequestException(f"LM Studio API request failed: {e}", response=e.response)
         except (KeyError, TypeError, ValueError) as e:
             raise ValueError(f"Invalid response format from LM Studio API: {e}")
     
+    def stream_chat_completion(
+        self,
+        messages: List[Message],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        top_p: float = 1.0,
+        frequency_penalty: float = 0.0,
+        presence_penalty: float = 0.0,
+        stop: Optional[Union[str, List[str]]] = None
+    ) -> "ChatStream":
+        """
+        Create a streaming chat completion using Server-Sent Events.
+        
+        The returned ChatStream yields content deltas as they arrive. Closing
+        it (or leaving its context manager) drops the connection, which makes
+        the server stop generating.
+        
+        Args:
+            Same as chat_completion, minus stream
+            
+        Returns:
+            ChatStream over the response body
+            
+        Raises:
+            requests.RequestException: If the API request fails
+        """
+        url = f"{self.base_url}/chat/completions"
+        with span("serialize", "client"):
+            payload = self._build_payload(
+                messages,
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                top_p=top_p,
+                frequency_penalty=frequency_penalty,
+                presence_penalty=presence_penalty,
+                stream=True,
+                stop=stop
+            )
+            body = json.dumps(payload).encode("utf-8")
+        
+        start_time = time.perf_counter()
+        try:
+            # Until the response headers; the body is read as it streams
+            with span("http_headers", "client", model=model):
+                response = self.transport.request("POST", url, body, timeout=self.timeout, stream=True)
+            self._raise_for_error(response, url)
+        except requests.RequestException as e:
+            raise requests.RequestException(f"LM Studio API request failed: {e}", response=e.response)
+        
+        return ChatStream(response, start_time)
+    
+    def _raise_for_error(self, response: Any, url: str) -> None:
+        """Raise a RequestException with the server's error details if the response failed."""
+        if not response.ok:
+            raise requests.RequestException(
+                self._format_error(response.status_code, response.reason, url, response.text),
+                response=response
+            )
+    
     def get_models(self) -> ModelsResponse:
         """
         Get list of available models from LM Studio.
@@ -204,17 +527,38 @@ class LMStudioClient:
         url = f"{self.base_url}/models"
         
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = self.transport.request("GET", url, timeout=self.timeout)
             response.raise_for_status()
             
             data = response.json()
             return self._parse_models_response(data)
             
         except requests.RequestException as e:
-            raise requests.RequestException(f"LM Studio API request failed: {e}")
+            raise requests.RequestException(f"LM Studio API request failed: {e}", response=e.response)
         except (KeyError, TypeError, ValueError) as e:
             raise ValueError(f"Invalid response format from LM Studio API: {e}")
     
+    def get_loaded_models(self) -> List[str]:
+        """
+        Get the ids of the models LM Studio currently has loaded, from its
+        REST API (/api/v0/models).
+
+        Returns:
+            The loaded model ids; empty if the server does not have that
+            API (other OpenAI-compatible servers, older LM Studio) or the
+            request fails, since the loaded models are only a hint
+        """
+        root = self.base_url[:-len("/v1")] if self.base_url.endswith("/v1") else self.base_url
+        try:
+            response = self.transport.request("GET", f"{root}/api/v0/models", timeout=self.timeout)
+            # Read whole either way, so the connection goes back to the pool
+            body = response.content
+            if not response.ok:
+                return []
+            return [m["id"] for m in json.loads(body)["data"] if m.get("state") == "loaded"]
+        except (KeyError, TypeError, ValueError, requests.RequestException):
+            return []
+    
     def simple_chat(
         self, 
         user_message: str, 
@@ -246,59 +590,14 @@ class LMStudioClient:
         else:
             return ""
     
-    def _parse_completion_response(self, data: Dict[str, Any]) -> CompletionResponse:
-        """Parse the API response into a CompletionResponse dataclass."""
-        choices = []
-        for choice_data in data["choices"]:
-            message_data = choice_data["message"]
-            message = Message(
-                role=Role(message_data["role"]),
-                content=message_data["content"]
-            )
-            choice = CompletionChoice(
-                index=choice_data["index"],
-                message=message,
-                finish_reason=choice_data.get("finish_reason")
-            )
-            choices.append(choice)
-        
-        usage_data = data["usage"]
-        usage = CompletionUsage(
-            prompt_tokens=usage_data["prompt_tokens"],
-            completion_tokens=usage_data["completion_tokens"],
-            total_tokens=usage_data["total_tokens"]
-        )
-        
-        return CompletionResponse(
-            id=data["id"],
-            object=data["object"],
-            created=data["created"],
-            model=data["model"],
-            choices=choices,
-            usage=usage
-        )
-    
-    def _parse_models_response(self, data: Dict[str, Any]) -> ModelsResponse:
-        """Parse the models API response into a ModelsResponse dataclass."""
-        models = []
-        for model_data in data["data"]:
-            model = ModelInfo(
-                id=model_data["id"],
-                object=model_data.get("object", "model"),
-                created=model_data.get("created", 0),
-                owned_by=model_data.get("owned_by", "unknown")
-            )
-            models.append(model)
-        
-        return ModelsResponse(
-            object=data["object"],
-            data=models
-        )
-    
     def __enter__(self):
         """Context manager entry."""
         return self
     
+    def close(self) -> None:
+        """Close the transport's pooled connections."""
+        self.transport.close()
+    
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit - close the session."""
-        self.session.close()
\ No newline at end of file
+        """Context manager exit - close the transport."""
+        self.close()
\ No newline at end of file
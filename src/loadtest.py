@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Harness Load Test
+
+Drives the benchmark's request path (client, answer extraction and
+scoring) against the mock server at several concurrency levels and
+reports throughput and the harness's own per-request overhead, i.e. the
+latency beyond the time the server was told to spend. No GPU is needed,
+so a regression in the client's hot path shows up in CI.
+
+    python loadtest.py --requests 200 --concurrency 1,4,16 --stream
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+from async_llm_client import AsyncLMStudioClient
+from cli import DEFAULT_SAMPLING, extract_answer_lines, run_iteration
+from llm_client import LMStudioClient
+from mock_server import MockConfig, serve_in_thread, tokenize
+from prompts import PromptLayout, build_requests
+from suites import default_registry
+from telemetry import percentile
+
+
+def loadtest_prompt(questions: int) -> str:
+    """
+    A small prompt in the benchmark's format; the prompt size only matters
+    to the server, whose processing time is simulated.
+    """
+    return "Answer the questions.\n\n### Questions\n\n" + "\n".join(
+        f"Q{i}: Question {i}?" for i in range(1, questions + 1)
+    )
+
+
+@dataclass
+class LoadTestResult:
+    """Measurements for one concurrency level."""
+    client: str
+    concurrency: int
+    requests: int
+    failures: int
+    wall_time: float
+    throughput: float
+    latency_mean: float
+    latency_p95: float
+    overhead_mean_ms: float
+    overhead_p95_ms: float
+
+
+def expected_server_time(config: MockConfig) -> float:
+    """Time the mock server spends on one completion by design."""
+    tokens = len(tokenize(config.answer_for([])))
+    generation = tokens / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+    return config.latency + generation
+
+
+def run_sync(base_url: str, requests: int, concurrency: int, stream: bool) -> List[Optional[float]]:
+    """Run the benchmark iteration path on a thread pool; return per-request latencies (None on failure)."""
+    key = default_registry().get().answer_key
+    prompt_requests = build_requests(loadtest_prompt(len(key)), PromptLayout.SINGLE)
+
+    def one(iteration: int) -> Optional[float]:
+        try:
+            return run_iteration(client, "mock-model", prompt_requests, key, iteration, stream).elapsed
+        except Exception:
+            return None
+
+    with LMStudioClient(base_url=base_url, timeout=60, pool_size=concurrency) as client, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(one, range(1, requests + 1)))
+
+
+def run_async(base_url: str, requests: int, concurrency: int, stream: bool) -> List[Optional[float]]:
+    """Run requests with the asyncio client; return per-request latencies (None on failure)."""
+    key = default_registry().get().answer_key
+    prompt_request = build_requests(loadtest_prompt(len(key)), PromptLayout.SINGLE)[0]
+
+    async def main() -> List[Optional[float]]:
+        async with AsyncLMStudioClient(base_url=base_url, timeout=60, pool_size=concurrency) as client:
+            slots = asyncio.Semaphore(concurrency)
+
+            async def one() -> Optional[float]:
+                async with slots:
+                    start = time.perf_counter()
+                    try:
+                        response = await client.chat_completion(
+                            prompt_request.messages, model="mock-model", stream=stream, **DEFAULT_SAMPLING
+                        )
+                    except Exception:
+                        return None
+                    content = response.choices[0].message.content
+                    key.score_answers(extract_answer_lines(content, len(key)), verbose=False)
+                    return time.perf_counter() - start
+
+            return await asyncio.gather(*(one() for _ in range(requests)))
+
+    return asyncio.run(main())
+
+
+def load_test(
+    base_url: str,
+    config: MockConfig,
+    client: str,
+    requests: int,
+    concurrency: int,
+    stream: bool
+) -> LoadTestResult:
+    """Measure one concurrency level."""
+    runner = run_async if client == "async" else run_sync
+    start = time.perf_counter()
+    latencies = runner(base_url, requests, concurrency, stream)
+    wall_time = time.perf_counter() - start
+
+    succeeded = [latency for latency in latencies if latency is not None]
+    server_time = expected_server_time(config)
+    overheads = [max(0.0, latency - server_time) * 1000 for latency in succeeded] or [0.0]
+    succeeded = succeeded or [0.0]
+    return LoadTestResult(
+        client=client,
+        concurrency=concurrency,
+        requests=requests,
+        failures=sum(1 for latency in latencies if latency is None),
+        wall_time=wall_time,
+        throughput=requests / wall_time if wall_time > 0 else 0.0,
+        latency_mean=sum(succeeded) / len(succeeded),
+        latency_p95=percentile(succeeded, 95),
+        overhead_mean_ms=sum(overheads) / len(overheads),
+        overhead_p95_ms=percentile(overheads, 95)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the benchmark harness against the mock server")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level (default: 200)")
+    parser.add_argument("--concurrency", type=str, default="1,4,16",
+                        help="Comma-separated concurrency levels (default: 1,4,16)")
+    parser.add_argument("--client", choices=["sync", "async"], default="sync",
+                        help="Client to drive: the bench thread pool path or AsyncLMStudioClient (default: sync)")
+    parser.add_argument("--stream", action="store_true", help="Use streaming completions")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock server time to first token (default: 0)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Mock server generation speed, 0 for instant (default: 0)")
+    parser.add_argument("--base-url", type=str, default=None,
+                        help="Use an already running mock server (started with the same --latency and "
+                             "--tokens-per-second) instead of an in-process one")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--max-overhead-ms", type=float, default=None,
+                        help="Exit with status 1 if the mean overhead at any level exceeds this")
+    args = parser.parse_args()
+
+    logging.getLogger("cli").setLevel(logging.WARNING)
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    config = MockConfig(latency=args.latency, tokens_per_second=args.tokens_per_second)
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = serve_in_thread(config)
+        base_url = server.base_url
+
+    try:
+        results = [
+            load_test(base_url, config, args.client, args.requests, level, args.stream)
+            for level in levels
+        ]
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        print(f"Client: {args.client}, streaming: {'on' if args.stream else 'off'}, "
+              f"server time per request: {expected_server_time(config) * 1000:.1f}ms")
+        print(f"{'Concurrency':>11} {'Requests':>8} {'Failed':>6} {'Req/s':>8} "
+              f"{'Latency':>9} {'p95':>9} {'Overhead':>9} {'p95':>9}")
+        for r in results:
+            print(f"{r.concurrency:>11d} {r.requests:>8d} {r.failures:>6d} {r.throughput:>8.1f} "
+                  f"{r.latency_mean * 1000:>7.1f}ms {r.latency_p95 * 1000:>7.1f}ms "
+                  f"{r.overhead_mean_ms:>7.2f}ms {r.overhead_p95_ms:>7.2f}ms")
+
+    if args.max_overhead_ms is not None:
+        worst = max(r.overhead_mean_ms for r in results)
+        if worst > args.max_overhead_ms:
+            print(f"Mean overhead {worst:.2f}ms exceeds the limit of {args.max_overhead_ms:.2f}ms", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
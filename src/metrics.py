@@ -0,0 +1,244 @@
+"""
+Live Benchmark Metrics
+
+Counters, gauges and histograms of a running benchmark, served in the
+Prometheus text format so dashboards can follow harness throughput and
+server saturation while the run is going.
+
+Updates happen on the request path, so they are kept cheap: one lock per
+metric, a dict lookup for the label values and, for histograms, a bisect
+into the bucket bounds. Rendering takes the same locks only long enough to
+copy the values.
+"""
+
+import bisect
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+TOKENS_PER_SECOND_BUCKETS = (5, 10, 20, 40, 60, 80, 100, 150, 200, 400)
+SCORE_BUCKETS = (0, 25, 50, 75, 90, 95, 99, 100)
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        for value in values
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class Metric(ABC):
+    """A named metric with one value per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(name suffix, label names, label values, value) of every sample."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(names, values)} {format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return [("", self.labels, key, value) for key, value in values]
+
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *values: str, amount: float = 1.0) -> None:
+        self.inc(*values, amount=-amount)
+
+    def set(self, *values: str, value: float) -> None:
+        with self._lock:
+            self._values[values] = value
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: count per bucket (the last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, *values: str, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(values, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        names = self.labels + ("le",)
+        samples = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                samples.append(("_bucket", names, (*key, format_value(bound)), cumulative))
+            samples.append(("_sum", self.labels, key, total))
+            samples.append(("_count", self.labels, key, cumulative))
+        return samples
+
+
+class BenchmarkMetrics:
+    """The metrics of a benchmark run, and the events that update them."""
+
+    def __init__(self):
+        self.requests_in_flight = Gauge(
+            "bench_requests_in_flight", "Chat completions in flight", ("model", "endpoint")
+        )
+        self.requests = Counter(
+            "bench_requests_total", "Chat completions sent, by outcome", ("model", "endpoint", "outcome")
+        )
+        self.request_seconds = Histogram(
+            "bench_request_seconds", "Chat completion latency in seconds", ("model", "endpoint")
+        )
+        self.iterations = Counter(
+            "bench_iterations_total", "Finished iterations, by outcome", ("model", "suite", "outcome")
+        )
+        self.iteration_seconds = Histogram(
+            "bench_iteration_seconds", "Iteration request time in seconds", ("model", "suite")
+        )
+        self.decode_tokens_per_second = Histogram(
+            "bench_decode_tokens_per_second", "Decode speed of scored iterations", ("model", "suite"),
+            buckets=TOKENS_PER_SECOND_BUCKETS
+        )
+        self.score = Histogram(
+            "bench_score_percent", "Score of scored iterations", ("model", "suite"), buckets=SCORE_BUCKETS
+        )
+        self.all = [
+            self.requests_in_flight, self.requests, self.request_seconds, self.iterations,
+            self.iteration_seconds, self.decode_tokens_per_second, self.score,
+        ]
+
+    def request_started(self, model: Optional[str], endpoint: str) -> None:
+        self.requests_in_flight.inc(model or "", endpoint)
+
+    def request_finished(self, model: Optional[str], endpoint: str, seconds: float, failed: bool = False) -> None:
+        model = model or ""
+        self.requests_in_flight.dec(model, endpoint)
+        self.requests.inc(model, endpoint, "error" if failed else "ok")
+        if not failed:
+            self.request_seconds.observe(model, endpoint, value=seconds)
+
+    def iteration_finished(
+        self,
+        model: str,
+        suite: Optional[str],
+        elapsed: float,
+        score: Optional[float] = None,
+        decode_tokens_per_second: Optional[float] = None
+    ) -> None:
+        """Count an iteration; a score of None means it failed."""
+        suite = suite or ""
+        self.iterations.inc(model, suite, "failed" if score is None else "ok")
+        if score is None:
+            return
+        self.iteration_seconds.observe(model, suite, value=elapsed)
+        self.score.observe(model, suite, value=score)
+        if decode_tokens_per_second is not None:
+            self.decode_tokens_per_second.observe(model, suite, value=decode_tokens_per_second)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.all) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics."""
+
+    server: "MetricsServer"
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would drown the benchmark log
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Background HTTP server exposing benchmark metrics for scraping."""
+
+    daemon_threads = True
+
+    def __init__(self, address, metrics: BenchmarkMetrics):
+        super().__init__(address, MetricsHandler)
+        self.metrics = metrics
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        """Context manager entry - start serving."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - stop serving."""
+        self.close()
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Harness Microbenchmarks
+
+Times the CPU hot paths of the harness in isolation: edit distance and
+line matching, scoring a suite's answers, answer-line extraction from
+small and huge responses, parsing completion responses and building
+request payloads. Everything runs in-process on canned inputs, so no
+server or network is needed.
+
+Results can be saved as a baseline, which is kept in the repository, and
+later runs compared with it; a benchmark whose best time grew by more
+than the threshold is a regression and makes the comparison exit with
+status 1.
+
+    python microbench.py                  # run and print
+    python microbench.py -k extract       # only benchmarks whose name contains "extract"
+    python microbench.py --save           # record a new baseline
+    python microbench.py --compare        # compare with the baseline
+
+Timings depend on the machine and the Python version, so record the
+baseline on the machine the comparisons run on. Times are compared in
+units of a reference loop timed alongside each benchmark, which evens
+out a CPU that runs slower or faster from one minute to the next; on
+shared machines, re-run a flagged benchmark alone with -k before
+trusting it.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import timeit
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from cli import DEFAULT_SAMPLING, extract_answer_lines
+from evaluator import AnswerKey, extract_answers, levenshtein, match_line
+from llm_client import _LMStudioClientBase
+from mock_server import correct_answer
+from prompts import PromptLayout, build_requests
+from suites import default_registry
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "microbench_baseline.json"
+
+# A benchmark whose best time grows by more than this fraction regresses
+DEFAULT_THRESHOLD = 0.25
+
+# Seconds each timing round runs for at least, and rounds per benchmark
+MIN_TIME = 0.2
+REPEAT = 5
+
+# Size of the reasoning block of the huge responses, and of their chunks
+HUGE_REASONING = 1_000_000
+STREAM_CHUNK = 64
+
+
+@dataclass
+class MicroResult:
+    """
+    Per-call timings of one benchmark, over REPEAT rounds, and the best
+    time of the reference loop timed in between them.
+    """
+    name: str
+    loops: int
+    best_ns: float
+    median_ns: float
+    reference_ns: float
+
+
+@dataclass
+class Comparison:
+    """A benchmark's best time against the baseline's."""
+    name: str
+    baseline_ns: Optional[float]
+    current_ns: float
+    baseline_reference_ns: Optional[float] = None
+    current_reference_ns: Optional[float] = None
+
+    @property
+    def change(self) -> Optional[float]:
+        """
+        Relative change of the best time, in units of the reference loop
+        when both runs timed it; positive is slower.
+        """
+        if self.baseline_ns is None:
+            return None
+        if self.baseline_reference_ns and self.current_reference_ns:
+            return (self.current_ns / self.current_reference_ns) / (self.baseline_ns / self.baseline_reference_ns) - 1
+        return self.current_ns / self.baseline_ns - 1
+
+    def status(self, threshold: float) -> str:
+        change = self.change
+        if change is None:
+            return "new"
+        if change > threshold:
+            return "REGRESSION"
+        if change < -threshold:
+            return "faster"
+        return "ok"
+
+
+# name -> setup; a setup prepares the inputs, checks the code under test
+# gets them right once, and returns the call to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark setup under a name."""
+    def register(setup: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def garble(line: str, rng: random.Random, edits: int = 2) -> str:
+    """A line with a few characters replaced, like a near-miss answer."""
+    chars = list(line)
+    for _ in range(edits):
+        chars[rng.randrange(len(chars))] = rng.choice("0123456789abcdefXYZ$,.-")
+    return "".join(chars)
+
+
+def gold_lines() -> List[str]:
+    return default_registry().get().answer_key.lines
+
+
+def reasoning(size: int, rng: random.Random) -> str:
+    """Model-like reasoning text that drafts answers along the way."""
+    words = ["the", "document", "states", "that", "budget", "is", "Q3", "version", "2.4", "so", "answer"]
+    lines = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(5, 20)))
+        if rng.random() < 0.05:
+            line = f"Q{rng.randint(1, 16)}: draft {line}"
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def huge_response() -> str:
+    """A 1 MB reasoning block followed by the answer block."""
+    rng = random.Random(3)
+    return f"<think>\n{reasoning(HUGE_REASONING, rng)}\n</think>\n\n" + correct_answer(gold_lines())
+
+
+@benchmark("levenshtein_short")
+def bench_levenshtein_short():
+    gold = gold_lines()[1]
+    line = gold.replace("2,200,000.00", "2,200,000")
+    assert levenshtein(line, gold) == 3
+    return lambda: levenshtein(line, gold)
+
+
+@benchmark("levenshtein_long")
+def bench_levenshtein_long():
+    rng = random.Random(1)
+    gold = reasoning(400, rng)[:400]
+    line = garble(gold, rng, edits=20)
+    assert 0 < levenshtein(line, gold) <= 20
+    return lambda: levenshtein(line, gold)
+
+
+@benchmark("match_line_exact")
+def bench_match_line_exact():
+    gold = gold_lines()[2]
+    assert match_line((gold, gold), verbose=False) == 100.0
+    return lambda: match_line((gold, gold), verbose=False)
+
+
+@benchmark("match_line_mismatch")
+def bench_match_line_mismatch():
+    gold = gold_lines()[1]
+    line = garble(gold, random.Random(2))
+    assert match_line((line, gold), verbose=False) < 100.0
+    return lambda: match_line((line, gold), verbose=False)
+
+
+@benchmark("match_line_garbage")
+def bench_match_line_garbage():
+    # An answer line as long as the extractor keeps, the slowest to score
+    gold = gold_lines()[0]
+    line = "Q1: " + "x" * 4092
+    assert match_line((line, gold), verbose=False) < 1.0
+    return lambda: match_line((line, gold), verbose=False)
+
+
+@benchmark("score_answers")
+def bench_score_answers():
+    # A whole suite's answers, a quarter of them wrong
+    rng = random.Random(4)
+    key = AnswerKey(gold_lines())
+    answers = [garble(line, rng) if i % 4 == 0 else line for i, line in enumerate(key.lines)]
+    assert 0 < sum(key.score_answers(answers, verbose=False)) < 100.0 * len(key)
+    return lambda: key.score_answers(answers, verbose=False)
+
+
+@benchmark("extract_small")
+def bench_extract_small():
+    gold = gold_lines()
+    content = correct_answer(gold)
+    assert extract_answer_lines(content, len(gold)) == gold
+    return lambda: extract_answer_lines(content, len(gold))
+
+
+@benchmark("extract_huge")
+def bench_extract_huge():
+    gold = gold_lines()
+    content = huge_response()
+    assert extract_answer_lines(content, len(gold)) == gold
+    return lambda: extract_answer_lines(content, len(gold))
+
+
+@benchmark("extract_huge_stream")
+def bench_extract_huge_stream():
+    # The same response fed as small deltas, like a stream
+    gold = gold_lines()
+    content = huge_response()
+    chunks = [content[i:i + STREAM_CHUNK] for i in range(0, len(content), STREAM_CHUNK)]
+    assert extract_answers(chunks, len(gold)) == gold
+    return lambda: extract_answers(chunks, len(gold))
+
+
+def completion_payload(choices: int) -> Dict[str, Any]:
+    """A chat completion response body as LM Studio returns it, decoded."""
+    rng = random.Random(5)
+    contents = [f"<think>\n{reasoning(3000, rng)}\n</think>\n\n" + correct_answer(gold_lines()) for _ in range(choices)]
+    return {
+        "id": "chatcmpl-3f9a1c2b7d4e",
+        "object": "chat.completion",
+        "created": 1760000000,
+        "model": "qwen/qwen3-1.7b",
+        "choices": [
+            {"index": i, "logprobs": None, "finish_reason": "stop",
+             "message": {"role": "assistant", "content": content}}
+            for i, content in enumerate(contents)
+        ],
+        "usage": {"prompt_tokens": 5640, "completion_tokens": 900 * choices, "total_tokens": 5640 + 900 * choices},
+        "stats": {},
+        "system_fingerprint": "qwen/qwen3-1.7b",
+    }
+
+
+@benchmark("parse_completion")
+def bench_parse_completion():
+    client = _LMStudioClientBase()
+    data = completion_payload(1)
+    assert client._parse_completion_response(data).usage.total_tokens == 6540
+    return lambda: client._parse_completion_response(data)
+
+
+@benchmark("parse_completion_choices")
+def bench_parse_completion_choices():
+    client = _LMStudioClientBase()
+    data = completion_payload(8)
+    assert len(client._parse_completion_response(data).choices) == 8
+    return lambda: client._parse_completion_response(data)
+
+
+def suite_payload_args() -> Dict[str, Any]:
+    messages = build_requests(default_registry().get().prompt, PromptLayout.SINGLE)[0].messages
+    sampling = dict(top_p=1.0, frequency_penalty=0.0, presence_penalty=0.0, max_tokens=4256, stop=None)
+    return dict(messages=messages, model="qwen/qwen3-1.7b", stream=False, **sampling, **DEFAULT_SAMPLING)
+
+
+@benchmark("build_payload")
+def bench_build_payload():
+    client = _LMStudioClientBase()
+    kwargs = suite_payload_args()
+    assert client._build_payload(**kwargs)["max_tokens"] == 4256
+    return lambda: client._build_payload(**kwargs)
+
+
+@benchmark("serialize_payload")
+def bench_serialize_payload():
+    # What LMStudioClient does before each request: build and encode
+    client = _LMStudioClientBase()
+    kwargs = suite_payload_args()
+    return lambda: json.dumps(client._build_payload(**kwargs)).encode("utf-8")
+
+
+_REFERENCE_WORDS = [f"word{i}" for i in range(256)]
+
+
+def reference_loop() -> Dict[str, int]:
+    """
+    Fixed interpreter work (string, dict and int operations) timed next to
+    every benchmark. Shared or throttled CPUs change speed from minute to
+    minute; comparing times relative to this loop cancels most of that.
+    """
+    counts: Dict[str, int] = {}
+    for word in _REFERENCE_WORDS:
+        counts[word] = counts.get(word, 0) + len(word) * 3 % 7
+    return counts
+
+
+def calibrate(timer: timeit.Timer, min_time: float) -> int:
+    """Loops of the timer for a round to take at least min_time."""
+    loops = 1
+    while True:
+        elapsed = timer.timeit(loops)
+        if elapsed >= min_time:
+            return loops
+        # Aim a little past min_time, growing at least tenfold
+        loops = max(loops * 10, int(loops * min_time * 1.2 / elapsed)) if elapsed > 0 else loops * 10
+
+
+def measure(name: str, call: Callable[[], Any], min_time: float = MIN_TIME, repeat: int = REPEAT) -> MicroResult:
+    """
+    Time a call like timeit does (garbage collection off): the loop count
+    grows until a round takes min_time, then `repeat` rounds are timed,
+    each followed by a round of the reference loop.
+    """
+    timer = timeit.Timer(call)
+    reference = timeit.Timer(reference_loop)
+    loops = calibrate(timer, min_time)
+    reference_loops = calibrate(reference, min_time / 4)
+    rounds, reference_rounds = [], []
+    for _ in range(repeat):
+        rounds.append(timer.timeit(loops) / loops)
+        reference_rounds.append(reference.timeit(reference_loops) / reference_loops)
+    return MicroResult(
+        name=name,
+        loops=loops,
+        best_ns=min(rounds) * 1e9,
+        median_ns=statistics.median(rounds) * 1e9,
+        reference_ns=min(reference_rounds) * 1e9
+    )
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None,
+    min_time: float = MIN_TIME,
+    repeat: int = REPEAT
+) -> List[MicroResult]:
+    """Run the named benchmarks, or all of them, in registration order."""
+    results = []
+    for name, setup in BENCHMARKS.items():
+        if names is not None and name not in names:
+            continue
+        results.append(measure(name, setup(), min_time, repeat))
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """What the timings depend on besides the code."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def save_baseline(results: List[MicroResult], path: Path) -> None:
+    """Write results as the baseline, keeping the baseline's other benchmarks."""
+    baseline = load_baseline(path) if path.exists() else {}
+    merged = dict(baseline.get("results", {}))
+    merged.update({
+        r.name: {"loops": r.loops, "best_ns": r.best_ns, "median_ns": r.median_ns, "reference_ns": r.reference_ns}
+        for r in results
+    })
+    data = {"environment": environment(), "results": {name: merged[name] for name in sorted(merged)}}
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    """
+    Read a baseline file.
+
+    Raises:
+        ValueError: If the file is not a baseline
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid baseline file {path}: {e}")
+    if not isinstance(data, dict) or not isinstance(data.get("results"), dict):
+        raise ValueError(f"Invalid baseline file {path}: no results")
+    return data
+
+
+def compare(results: List[MicroResult], baseline: Dict[str, Any]) -> List[Comparison]:
+    """Pair each result's best time with the baseline's."""
+    recorded = baseline["results"]
+    return [
+        Comparison(
+            name=r.name,
+            baseline_ns=recorded.get(r.name, {}).get("best_ns"),
+            current_ns=r.best_ns,
+            baseline_reference_ns=recorded.get(r.name, {}).get("reference_ns"),
+            current_reference_ns=r.reference_ns
+        )
+        for r in results
+    ]
+
+
+def format_ns(ns: float) -> str:
+    """A duration in the most readable unit."""
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f}ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f}us"
+    return f"{ns:.0f}ns"
+
+
+def report_results(results: List[MicroResult]) -> None:
+    print(f"{'Benchmark':<26} {'Loops':>8} {'Best':>10} {'Median':>10}")
+    for r in results:
+        print(f"{r.name:<26} {r.loops:>8d} {format_ns(r.best_ns):>10} {format_ns(r.median_ns):>10}")
+
+
+def report_comparisons(comparisons: List[Comparison], threshold: float) -> None:
+    print(f"{'Benchmark':<26} {'Baseline':>10} {'Current':>10} {'Change':>8}  Status")
+    for c in comparisons:
+        baseline = format_ns(c.baseline_ns) if c.baseline_ns is not None else "-"
+        change = f"{c.change:+.1%}" if c.change is not None else "-"
+        print(f"{c.name:<26} {baseline:>10} {format_ns(c.current_ns):>10} {change:>8}  {c.status(threshold)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmark the harness's CPU hot paths, offline")
+    parser.add_argument("-k", "--filter", type=str, default=None,
+                        help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME,
+                        help=f"Seconds each timing round runs for at least (default: {MIN_TIME})")
+    parser.add_argument("--repeat", type=int, default=REPEAT,
+                        help=f"Timing rounds per benchmark; the best is compared (default: {REPEAT})")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--save", type=Path, nargs="?", const=DEFAULT_BASELINE, default=None, metavar="PATH",
+                        help="Record the results as the baseline (default: src/microbench_baseline.json)")
+    action.add_argument("--compare", type=Path, nargs="?", const=DEFAULT_BASELINE, default=None, metavar="PATH",
+                        help="Compare with the baseline and exit with status 1 on a regression "
+                             "(default: src/microbench_baseline.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative slowdown of the best time that counts as a regression "
+                             f"(default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if args.min_time <= 0:
+        parser.error("--min-time must be positive")
+    if args.threshold <= 0:
+        parser.error("--threshold must be positive")
+
+    baseline = None
+    if args.compare is not None:
+        try:
+            baseline = load_baseline(args.compare)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    logging.getLogger("cli").setLevel(logging.ERROR)
+    names = [name for name in BENCHMARKS if args.filter in name] if args.filter else None
+    if names == []:
+        parser.error(f"No benchmark matches {args.filter!r}")
+    results = run_benchmarks(names, args.min_time, args.repeat)
+
+    if baseline is None:
+        if args.json:
+            print(json.dumps([asdict(r) for r in results], indent=2))
+        else:
+            report_results(results)
+        if args.save is not None:
+            save_baseline(results, args.save)
+            print(f"Saved baseline of {len(results)} benchmarks to {args.save}")
+        return
+
+    comparisons = compare(results, baseline)
+    if args.json:
+        print(json.dumps([
+            {**asdict(c), "change": c.change, "status": c.status(args.threshold)} for c in comparisons
+        ], indent=2))
+    else:
+        recorded = baseline.get("environment", {})
+        if recorded and recorded != environment():
+            print(f"Note: the baseline was recorded with {recorded}, this run uses {environment()}")
+        report_comparisons(comparisons, args.threshold)
+
+    regressions = [c for c in comparisons if c.status(args.threshold) == "REGRESSION"]
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark{'s' if len(regressions) > 1 else ''} slower than the baseline "
+            f"by more than {args.threshold:.0%}: {', '.join(c.name for c in regressions)}",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Mock LM Studio Server
+
+A stand-in for LM Studio's OpenAI-compatible API, for exercising the
+clients and the benchmark without a GPU. It implements /v1/models and
+/v1/chat/completions (plain JSON and SSE streaming) and replies with a
+canned answer, by default the correct answer block of the test suite the
+prompt comes from. Latency, generation speed and injected errors are
+configurable.
+
+Run standalone with `python mock_server.py --port 1234`, or start it in a
+background thread with serve_in_thread().
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from suites import SUITES_DIR, SuiteRegistry, default_registry
+
+TOKEN_RE = re.compile(r"\s*\S+|\s+")
+QUESTION_RE = re.compile(r"^Q\d+:.*$", re.MULTILINE)
+
+
+def correct_answer(answer_lines: List[str]) -> str:
+    """A short reasoning preamble followed by the correct answer block."""
+    return "Let me work through the documents.\n\n" + "\n".join(answer_lines) + "\n"
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock server."""
+    # Seconds before the first token, standing in for prompt processing
+    latency: float = 0.0
+    # Seconds to "load" a model on its first request and when switching
+    # models, like LM Studio's JIT loading
+    load_time: float = 0.0
+    # Generation speed; 0 generates instantly
+    tokens_per_second: float = 0.0
+    # Fraction of chat completion requests that fail with error_status
+    error_rate: float = 0.0
+    error_status: int = 500
+    # Text of every completion; None answers each prompt with the answer
+    # key of the suite it belongs to
+    answer: Optional[str] = None
+    # Chance that each "Qn:" line of the answer is garbled, to give
+    # scores some variance
+    answer_noise: float = 0.0
+    # Most choices per completion, like a server that ignores "n" when 1;
+    # 0 returns as many as requested
+    max_choices: int = 0
+    # Streamed tokens after which the connection is dropped mid-response,
+    # like a server that crashes; 0 always finishes
+    stream_cutoff: int = 0
+    models: List[str] = field(default_factory=lambda: ["mock-model"])
+    # Model already loaded when the server starts
+    loaded_model: Optional[str] = None
+    seed: Optional[int] = None
+    # Suites to recognize prompts of
+    registry: SuiteRegistry = field(default_factory=default_registry)
+
+    def answer_for(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        The completion for a conversation: the configured answer, or the
+        correct answers of the suite whose prompt contains the first
+        question in the last message (the default suite if none does).
+        """
+        if self.answer is not None:
+            return self.answer
+        registry = self.registry
+        content = (messages[-1].get("content") or "") if messages else ""
+        question = QUESTION_RE.search(content)
+        if question:
+            for name in registry.names():
+                suite = registry.get(name)
+                if question.group(0).strip() in suite.prompt:
+                    return correct_answer(suite.answer_key.lines)
+        return correct_answer(registry.get().answer_key.lines)
+
+
+@dataclass
+class MockStats:
+    """Counters of what the server has seen, for tests and load tests."""
+    requests: int = 0
+    completions: int = 0
+    errors: int = 0
+    disconnects: int = 0
+    # Model loads, including swaps between models
+    loads: int = 0
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into word-sized pseudo tokens that join back to the text."""
+    return TOKEN_RE.findall(text)
+
+
+def count_prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough prompt token count, about four characters per token."""
+    return sum(len(m.get("content") or "") for m in messages) // 4 + 1
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Request handler for the mock API."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle's
+    # algorithm and delayed ACKs add ~40ms to every response
+    disable_nagle_algorithm = True
+    server: "MockServer"
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet
+        pass
+
+    def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        self.server.count("requests")
+        path = self.path.rstrip("/")
+        if path == "/api/v0/models":
+            # LM Studio's own REST API, which also tells which models are loaded
+            self._send_json(200, {
+                "object": "list",
+                "data": [
+                    {"id": model, "object": "model", "type": "llm",
+                     "state": "loaded" if model == self.server.loaded_model else "not-loaded"}
+                    for model in self.server.config.models
+                ]
+            })
+            return
+        if path != "/v1/models":
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        self._send_json(200, {
+            "object": "list",
+            "data": [
+                {"id": model, "object": "model", "created": 0, "owned_by": "mock"}
+                for model in self.server.config.models
+            ]
+        })
+
+    def do_POST(self):
+        self.server.count("requests")
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        try:
+            request = self._read_json()
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        config = self.server.config
+        if self.server.should_fail():
+            self.server.count("errors")
+            self._send_json(config.error_status, {"error": {"message": "Injected error"}})
+            return
+
+        model = request.get("model") or config.models[0]
+        self.server.load_model(model)
+        tokens, finish_reason = self._generate(request)
+        usage = {
+            "prompt_tokens": count_prompt_tokens(request.get("messages", [])),
+            "completion_tokens": len(tokens),
+        }
+
+        if request.get("stream"):
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            self._stream(request, model, tokens, finish_reason, usage)
+        else:
+            n = max(1, int(request.get("n") or 1))
+            if config.max_choices:
+                n = min(n, config.max_choices)
+            # Choices are generated side by side, each sampled on its own
+            generated = [(tokens, finish_reason)] + [self._generate(request) for _ in range(n - 1)]
+            usage["completion_tokens"] = sum(len(t) for t, _ in generated)
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            time.sleep(config.latency + self._generation_time(max(len(t) for t, _ in generated)))
+            choices = [
+                {
+                    "index": i,
+                    "message": {"role": "assistant", "content": "".join(choice_tokens)},
+                    "finish_reason": choice_finish_reason,
+                }
+                for i, (choice_tokens, choice_finish_reason) in enumerate(generated)
+            ]
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": choices,
+                "usage": usage,
+            })
+        self.server.count("completions")
+
+    def _generate(self, request: Dict[str, Any]):
+        """Apply stop sequences and max_tokens to the canned answer."""
+        text = self.server.noisy_answer(self.server.config.answer_for(request.get("messages") or []))
+        finish_reason = "stop"
+        stop = request.get("stop")
+        for seq in [stop] if isinstance(stop, str) else (stop or []):
+            if seq and seq in text:
+                text = text[:text.index(seq)]
+        tokens = tokenize(text)
+        max_tokens = request.get("max_tokens")
+        if max_tokens and len(tokens) > max_tokens:
+            tokens = tokens[:max_tokens]
+            finish_reason = "length"
+        return tokens, finish_reason
+
+    def _generation_time(self, token_count: int) -> float:
+        tps = self.server.config.tokens_per_second
+        return token_count / tps if tps > 0 else 0.0
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, request, model, tokens, finish_reason, usage) -> None:
+        config = self.server.config
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        def event(choices, extra=None) -> bytes:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": choices,
+            }
+            chunk.update(extra or {})
+            return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        delay = self._generation_time(1)
+        try:
+            time.sleep(config.latency)
+            self._write_chunk(event([{"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}]))
+            for number, token in enumerate(tokens):
+                if config.stream_cutoff and number >= config.stream_cutoff:
+                    self.close_connection = True
+                    return
+                if delay:
+                    time.sleep(delay)
+                self._write_chunk(event([{"index": 0, "delta": {"content": token}, "finish_reason": None}]))
+            self._write_chunk(event([{"index": 0, "delta": {}, "finish_reason": finish_reason}]))
+            if (request.get("stream_options") or {}).get("include_usage"):
+                self._write_chunk(event([], {"usage": usage}))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. after a complete answer block
+            self.server.count("disconnects")
+            self.close_connection = True
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying the mock configuration and counters."""
+
+    daemon_threads = True
+    # Load tests open many connections at once
+    request_queue_size = 128
+
+    def __init__(self, address, config: Optional[MockConfig] = None):
+        super().__init__(address, MockHandler)
+        self.config = config or MockConfig()
+        self.stats = MockStats()
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._load_lock = threading.Lock()
+        self.loaded_model = self.config.loaded_model
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def load_model(self, model: str) -> None:
+        """Wait out the load time unless the model is already loaded; requests queue meanwhile."""
+        if self.loaded_model == model:
+            return
+        with self._load_lock:
+            if self.loaded_model != model:
+                time.sleep(self.config.load_time)
+                self.loaded_model = model
+                self.count("loads")
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive or half-read connections is routine
+        # here (early stopping, load test teardown), not worth a traceback
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def noisy_answer(self, answer: str) -> str:
+        """The answer, with answer lines garbled at answer_noise."""
+        if self.config.answer_noise <= 0:
+            return answer
+        lines = answer.split("\n")
+        with self._lock:
+            for i, line in enumerate(lines):
+                if line.startswith("Q") and ":" in line and self._random.random() < self.config.answer_noise:
+                    number = line.split(":", 1)[0]
+                    lines[i] = f"{number}: {self._random.choice(['A', 'B', 'C', 'D', 'none'])}"
+        return "\n".join(lines)
+
+    def should_fail(self) -> bool:
+        if self.config.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.config.error_rate
+
+
+def serve_in_thread(config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0) -> MockServer:
+    """
+    Start a mock server on a background thread.
+
+    Port 0 picks a free port; read it back from server.base_url. Call
+    server.shutdown() and server.server_close() to stop it.
+    """
+    server = MockServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock LM Studio server for offline testing")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=1234, help="Port to listen on (default: 1234)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before the first token (default: 0)")
+    parser.add_argument("--load-time", type=float, default=0.0,
+                        help="Seconds to load a model on first use and on every model switch (default: 0)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Generation speed, 0 for instant (default: 0)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of completions that fail (default: 0)")
+    parser.add_argument("--answer-noise", type=float, default=0.0,
+                        help="Chance that each answer line is garbled (default: 0)")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of injected errors (default: 500)")
+    parser.add_argument("--answer-file", type=str, default=None,
+                        help="File whose contents are returned as every completion "
+                             "(default: the correct answers of the prompt's suite)")
+    parser.add_argument("--max-choices", type=int, default=0,
+                        help="Most choices per completion, 1 to act like a server without n (default: no limit)")
+    parser.add_argument("--model", action="append", dest="models", default=None,
+                        help="Model id to report; repeat for several (default: mock-model)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for error injection")
+    parser.add_argument("--suite-dir", type=Path, action="append", default=None,
+                        help="Also recognize prompts of the suites in this directory")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency=args.latency,
+        load_time=args.load_time,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        answer_noise=args.answer_noise,
+        max_choices=args.max_choices,
+        seed=args.seed
+    )
+    if args.answer_file:
+        with open(args.answer_file, 'r', encoding='utf-8') as f:
+            config.answer = f.read()
+    if args.models:
+        config.models = args.models
+    if args.suite_dir:
+        config.registry = SuiteRegistry([*args.suite_dir, SUITES_DIR])
+
+    server = MockServer((args.host, args.port), config)
+    print(f"Mock LM Studio server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
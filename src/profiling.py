@@ -0,0 +1,221 @@
+"""
+Benchmark Profiling
+
+Timing spans for the phases of the benchmark pipeline (payload
+serialization, network wait, response parsing, answer extraction, scoring,
+cache and store access), exported as a Chrome trace-event file that
+chrome://tracing or https://ui.perfetto.dev can open. Optionally, cProfile
+runs during the evaluator phases (answer extraction and scoring) and
+tracemalloc records the allocations of the whole run.
+
+Profiling is off unless a Profiler is installed. span() then returns a
+shared no-op context manager, so instrumented code costs one global lookup
+per span.
+"""
+
+import io
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from lazy import lazy_import
+
+# Loaded only when profiling is switched on
+cProfile = lazy_import("cProfile")
+pstats = lazy_import("pstats")
+tracemalloc = lazy_import("tracemalloc")
+
+log = logging.getLogger(__name__)
+
+# Spans of this category are the ones cProfile runs in
+EVALUATOR = "evaluator"
+
+# Frames kept per allocation in the tracemalloc snapshot
+MEMORY_FRAMES = 10
+
+# Rows of the profiles logged at the end of a run
+TOP_ROWS = 15
+
+_NO_SPAN = nullcontext()
+_profiler: Optional["Profiler"] = None
+
+
+class Profiler:
+    """Collects the spans of a run, with optional CPU and memory profiles."""
+
+    def __init__(self, cpu: bool = False, memory: bool = False):
+        self.cpu = cpu
+        self.memory = memory
+        self.events: List[Dict[str, Any]] = []
+        self.snapshot: Optional["tracemalloc.Snapshot"] = None
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+        # Only one cProfile can be active at a time (Python 3.12+ rejects a
+        # second one), so evaluator spans take turns enabling a shared one.
+        # Evaluation holds the GIL anyway, so this costs little parallelism.
+        # From 3.12 the profile also sees other threads while it is enabled.
+        self._cpu_profile = cProfile.Profile() if cpu else None
+        self._cpu_lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name: str, category: str, args: Dict[str, Any]) -> Iterator[None]:
+        """Record the time spent in the block as one complete event."""
+        # Nested evaluator spans share the outermost one's profiling
+        outermost = False
+        if self._cpu_profile is not None and category == EVALUATOR and not getattr(self._local, "profiling", False):
+            self._cpu_lock.acquire()
+            self._local.profiling = outermost = True
+            self._cpu_profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if outermost:
+                self._cpu_profile.disable()
+                self._local.profiling = False
+                self._cpu_lock.release()
+            thread = threading.current_thread()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self._pid,
+                "tid": thread.ident,
+            }
+            if args:
+                event["args"] = args
+            with self._lock:
+                self.events.append(event)
+                self._threads.setdefault(thread.ident, thread.name)
+
+    def start(self) -> None:
+        """Install the profiler, so that span() records."""
+        global _profiler
+        if self.memory:
+            tracemalloc.start(MEMORY_FRAMES)
+        self._origin = time.perf_counter()
+        _profiler = self
+
+    def stop(self) -> None:
+        """Uninstall the profiler and take the memory snapshot."""
+        global _profiler
+        _profiler = None
+        if self.memory:
+            self.snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+
+    def trace(self) -> Dict[str, Any]:
+        """The spans as a Chrome trace, with the threads named."""
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        names = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        return {"traceEvents": names + events, "displayTimeUnit": "ms"}
+
+    def phase_totals(self) -> List[Dict[str, Any]]:
+        """Count and total time of each span name, largest total first."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for event in self.events:
+                total = totals.setdefault(event["name"], {"name": event["name"], "count": 0, "seconds": 0.0})
+                total["count"] += 1
+                total["seconds"] += event["dur"] / 1e6
+        return sorted(totals.values(), key=lambda t: t["seconds"], reverse=True)
+
+    def cpu_stats(self) -> Optional["pstats.Stats"]:
+        """The profile of the evaluator spans, or None if nothing was profiled."""
+        if self._cpu_profile is None or not self._cpu_profile.getstats():
+            return None
+        return pstats.Stats(self._cpu_profile, stream=io.StringIO())
+
+
+def span(name: str, category: str = "bench", **args: Any):
+    """A timing span around a block, recorded only while a profiler is installed."""
+    profiler = _profiler
+    if profiler is None:
+        return _NO_SPAN
+    return profiler.span(name, category, args)
+
+
+def report(profiler: Profiler) -> None:
+    """Log where the time went, and the top CPU and memory consumers."""
+    totals = profiler.phase_totals()
+    if totals:
+        log.info("=" * 60)
+        log.info("PROFILE")
+        log.info("=" * 60)
+        log.info(f"{'Phase':<24} {'count':>8} {'total (s)':>10} {'mean (ms)':>10}")
+        for total in totals:
+            log.info(
+                f"{total['name']:<24} {total['count']:>8d} {total['seconds']:>10.3f} "
+                f"{total['seconds'] / total['count'] * 1000:>10.3f}"
+            )
+    stats = profiler.cpu_stats()
+    if stats is not None:
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(TOP_ROWS)
+        log.info("-" * 60)
+        log.info("Evaluator CPU profile (cumulative):")
+        log.info(out.getvalue().strip())
+    if profiler.snapshot is not None:
+        # Leave out the profiler's own span records and import machinery
+        snapshot = profiler.snapshot.filter_traces([
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        log.info("-" * 60)
+        log.info("Largest allocation sites:")
+        for stat in snapshot.statistics("lineno")[:TOP_ROWS]:
+            log.info(f"  {stat}")
+
+
+@contextmanager
+def profiled(
+    trace_path: Optional[Path] = None,
+    cpu_path: Optional[Path] = None,
+    memory_path: Optional[Path] = None
+) -> Iterator[Optional[Profiler]]:
+    """
+    Profile the block when any output path is given, and write the trace
+    (Chrome trace JSON), the evaluator CPU profile (pstats file, for
+    `python -m pstats` or snakeviz) and the tracemalloc snapshot (for
+    tracemalloc.Snapshot.load) when it ends, also on errors and exits.
+    """
+    if not (trace_path or cpu_path or memory_path):
+        yield None
+        return
+    profiler = Profiler(cpu=bool(cpu_path), memory=bool(memory_path))
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        report(profiler)
+        if trace_path:
+            with open(trace_path, 'w', encoding='utf-8') as f:
+                json.dump(profiler.trace(), f)
+            log.info(f"Wrote trace of {len(profiler.events)} spans to {trace_path}")
+        if cpu_path:
+            stats = profiler.cpu_stats()
+            if stats is not None:
+                stats.dump_stats(str(cpu_path))
+                log.info(f"Wrote evaluator CPU profile to {cpu_path}")
+        if memory_path and profiler.snapshot is not None:
+            profiler.snapshot.dump(str(memory_path))
+            log.info(f"Wrote memory snapshot to {memory_path}")
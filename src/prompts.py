@@ -0,0 +1,115 @@
+"""
+Prompt Layouts
+
+Ways of sending the benchmark prompt to the model. The prompt is a large,
+static block of rules and documents followed by the questions. Sending the
+static block as an identical leading system message lets the server reuse
+its prompt (KV) cache across requests, so only the short question part has
+to be prefilled again.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import List
+
+from evaluator import AnswerExtractor
+from llm_client import Message, Role
+
+QUESTIONS_HEADING = "### Questions"
+QUESTION_RE = re.compile(r"^Q(\d+):")
+
+
+class PromptLayout(Enum):
+    """How the prompt is split into requests."""
+    # The whole prompt as one user message, as it is written
+    SINGLE = "single"
+    # Documents as a stable system message, questions as the user message
+    SPLIT = "split"
+    # Documents as a stable system message, one request per question
+    PER_QUESTION = "per-question"
+
+
+@dataclass
+class PromptParts:
+    """The static document block and the questions of a prompt."""
+    documents: str
+    questions: List[str]
+
+
+@dataclass
+class PromptRequest:
+    """One request of a layout and the questions its response should answer."""
+    messages: List[Message]
+    first_question: int
+    question_count: int
+
+
+def split_prompt(prompt: str) -> PromptParts:
+    """
+    Split a prompt at its questions heading.
+
+    Raises:
+        ValueError: If the prompt has no questions heading or no questions
+    """
+    documents, sep, questions_block = prompt.partition(QUESTIONS_HEADING)
+    if not sep:
+        raise ValueError(f"Prompt has no '{QUESTIONS_HEADING}' heading")
+    questions = [
+        line.strip() for line in questions_block.splitlines()
+        if QUESTION_RE.match(line.strip())
+    ]
+    if not questions:
+        raise ValueError("Prompt has no questions")
+    return PromptParts(documents=documents.rstrip().removesuffix("---").rstrip(), questions=questions)
+
+
+def build_requests(prompt: str, layout: PromptLayout) -> List[PromptRequest]:
+    """Build the requests that make up one benchmark iteration in the given layout."""
+    parts = split_prompt(prompt)
+    if layout is PromptLayout.SINGLE:
+        return [PromptRequest(
+            messages=[Message(role=Role.USER, content=prompt)],
+            first_question=1,
+            question_count=len(parts.questions)
+        )]
+
+    # Identical for every request so the server can reuse the cached prefix
+    system = Message(role=Role.SYSTEM, content=parts.documents)
+
+    if layout is PromptLayout.SPLIT:
+        questions = f"{QUESTIONS_HEADING}\n\n" + "\n".join(parts.questions)
+        return [PromptRequest(
+            messages=[system, Message(role=Role.USER, content=questions)],
+            first_question=1,
+            question_count=len(parts.questions)
+        )]
+
+    requests = []
+    for number, question in enumerate(parts.questions, 1):
+        content = (
+            f"{QUESTIONS_HEADING}\n\n{question}\n\n"
+            f"Answer only this question, following all rules above. "
+            f"The last line of your response must start with \"Q{number}:\"."
+        )
+        requests.append(PromptRequest(
+            messages=[system, Message(role=Role.USER, content=content)],
+            first_question=number,
+            question_count=1
+        ))
+    return requests
+
+
+def extract_question_answer(response: str, number: int) -> str:
+    """
+    Return the answer line of a per-question response: the last line that
+    starts with "Q<number>:", or else the last non-empty line with that
+    prefix added, so that the joined answer block keeps one "Qn:" line per
+    question in order. Reasoning blocks are skipped.
+    """
+    extractor = AnswerExtractor(1, question=number)
+    extractor.feed(response)
+    extractor.finish()
+    if extractor.answers:
+        return extractor.answers[-1]
+    return f"Q{number}: {extractor.last_line}".rstrip()
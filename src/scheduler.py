@@ -0,0 +1,86 @@
+"""
+Benchmark Scheduler
+
+Orders benchmark work so that LM Studio has to swap models as rarely as
+possible. Loading a large model takes tens of seconds, so all iterations for
+one model are grouped together and run before the next model is touched.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass
+class ModelRun:
+    """A model and the number of iterations to run against it."""
+    model: str
+    iterations: int
+
+
+def parse_model_spec(spec: str, default_iterations: int) -> ModelRun:
+    """
+    Parse a command line model spec of the form NAME or NAME=ITERATIONS.
+
+    Args:
+        spec: Model spec, e.g. "qwen/qwen3-1.7b=5"
+        default_iterations: Iterations to use when the spec has no count
+
+    Returns:
+        ModelRun for the spec
+
+    Raises:
+        ValueError: If the iteration count is not a positive integer
+    """
+    model, sep, count = spec.rpartition('=')
+    if not sep:
+        return ModelRun(model=spec, iterations=default_iterations)
+    if not model:
+        raise ValueError(f"Missing model name in spec: {spec!r}")
+    try:
+        iterations = int(count)
+    except ValueError:
+        raise ValueError(f"Invalid iteration count in spec: {spec!r}")
+    if iterations < 1:
+        raise ValueError(f"Iteration count must be at least 1 in spec: {spec!r}")
+    return ModelRun(model=model, iterations=iterations)
+
+
+def schedule_models(runs: List[ModelRun], loaded_model: Optional[str] = None) -> List[ModelRun]:
+    """
+    Group the requested runs into one batch per model.
+
+    Repeated models are merged and their iteration counts added up, so each
+    model is loaded exactly once. Batches keep the order in which models were
+    first requested, except that the model already loaded on the server (if
+    known) goes first to avoid a swap at the start.
+
+    Args:
+        runs: Requested runs, possibly naming the same model several times
+        loaded_model: Model currently loaded on the server, if known
+
+    Returns:
+        One ModelRun per distinct model, in execution order
+    """
+    batches: Dict[str, ModelRun] = {}
+    for run in runs:
+        if run.model in batches:
+            batches[run.model].iterations += run.iterations
+        else:
+            batches[run.model] = ModelRun(model=run.model, iterations=run.iterations)
+
+    ordered = list(batches.values())
+    if loaded_model in batches:
+        ordered.remove(batches[loaded_model])
+        ordered.insert(0, batches[loaded_model])
+    return ordered
+
+
+def count_model_swaps(order: List[str], loaded_model: Optional[str] = None) -> int:
+    """Count how many model loads the given execution order causes."""
+    swaps = 0
+    current = loaded_model
+    for model in order:
+        if model != current:
+            swaps += 1
+            current = model
+    return swaps
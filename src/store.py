@@ -0,0 +1,411 @@
+"""
+Results Store
+
+A local SQLite database of benchmark history. Each run records its prompt
+hash, layout and parameters. Each iteration records the raw response, the
+per-question match_line scores and the request timings. Queries filter on
+indexed columns (model, run, prompt hash, date), so reports stay fast as
+the history grows and never re-read old runs in full.
+"""
+
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from lazy import lazy_import
+from telemetry import RequestMetrics
+
+if TYPE_CHECKING:
+    from bulk import QuestionAccuracy
+
+sqlite3 = lazy_import("sqlite3")
+
+# Suite of the runs recorded before suites were stored
+LEGACY_SUITE = "project-cipher"
+
+DEFAULT_STORE_PATH = Path.home() / ".local" / "share" / "ai-test-evaluator" / "results.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL,
+    prompt_hash TEXT NOT NULL,
+    layout TEXT NOT NULL,
+    params TEXT NOT NULL,
+    suite TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+CREATE INDEX IF NOT EXISTS runs_prompt ON runs (prompt_hash, started);
+
+CREATE TABLE IF NOT EXISTS iterations (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL REFERENCES runs (id),
+    model TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    score REAL,
+    latency REAL,
+    time_to_first_token REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    decode_tokens_per_second REAL,
+    prefill_tokens_per_second REAL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    stopped_early INTEGER NOT NULL DEFAULT 0,
+    truncated INTEGER NOT NULL DEFAULT 0,
+    response TEXT,
+    error TEXT,
+    UNIQUE (run_id, model, iteration)
+);
+CREATE INDEX IF NOT EXISTS iterations_model ON iterations (model, timestamp);
+
+CREATE TABLE IF NOT EXISTS question_scores (
+    iteration_id INTEGER NOT NULL REFERENCES iterations (id) ON DELETE CASCADE,
+    question INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (iteration_id, question)
+);
+"""
+
+
+@dataclass
+class RunRecord:
+    """One stored benchmark run."""
+    id: str
+    started: float
+    finished: Optional[float]
+    prompt_hash: str
+    layout: str
+    params: Dict[str, Any]
+    models: List[str]
+    iterations: int
+    failed: int
+    suite: Optional[str] = None
+
+
+@dataclass
+class ModelRecord:
+    """Aggregate of the stored iterations of one model on one suite."""
+    suite: Optional[str]
+    model: str
+    runs: int
+    iterations: int
+    mean_score: float
+    best_score: float
+    worst_score: float
+    mean_latency: Optional[float]
+    last_run: float
+
+
+@dataclass
+class StoredIteration:
+    """One stored iteration, as needed to resume its run."""
+    model: str
+    iteration: int
+    response: Optional[str]
+    answer_lines: List[str]
+    scores: List[float]
+    metrics: Optional[RequestMetrics]
+    error: Optional[str]
+
+
+def new_run_id() -> str:
+    """A sortable, unique run id such as 20250101-120000-1a2b3c."""
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+@dataclass
+class StoreFilter:
+    """Restricts store queries to matching runs and iterations."""
+    models: Optional[List[str]] = None
+    suites: Optional[List[str]] = None
+    run_id: Optional[str] = None
+    prompt_hash: Optional[str] = None
+    since: Optional[float] = None
+
+    def where(self, include_failed: bool = False) -> Tuple[str, List[Any]]:
+        """SQL condition on runs `r` and iterations `i`, with its parameters."""
+        clauses = ["1" if include_failed else "i.error IS NULL"]
+        params: List[Any] = []
+        if self.models:
+            clauses.append(f"i.model IN ({', '.join('?' * len(self.models))})")
+            params.extend(self.models)
+        if self.suites:
+            clauses.append(f"r.suite IN ({', '.join('?' * len(self.suites))})")
+            params.extend(self.suites)
+        if self.run_id:
+            clauses.append("r.id = ?")
+            params.append(self.run_id)
+        if self.prompt_hash:
+            # Prefixes are accepted, like abbreviated git hashes
+            clauses.append("r.prompt_hash LIKE ?")
+            params.append(self.prompt_hash + "%")
+        if self.since is not None:
+            clauses.append("i.timestamp >= ?")
+            params.append(self.since)
+        return " AND ".join(clauses), params
+
+
+class ResultsStore:
+    """
+    SQLite store of benchmark runs, iterations and per-question scores.
+
+    Writes are serialized with a lock, so benchmark worker threads can
+    share one store. The database runs in WAL mode, which lets `report`
+    read while a benchmark is still writing.
+    """
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        # Stores created before suites existed only ever ran the default suite
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(runs)")}
+        if "suite" not in columns:
+            with self._db:
+                self._db.execute("ALTER TABLE runs ADD COLUMN suite TEXT")
+                self._db.execute("UPDATE runs SET suite = ?", (LEGACY_SUITE,))
+        with self._db:
+            self._db.execute("CREATE INDEX IF NOT EXISTS runs_suite ON runs (suite, started)")
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(iterations)")}
+        if "truncated" not in columns:
+            with self._db:
+                self._db.execute("ALTER TABLE iterations ADD COLUMN truncated INTEGER NOT NULL DEFAULT 0")
+
+    def start_run(
+        self,
+        prompt_hash: str,
+        layout: str,
+        params: Dict[str, Any],
+        run_id: Optional[str] = None,
+        suite: Optional[str] = None
+    ) -> str:
+        """Record the start of a run and return its id."""
+        run_id = run_id or new_run_id()
+        with self._lock, self._db:
+            self._insert_run(run_id, prompt_hash, layout, params, suite)
+        return run_id
+
+    def _insert_run(self, run_id: str, prompt_hash: str, layout: str, params: Dict[str, Any], suite: Optional[str]) -> None:
+        """start_run inside the caller's lock and transaction."""
+        self._db.execute(
+            "INSERT INTO runs (id, started, prompt_hash, layout, params, suite) VALUES (?, ?, ?, ?, ?, ?)",
+            (run_id, time.time(), prompt_hash, layout, json.dumps(params, sort_keys=True), suite)
+        )
+
+    def finish_run(self, run_id: str) -> None:
+        """Mark a run as finished."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), run_id))
+
+    def add_iteration(
+        self,
+        run_id: str,
+        model: str,
+        iteration: int,
+        response: Optional[str] = None,
+        answer_lines: Optional[List[str]] = None,
+        scores: Optional[List[float]] = None,
+        metrics: Optional[RequestMetrics] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        Store one iteration. A later call for the same run, model and
+        iteration replaces the earlier one.
+        """
+        with self._lock, self._db:
+            self._insert_iteration(run_id, model, iteration, response, answer_lines, scores, metrics, error)
+
+    def _insert_iteration(
+        self,
+        run_id: str,
+        model: str,
+        iteration: int,
+        response: Optional[str],
+        answer_lines: Optional[List[str]],
+        scores: Optional[List[float]],
+        metrics: Optional[RequestMetrics],
+        error: Optional[str]
+    ) -> None:
+        """add_iteration inside the caller's lock and transaction."""
+        scores = scores or []
+        score = sum(scores) / len(scores) if scores else None
+        m = metrics
+        # Removes the old per-question scores too, through the cascade
+        self._db.execute(
+            "DELETE FROM iterations WHERE run_id = ? AND model = ? AND iteration = ?",
+            (run_id, model, iteration)
+        )
+        cursor = self._db.execute(
+            "INSERT INTO iterations (run_id, model, iteration, timestamp, score, latency, "
+            "time_to_first_token, prompt_tokens, completion_tokens, decode_tokens_per_second, "
+            "prefill_tokens_per_second, cached, stopped_early, truncated, response, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run_id, model, iteration, m.timestamp if m else time.time(), score,
+                m.latency if m else None,
+                m.time_to_first_token if m else None,
+                m.prompt_tokens if m else None,
+                m.completion_tokens if m else None,
+                m.decode_tokens_per_second if m else None,
+                m.prefill_tokens_per_second if m else None,
+                int(m.cached) if m else 0,
+                int(m.stopped_early) if m else 0,
+                int(m.truncated) if m else 0,
+                response, error
+            )
+        )
+        self._db.executemany(
+            "INSERT INTO question_scores (iteration_id, question, answer, score) VALUES (?, ?, ?, ?)",
+            [
+                (cursor.lastrowid, number, answer, question_score)
+                for number, (answer, question_score) in enumerate(zip(answer_lines or [], scores), 1)
+            ]
+        )
+
+    def runs(self, limit: Optional[int] = None, query: Optional[StoreFilter] = None) -> List[RunRecord]:
+        """Return matching runs, newest first."""
+        # Failed iterations count towards the run, not towards the scores
+        where, params = (query or StoreFilter()).where(include_failed=True)
+        sql = (
+            "SELECT r.id, r.started, r.finished, r.prompt_hash, r.layout, r.params, r.suite, "
+            "group_concat(DISTINCT i.model) AS models, count(i.id) AS iterations, "
+            "count(i.error) AS failed "
+            "FROM runs r LEFT JOIN iterations i ON i.run_id = r.id "
+            f"WHERE {where} GROUP BY r.id ORDER BY r.started DESC"
+        )
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [
+            RunRecord(
+                id=row["id"],
+                started=row["started"],
+                finished=row["finished"],
+                prompt_hash=row["prompt_hash"],
+                layout=row["layout"],
+                params=json.loads(row["params"]),
+                models=sorted(row["models"].split(",")) if row["models"] else [],
+                iterations=row["iterations"],
+                failed=row["failed"],
+                suite=row["suite"]
+            )
+            for row in rows
+        ]
+
+    def get_run(self, run_id: str) -> Optional[RunRecord]:
+        """Return one run, or None if there is no run with that id."""
+        runs = self.runs(query=StoreFilter(run_id=run_id))
+        return runs[0] if runs else None
+
+    def load_iterations(self, run_id: str, include_failed: bool = False) -> List[StoredIteration]:
+        """Return the stored iterations of a run with their scores, in order."""
+        where = "i.run_id = ?" if include_failed else "i.run_id = ? AND i.error IS NULL"
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM iterations i WHERE {where} ORDER BY i.model, i.iteration", (run_id,)
+            ).fetchall()
+            questions: Dict[int, List[sqlite3.Row]] = {}
+            for q in self._db.execute(
+                "SELECT q.* FROM question_scores q JOIN iterations i ON i.id = q.iteration_id "
+                f"WHERE {where} ORDER BY q.iteration_id, q.question", (run_id,)
+            ):
+                questions.setdefault(q["iteration_id"], []).append(q)
+
+        stored = []
+        for row in rows:
+            metrics = None
+            if row["error"] is None:
+                metrics = RequestMetrics(
+                    model=row["model"],
+                    iteration=row["iteration"],
+                    timestamp=row["timestamp"],
+                    latency=row["latency"],
+                    score=row["score"],
+                    time_to_first_token=row["time_to_first_token"],
+                    prompt_tokens=row["prompt_tokens"],
+                    completion_tokens=row["completion_tokens"],
+                    decode_tokens_per_second=row["decode_tokens_per_second"],
+                    prefill_tokens_per_second=row["prefill_tokens_per_second"],
+                    cached=bool(row["cached"]),
+                    stopped_early=bool(row["stopped_early"]),
+                    truncated=bool(row["truncated"])
+                )
+            scored = questions.get(row["id"], [])
+            stored.append(StoredIteration(
+                model=row["model"],
+                iteration=row["iteration"],
+                response=row["response"],
+                answer_lines=[q["answer"] for q in scored],
+                scores=[q["score"] for q in scored],
+                metrics=metrics,
+                error=row["error"]
+            ))
+        return stored
+
+    def model_summaries(self, query: Optional[StoreFilter] = None) -> List[ModelRecord]:
+        """Aggregate matching iterations per suite and model, best average score first."""
+        where, params = (query or StoreFilter()).where()
+        sql = (
+            "SELECT r.suite, i.model, count(DISTINCT i.run_id) AS runs, count(*) AS iterations, "
+            "avg(i.score) AS mean_score, max(i.score) AS best_score, min(i.score) AS worst_score, "
+            "avg(CASE WHEN i.cached THEN NULL ELSE i.latency END) AS mean_latency, "
+            "max(i.timestamp) AS last_run "
+            "FROM iterations i JOIN runs r ON r.id = i.run_id "
+            f"WHERE {where} GROUP BY r.suite, i.model ORDER BY r.suite, mean_score DESC"
+        )
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [ModelRecord(**dict(row)) for row in rows]
+
+    def question_accuracy(self, query: Optional[StoreFilter] = None) -> List["QuestionAccuracy"]:
+        """Per-question accuracy over the matching iterations."""
+        # bulk (csv, glob) is only needed for this report, not at startup
+        from bulk import QuestionAccuracy
+        where, params = (query or StoreFilter()).where()
+        sql = (
+            "SELECT q.question, count(*) AS evaluated, sum(q.score = 100.0) AS correct, "
+            "avg(q.score) AS mean_score "
+            "FROM question_scores q JOIN iterations i ON i.id = q.iteration_id "
+            "JOIN runs r ON r.id = i.run_id "
+            f"WHERE {where} GROUP BY q.question ORDER BY q.question"
+        )
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [
+            QuestionAccuracy(
+                question=f"Q{row['question']}",
+                evaluated=row["evaluated"],
+                correct=row["correct"],
+                mean_score=row["mean_score"]
+            )
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - close the database."""
+        self.close()
@@ -0,0 +1,142 @@
+"""
+Test Suites
+
+A suite is one benchmark scenario: a directory holding the prompt
+(prompt.md, with the questions under a "### Questions" heading), the answer
+key (answers.txt, one "Qn: answer" line per question) and optional
+metadata (suite.json with a title and description).
+
+The registry only lists suite directories up front. A suite's files are
+read the first time they are needed, and its answer key is compiled once
+and then shared by every iteration that scores against it.
+"""
+
+import json
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from evaluator import ANSWER_RE, AnswerKey
+
+SUITES_DIR = Path(__file__).resolve().parent / "suites"
+DEFAULT_SUITE = "project-cipher"
+
+
+class Suite:
+    """One benchmark scenario, loaded lazily from its directory."""
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = Path(path)
+
+    @cached_property
+    def metadata(self) -> Dict[str, Any]:
+        """Contents of suite.json, or an empty dict without one."""
+        metadata_path = self.path / "suite.json"
+        if not metadata_path.exists():
+            return {}
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def title(self) -> str:
+        return self.metadata.get("title", self.name)
+
+    @property
+    def description(self) -> str:
+        return self.metadata.get("description", "")
+
+    @cached_property
+    def prompt(self) -> str:
+        """The prompt sent to the model."""
+        with open(self.path / "prompt.md", 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @cached_property
+    def answer_key(self) -> AnswerKey:
+        """
+        The compiled answer key.
+
+        Raises:
+            ValueError: If answers.txt is empty or its lines are not Q1..Qn in order
+        """
+        with open(self.path / "answers.txt", 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        if not lines:
+            raise ValueError(f"Suite '{self.name}' has no answers")
+        for number, line in enumerate(lines, 1):
+            # match() anchors the pattern at the start of the line
+            match = ANSWER_RE.match(line)
+            if not match or int(match.group(1)) != number:
+                raise ValueError(f"Suite '{self.name}': answer {number} should start with 'Q{number}:', got '{line}'")
+        return AnswerKey(lines)
+
+
+class SuiteRegistry:
+    """
+    Finds suites by directory name.
+
+    Each directory is searched for suite subdirectories (ones containing
+    prompt.md); when a name appears in several directories, the first
+    directory wins.
+    """
+
+    def __init__(self, directories: Optional[List[Path]] = None):
+        self.directories = [Path(d) for d in (directories or [SUITES_DIR])]
+        self._paths: Optional[Dict[str, Path]] = None
+        self._suites: Dict[str, Suite] = {}
+
+    def _scan(self) -> Dict[str, Path]:
+        if self._paths is None:
+            # Built fully before it is published, as server threads may scan at once
+            paths: Dict[str, Path] = {}
+            for directory in self.directories:
+                if not directory.is_dir():
+                    continue
+                for path in sorted(directory.iterdir()):
+                    if (path / "prompt.md").is_file():
+                        paths.setdefault(path.name, path)
+            self._paths = paths
+        return self._paths
+
+    def names(self) -> List[str]:
+        """Names of all available suites, sorted."""
+        return sorted(self._scan())
+
+    def get(self, name: Optional[str] = None) -> Suite:
+        """
+        Return a suite by name, the default suite when name is None.
+
+        Raises:
+            ValueError: If there is no such suite
+        """
+        name = name or DEFAULT_SUITE
+        if name not in self._suites:
+            paths = self._scan()
+            if name not in paths:
+                available = ", ".join(self.names()) or "none"
+                raise ValueError(f"Unknown suite '{name}' (available: {available})")
+            self._suites[name] = Suite(name, paths[name])
+        return self._suites[name]
+
+    def resolve(self, spec: Optional[str]) -> List[Suite]:
+        """
+        Return the suites named in a comma-separated list, without repeats,
+        or the default suite for an empty spec.
+
+        Raises:
+            ValueError: If a name is unknown
+        """
+        names = [name.strip() for name in (spec or "").split(",") if name.strip()]
+        return [self.get(name) for name in dict.fromkeys(names or [DEFAULT_SUITE])]
+
+
+_registry: Optional[SuiteRegistry] = None
+
+
+def default_registry() -> SuiteRegistry:
+    """The registry of the suites shipped in src/suites."""
+    global _registry
+    if _registry is None:
+        _registry = SuiteRegistry()
+    return _registry
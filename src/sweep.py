@@ -0,0 +1,76 @@
+"""
+Sampling Parameter Sweeps
+
+A sweep benchmarks one model at every combination of a grid of sampling
+parameters (temperature, top_p and max_tokens), to find the fastest
+settings that still answer correctly. All points share the model load and
+the prompt, so the server's prompt cache serves every one of them.
+"""
+
+import itertools
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from budget import GenerationBudget
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    """One combination of sampling parameters."""
+    temperature: float
+    top_p: float
+    # As for GenerationBudget: None derives it from the answers, 0 is no limit
+    max_tokens: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        return f"temperature={self.temperature:g} top_p={self.top_p:g} max_tokens={format_max_tokens(self.max_tokens)}"
+
+    def budget(self, reasoning_tokens: int) -> GenerationBudget:
+        return GenerationBudget(max_tokens=self.max_tokens, reasoning_tokens=reasoning_tokens)
+
+
+def format_max_tokens(value: Optional[int]) -> str:
+    if value is None:
+        return "auto"
+    return str(value) if value else "none"
+
+
+def parse_max_tokens(value: str) -> Optional[int]:
+    """
+    Parse a max_tokens grid value: a token count, 0 for no limit, or "auto".
+
+    Raises:
+        ValueError: If the value is neither "auto" nor a non-negative integer
+    """
+    if value == "auto":
+        return None
+    try:
+        tokens = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid max_tokens: {value!r} (expected a token count, 0 or auto)")
+    if tokens < 0:
+        raise ValueError(f"max_tokens cannot be negative: {value!r}")
+    return tokens
+
+
+def sweep_grid(
+    temperatures: Iterable[float],
+    top_ps: Iterable[float],
+    max_tokens: Iterable[Optional[int]]
+) -> List[SweepPoint]:
+    """
+    Every combination of the values, without repeats, in the order given.
+
+    Raises:
+        ValueError: If a temperature is outside 0..2 or a top_p outside (0, 1]
+    """
+    temperatures, top_ps = list(temperatures), list(top_ps)
+    for temperature in temperatures:
+        if not 0 <= temperature <= 2:
+            raise ValueError(f"Temperature must be between 0 and 2: {temperature:g}")
+    for top_p in top_ps:
+        if not 0 < top_p <= 1:
+            raise ValueError(f"top_p must be above 0 and at most 1: {top_p:g}")
+    points = itertools.starmap(SweepPoint, itertools.product(temperatures, top_ps, max_tokens))
+    return list(dict.fromkeys(points))
@@ -0,0 +1,145 @@
+"""
+Benchmark Telemetry
+
+Per-request performance records (latency, time to first token, token counts
+and derived throughput), summary statistics and a JSONL writer.
+"""
+
+import json
+import math
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from llm_client import CompletionUsage
+
+
+@dataclass
+class RequestMetrics:
+    """Performance record for one benchmark request."""
+    model: str
+    iteration: int
+    timestamp: float
+    latency: float
+    score: float
+    time_to_first_token: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    decode_tokens_per_second: Optional[float] = None
+    prefill_tokens_per_second: Optional[float] = None
+    cached: bool = False
+    stopped_early: bool = False
+    suite: Optional[str] = None
+    truncated: bool = False
+    # Warm-up requests are recorded but never scored or summarized
+    warmup: bool = False
+
+    @classmethod
+    def from_timings(
+        cls,
+        model: str,
+        iteration: int,
+        latency: float,
+        score: float,
+        usage: Optional[CompletionUsage] = None,
+        time_to_first_token: Optional[float] = None,
+        cached: bool = False,
+        stopped_early: bool = False,
+        truncated: bool = False
+    ) -> "RequestMetrics":
+        """
+        Build a record and derive throughput from the timings and usage.
+
+        With a time to first token, prefill speed is prompt tokens over TTFT
+        and decode speed is completion tokens over the remaining time. Without
+        one, decode speed is taken over the whole latency, which includes
+        prefill and therefore underestimates it.
+        """
+        metrics = cls(
+            model=model,
+            iteration=iteration,
+            timestamp=time.time(),
+            latency=latency,
+            score=score,
+            time_to_first_token=time_to_first_token,
+            cached=cached,
+            stopped_early=stopped_early,
+            truncated=truncated
+        )
+        if usage is None or cached:
+            return metrics
+
+        metrics.prompt_tokens = usage.prompt_tokens
+        metrics.completion_tokens = usage.completion_tokens
+        if time_to_first_token is not None:
+            if time_to_first_token > 0 and usage.prompt_tokens is not None:
+                metrics.prefill_tokens_per_second = usage.prompt_tokens / time_to_first_token
+            decode_time = latency - time_to_first_token
+        else:
+            decode_time = latency
+        if decode_time > 0 and usage.completion_tokens:
+            metrics.decode_tokens_per_second = usage.completion_tokens / decode_time
+        return metrics
+
+
+@dataclass
+class Stats:
+    """Summary statistics over a set of measurements."""
+    count: int
+    mean: float
+    p50: float
+    p95: float
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Return the q-th percentile (0-100) using linear interpolation."""
+    if not values:
+        raise ValueError("percentile of empty data")
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: List[Optional[float]]) -> Optional[Stats]:
+    """Summarize the non-missing values, or return None if there are none."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return None
+    return Stats(
+        count=len(present),
+        mean=sum(present) / len(present),
+        p50=percentile(present, 50),
+        p95=percentile(present, 95)
+    )
+
+
+class TelemetryWriter:
+    """Appends RequestMetrics to a JSONL file, one record per line."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, metrics: RequestMetrics) -> None:
+        """Append one record and flush it to disk."""
+        line = json.dumps(asdict(metrics))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        self._file.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - close the file."""
+        self.close()
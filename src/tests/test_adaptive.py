@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive iteration stopping rule.
+"""
+
+from src.adaptive import ConfidenceInterval, StoppingRule, mean_confidence_interval, t_critical
+
+
+def test_t_critical():
+    """Test t critical values against the usual table."""
+    table = {1: 12.706, 2: 4.303, 3: 3.182, 5: 2.571, 10: 2.228, 30: 2.042, 120: 1.980}
+    for df, expected in table.items():
+        assert abs(t_critical(df) - expected) / expected < 0.002, (df, t_critical(df))
+    print("✅ t critical values")
+
+
+def test_mean_confidence_interval():
+    """Test the interval of a small sample."""
+    assert mean_confidence_interval([50.0]) is None
+    interval = mean_confidence_interval([70.0, 80.0, 90.0])
+    assert interval.mean == 80.0
+    # stdev 10, n 3, t 4.303
+    assert abs(interval.half_width - 4.303 * 10 / 3 ** 0.5) < 0.01
+    assert mean_confidence_interval([100.0, 100.0]).width == 0.0
+    print("✅ Mean confidence interval")
+
+
+def test_stopping_rule():
+    """Test stopping on interval width and on a settled ranking."""
+    rule = StoppingRule(target_width=5.0, max_iterations=50)
+    assert rule.check([100.0, 100.0]) is None
+    assert rule.check([100.0, 100.0, 100.0]) is not None
+    assert rule.check([60.0, 90.0, 75.0]) is None
+
+    noisy = [60.0, 90.0, 75.0, 80.0]
+    interval = mean_confidence_interval(noisy)
+    far = ConfidenceInterval(mean=10.0, low=5.0, high=15.0)
+    close = ConfidenceInterval(mean=75.0, low=70.0, high=80.0)
+    assert interval.low > far.high
+    assert rule.check(noisy, [far]) is not None
+    assert rule.check(noisy, [far, close]) is None
+    print("✅ Stopping rule")
+
+
+if __name__ == "__main__":
+    test_t_critical()
+    test_mean_confidence_interval()
+    test_stopping_rule()
+    print("✅ All tests passed!")
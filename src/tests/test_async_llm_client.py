@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for the asyncio LM Studio client.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import requests
+
+from src.async_llm_client import AsyncLMStudioClient
+from src.llm_client import Message, Role
+from src.mock_server import MockConfig, serve_in_thread
+
+MESSAGES = [Message(role=Role.USER, content="Reply with OK.")]
+ANSWER = "Q1: OK\nQ2: also OK\n"
+
+
+def test_bodies():
+    """Test content-length (plain) and chunked (streamed) bodies on one pooled connection."""
+    server = serve_in_thread(MockConfig(answer=ANSWER))
+
+    async def main():
+        async with AsyncLMStudioClient(base_url=server.base_url) as client:
+            response = await client.chat_completion(MESSAGES, model="mock-model")
+            assert response.choices[0].message.content == ANSWER
+            (connection,) = client._pool._idle
+
+            async with await client.stream_chat_completion(MESSAGES, model="mock-model") as stream:
+                assert "".join([text async for text in stream]) == ANSWER
+            assert stream.usage is not None and stream.time_to_first_token is not None
+            assert (await client.chat_completion(MESSAGES, stream=True)).choices[0].message.content == ANSWER
+            assert [m.id for m in (await client.get_models()).data] == ["mock-model"]
+
+            # Every body was read to its end, so the connection went back to the pool each time
+            assert client._pool._idle == [connection] and connection.reused
+
+    try:
+        asyncio.run(main())
+        assert server.stats.completions == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Content-length and chunked bodies")
+
+
+def test_pool_limit():
+    """Test that concurrent requests share at most pool_size connections."""
+    server = serve_in_thread(MockConfig(answer=ANSWER, latency=0.05))
+
+    async def main():
+        async with AsyncLMStudioClient(base_url=server.base_url, pool_size=2) as client:
+            responses = await asyncio.gather(*(client.chat_completion(MESSAGES) for _ in range(6)))
+            assert all(r.choices[0].message.content == ANSWER for r in responses)
+            connections = list(client._pool._idle)
+            assert len(connections) == 2
+
+            await asyncio.gather(*(client.chat_completion(MESSAGES) for _ in range(4)))
+            assert sorted(map(id, client._pool._idle)) == sorted(map(id, connections))
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Connection pool limit and reuse")
+
+
+def test_http_error():
+    """Test that HTTP errors carry the response status, and the connection stays usable."""
+    server = serve_in_thread(MockConfig(error_rate=1.0, error_status=400))
+
+    async def main():
+        async with AsyncLMStudioClient(base_url=server.base_url) as client:
+            for _ in range(2):
+                try:
+                    await client.chat_completion(MESSAGES)
+                except requests.RequestException as e:
+                    assert e.response is not None and e.response.status_code == 400
+                    assert "Injected error" in str(e)
+                else:
+                    raise AssertionError("errors are raised")
+            assert len(client._pool._idle) == 1
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ HTTP errors")
+
+
+if __name__ == "__main__":
+    test_bodies()
+    test_pool_limit()
+    test_http_error()
+    print("✅ All tests passed!")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for load balancing across LM Studio endpoints.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import requests
+
+from src.balancer import EndpointPool, EndpointSpec, is_endpoint_failure, parse_endpoint_spec
+from src.llm_client import Message, Role
+from src.mock_server import MockConfig, serve_in_thread
+
+
+def test_parse_endpoint_spec():
+    """Test URL=WEIGHT specs."""
+    assert parse_endpoint_spec("http://a:1234/v1") == EndpointSpec("http://a:1234/v1", 1.0)
+    assert parse_endpoint_spec("http://a:1234/v1=2.5") == EndpointSpec("http://a:1234/v1", 2.5)
+    for bad in ("http://a=0", "http://a=x", "=2"):
+        try:
+            parse_endpoint_spec(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad} should be rejected")
+    print("✅ Endpoint specs")
+
+
+def test_is_endpoint_failure():
+    """Test which errors move a request to another endpoint."""
+    response = requests.Response()
+    response.status_code = 400
+    assert not is_endpoint_failure(requests.RequestException("bad request", response=response))
+    response.status_code = 503
+    assert is_endpoint_failure(requests.RequestException("unavailable", response=response))
+    assert is_endpoint_failure(requests.RequestException("timed out"))
+    print("✅ Endpoint failures")
+
+
+def test_dispatch_and_failover():
+    """Test weighted dispatch, the health check and failover."""
+    servers = [
+        serve_in_thread(MockConfig(answer="Q1: a")),
+        serve_in_thread(MockConfig(answer="Q1: a", error_rate=1.0)),
+        serve_in_thread(MockConfig(answer="Q1: a", models=["other"])),
+    ]
+    try:
+        # The failing endpoint's weight makes it the first choice
+        specs = [EndpointSpec(s.base_url, weight) for s, weight in zip(servers, (1.0, 2.0, 1.0))]
+        with EndpointPool(specs) as pool:
+            pool.check_health(["mock-model"])
+            assert [e.models for e in pool.endpoints] == [{"mock-model"}, {"mock-model"}, {"other"}]
+            try:
+                pool.check_health(["missing"])
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("a model on no endpoint should be rejected")
+
+            messages = [Message(role=Role.USER, content="Q1: ?")]
+            for _ in range(4):
+                response = pool.chat_completion(messages, model="mock-model")
+                assert response.choices[0].message.content == "Q1: a"
+            with pool.stream_chat_completion(messages, model="mock-model") as chat_stream:
+                assert pool.endpoints[0].outstanding == 1
+                assert "".join(chat_stream) == "Q1: a"
+            assert pool.endpoints[0].outstanding == 0
+
+            good, failing, other = pool.endpoints
+            # The failing endpoint got one request, then sat out its cooldown
+            assert (failing.requests, failing.failures) == (1, 1)
+            assert good.requests == 5 and other.requests == 0
+            assert servers[0].stats.completions == 5
+
+            assert [m.id for m in pool.get_models().data] == ["mock-model", "other"]
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+    print("✅ Dispatch and failover")
+
+
+def test_failover_logging():
+    """Test that a failure only says it tries another endpoint when one is left to try."""
+    records = []
+    handler = logging.Handler()
+    handler.emit = lambda record: records.append(record.getMessage())
+    logging.getLogger().addHandler(handler)
+    servers = [serve_in_thread(MockConfig(error_rate=1.0, error_status=503)) for _ in range(2)]
+    try:
+        messages = [Message(role=Role.USER, content="Q1: ?")]
+        for count in (1, 2):
+            records.clear()
+            with EndpointPool([EndpointSpec(s.base_url) for s in servers[:count]]) as pool:
+                pool.check_health(["mock-model"])
+                try:
+                    pool.chat_completion(messages, model="mock-model")
+                except requests.RequestException as e:
+                    assert e.response is not None and e.response.status_code == 503
+                else:
+                    raise AssertionError("the last endpoint's error is raised")
+            failures = [r for r in records if r.startswith("Endpoint ")]
+            assert len(failures) == count, failures
+            assert sum("trying another" in r for r in failures) == count - 1
+            assert "trying another" not in failures[-1]
+    finally:
+        logging.getLogger().removeHandler(handler)
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+    print("✅ Failover logging")
+
+
+def test_stream_failure():
+    """Test that a stream breaking off partway counts against its endpoint."""
+    server = serve_in_thread(MockConfig(answer="Q1: a b c d e f", stream_cutoff=3))
+    try:
+        messages = [Message(role=Role.USER, content="Q1: ?")]
+        for transport in ("http.client", "requests"):
+            with EndpointPool([EndpointSpec(server.base_url)], transport=transport) as pool:
+                pool.check_health(["mock-model"])
+                received = []
+                try:
+                    with pool.stream_chat_completion(messages, model="mock-model") as chat_stream:
+                        for delta in chat_stream:
+                            received.append(delta)
+                except requests.RequestException:
+                    pass
+                else:
+                    raise AssertionError("the broken stream raises")
+                (endpoint,) = pool.endpoints
+                assert "".join(received) == "Q1: a b" and chat_stream.error is not None
+                assert (endpoint.outstanding, endpoint.requests, endpoint.failures) == (0, 1, 1), transport
+                assert endpoint.down_until > 0
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Failed streams")
+
+
+if __name__ == "__main__":
+    test_parse_endpoint_spec()
+    test_is_endpoint_failure()
+    test_dispatch_and_failover()
+    test_failover_logging()
+    test_stream_failure()
+    print("✅ All tests passed!")
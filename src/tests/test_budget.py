@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test script for the generation budget.
+"""
+
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.budget import ANSWER_HEADROOM, GenerationBudget, estimate_tokens
+from src.evaluator import AnswerKey
+from src.prompts import PromptLayout, build_requests
+
+PROMPT = "Rules and documents.\n\n### Questions\n\nQ1: First?\nQ2: Second?\n"
+KEY = AnswerKey(["Q1: short", "Q2: a much longer answer"])
+
+
+def test_derived_limit():
+    """Test max_tokens derived from the answers each request asks for."""
+    budget = GenerationBudget(max_tokens=None, reasoning_tokens=100)
+    whole = build_requests(PROMPT, PromptLayout.SPLIT)
+    per_question = build_requests(PROMPT, PromptLayout.PER_QUESTION)
+    assert budget.limit(whole, KEY) == estimate_tokens("\n".join(KEY.lines)) * ANSWER_HEADROOM + 100
+    # One request per question only needs room for the longest single answer
+    assert budget.limit(per_question, KEY) == estimate_tokens(KEY.lines[1]) * ANSWER_HEADROOM + 100
+    print("✅ Derived max_tokens")
+
+
+def test_sampling():
+    """Test fixed and disabled limits and stop sequences."""
+    requests = build_requests(PROMPT, PromptLayout.SINGLE)
+    base = {"temperature": 0.1}
+    assert GenerationBudget(max_tokens=50, stop=["</answers>"]).sampling(base, requests, KEY) == {
+        "temperature": 0.1, "max_tokens": 50, "stop": ["</answers>"]
+    }
+    assert GenerationBudget(max_tokens=0).sampling(base, requests, KEY) == base
+    # No limit unless one is asked for
+    assert GenerationBudget().sampling(base, requests, KEY) == base
+    assert base == {"temperature": 0.1}
+    print("✅ Sampling parameters")
+
+
+if __name__ == "__main__":
+    test_derived_limit()
+    test_sampling()
+    print("✅ All tests passed!")
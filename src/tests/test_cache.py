@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk response cache.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cache import CacheMode, ResponseCache, cache_key, prompt_hash
+from src.cli import run_iteration
+from src.llm_client import CompletionUsage, LMStudioClient
+from src.mock_server import MockConfig, serve_in_thread
+from src.prompts import PromptLayout, build_requests
+from src.suites import default_registry
+
+PARAMS = {"temperature": 0.1, "max_tokens": 1000}
+
+
+def test_round_trip():
+    """Test that a stored response comes back with its usage, and bad entries are misses."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(Path(tmp))
+        key = cache_key("model-a", prompt_hash("prompt"), PARAMS, 1)
+        assert cache.get(key) is None
+
+        usage = CompletionUsage(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+        cache.put(key, "Q1: A", usage)
+        cached = cache.get(key)
+        assert cached.content == "Q1: A" and cached.created <= time.time()
+        # Compared field by field: cache.py loads llm_client by its flat name
+        assert vars(cached.usage) == vars(usage)
+        cache.put(key, "Q1: B")
+        assert cache.get(key).content == "Q1: B" and cache.get(key).usage is None
+
+        path = cache._path(key)
+        for text in ("{not json", "[1, 2]", '{"content": "Q1: A"}', '{"content": "x", "created": 0, "usage": {"foo": 1}}'):
+            path.write_text(text)
+            assert cache.get(key) is None, text
+    print("✅ Cache round trip")
+
+
+def test_key_sensitivity():
+    """Test that the key changes with the model, prompt, params and sample index."""
+    digest = prompt_hash("prompt")
+    base = cache_key("model-a", digest, PARAMS, 1)
+    assert base == cache_key("model-a", digest, dict(reversed(list(PARAMS.items()))), 1)
+    variants = [
+        cache_key("model-b", digest, PARAMS, 1),
+        cache_key("model-a", prompt_hash("prompt 2"), PARAMS, 1),
+        cache_key("model-a", digest, {**PARAMS, "temperature": 0.2}, 1),
+        cache_key("model-a", digest, PARAMS, 2),
+    ]
+    assert len({base, *variants}) == 5
+    print("✅ Cache key sensitivity")
+
+
+def test_modes():
+    """Test that read-only mode never stores and write-only mode never reuses."""
+    suite = default_registry().get()
+    prompt_requests = build_requests(suite.prompt, PromptLayout.SINGLE)
+    server = serve_in_thread(MockConfig())
+    try:
+        with tempfile.TemporaryDirectory() as tmp, LMStudioClient(base_url=server.base_url) as client:
+            cache = ResponseCache(Path(tmp))
+
+            def run(mode: CacheMode):
+                return run_iteration(client, "mock-model", prompt_requests, suite.answer_key, 1,
+                                     cache=cache, cache_mode=mode)
+
+            assert not run(CacheMode.READ).cached and not list(Path(tmp).glob("*/*.json"))
+            assert not run(CacheMode.WRITE).cached and len(list(Path(tmp).glob("*/*.json"))) == 1
+            assert not run(CacheMode.WRITE).cached
+            assert server.stats.completions == 3
+
+            result = run(CacheMode.READ)
+            assert result.cached and result.score == 100.0
+            assert run(CacheMode.READWRITE).cached
+            assert server.stats.completions == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Cache modes")
+
+
+def test_eviction():
+    """Test that unused entries age out and the least recently used go first when over size."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(Path(tmp), max_age=3600)
+        now = time.time()
+        keys = [cache_key("model", prompt_hash("prompt"), PARAMS, i) for i in range(4)]
+        for age, key in zip((7200, 300, 200, 100), keys):
+            cache.put(key, "x" * 100)
+            os.utime(cache._path(key), (now - age, now - age))
+
+        # Reading the oldest surviving entry makes it the most recently used
+        assert cache.get(keys[1]) is not None
+        # Entry sizes differ by a byte or so with the length of their timestamps
+        cache.max_bytes = sum(cache._path(keys[i]).stat().st_size for i in (1, 3))
+        assert cache.evict() == 2
+        assert [cache.get(key) is not None for key in keys] == [False, True, False, True]
+        assert cache.evict() == 0
+    print("✅ Cache eviction")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_key_sensitivity()
+    test_modes()
+    test_eviction()
+    print("✅ All tests passed!")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Test script for running and scoring iterations against the mock server.
+"""
+
+import json
+import logging
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.balancer import EndpointPool, EndpointSpec
+from src.cache import CacheMode, ResponseCache
+from src.cli import ModelSummary, SuiteRun, load_resumed_run, run_benchmark, run_iterations, warm_up
+from src.llm_client import LMStudioClient
+from src.mock_server import MockConfig, serve_in_thread
+from src.prompts import PromptLayout, build_requests
+from src.scheduler import ModelRun
+from src.store import ResultsStore
+from src.suites import default_registry
+
+
+def test_choices_share_request_time():
+    """Test that one request for k choices adds up to the same totals as a request for one."""
+    suite = default_registry().get()
+    prompt_requests = build_requests(suite.prompt, PromptLayout.SINGLE)
+    server = serve_in_thread(MockConfig(latency=0.3))
+    try:
+        with LMStudioClient(base_url=server.base_url) as client:
+            summaries = {}
+            for iterations in ([1], [1, 2, 3, 4]):
+                results = run_iterations(client, "mock-model", prompt_requests, suite.answer_key, iterations)
+                summaries[len(iterations)] = ModelSummary(model="mock-model", results=results, wall_time=0.0)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    single, multiple = summaries[1].succeeded, summaries[4].succeeded
+    single_time = sum(r.elapsed for r in single)
+    multiple_time = sum(r.elapsed for r in multiple)
+    assert 0.3 <= single_time and abs(multiple_time - single_time) < 0.15, (single_time, multiple_time)
+
+    prompt_tokens = [r.metrics.prompt_tokens for r in multiple]
+    assert prompt_tokens[0] == single[0].metrics.prompt_tokens and prompt_tokens[1:] == [None] * 3
+    assert all(r.metrics.prefill_tokens_per_second is None for r in multiple[1:])
+    # Decode speed is the call's: all the choices' tokens over its time
+    call_decode = sum(r.metrics.completion_tokens for r in multiple) / multiple_time
+    for r in multiple:
+        assert r.metrics.completion_tokens == single[0].metrics.completion_tokens
+        assert abs(r.metrics.decode_tokens_per_second - call_decode) < 1e-6 * call_decode
+    print("✅ Choices of one request share its time and prompt")
+
+
+def test_cached_iterations_not_timed():
+    """Test that only the iterations sent to the server share the request's time."""
+    suite = default_registry().get()
+    prompt_requests = build_requests(suite.prompt, PromptLayout.SINGLE)
+    server = serve_in_thread(MockConfig(latency=0.3))
+    try:
+        with tempfile.TemporaryDirectory() as tmp, LMStudioClient(base_url=server.base_url) as client:
+            cache = ResponseCache(Path(tmp))
+            run_iterations(client, "mock-model", prompt_requests, suite.answer_key, [1],
+                           cache=cache, cache_mode=CacheMode.READWRITE)
+            results = run_iterations(client, "mock-model", prompt_requests, suite.answer_key, [1, 2, 3],
+                                     cache=cache, cache_mode=CacheMode.READWRITE)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    cached, *sent = results
+    assert cached.cached and cached.metrics.cached and cached.elapsed < 0.05, cached.elapsed
+    # The one request for the two missing iterations, split between them only
+    assert not any(r.cached for r in sent) and all(r.elapsed >= 0.15 for r in sent), [r.elapsed for r in sent]
+    print("✅ Cached iterations keep out of the request time")
+
+
+def test_resume_reruns_only_unfinished():
+    """Test that a resumed run only repeats the iterations that failed or never ran."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store_path = Path(tmp) / "results.db"
+        # Seeded so that some of the four iterations fail and some succeed
+        server = serve_in_thread(MockConfig(error_rate=0.5, seed=0))
+        try:
+            run_benchmark([ModelRun("mock-model", 4)], [EndpointSpec(base_url=server.base_url)], store_path=store_path)
+        except SystemExit as e:
+            assert e.code == 1
+        else:
+            raise AssertionError("a run with failed iterations exits with status 1")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        with ResultsStore(store_path) as store:
+            (run,) = store.runs()
+            stored = store.load_iterations(run.id, include_failed=True)
+        failed = {s.iteration for s in stored if s.error is not None}
+        succeeded = {s.iteration: s.metrics.timestamp for s in stored if s.error is None}
+        assert failed and len(succeeded) >= 2, (failed, succeeded)
+        # One successful iteration never got checkpointed, as if the session had been killed
+        missing = max(succeeded)
+        del succeeded[missing]
+        with sqlite3.connect(store_path) as db:
+            db.execute("PRAGMA foreign_keys = ON")
+            db.execute("DELETE FROM iterations WHERE iteration = ?", (missing,))
+
+        runs, layout, stream, stopping, _, budget, samples = load_resumed_run(store_path, run.id)
+        assert [(r.model, r.iterations) for r in runs] == [("mock-model", 4)] and layout.value == "single"
+        server = serve_in_thread(MockConfig())
+        try:
+            run_benchmark(
+                runs, [EndpointSpec(base_url=server.base_url)], stream=stream, layout=layout,
+                store_path=store_path, resume_id=run.id, stopping=stopping, budget=budget, samples=samples
+            )
+            assert server.stats.completions == len(failed) + 1
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        with ResultsStore(store_path) as store:
+            resumed = store.load_iterations(run.id, include_failed=True)
+        assert [s.iteration for s in resumed] == [1, 2, 3, 4] and all(s.error is None for s in resumed)
+        # The iterations that were already done kept their original records
+        assert all(s.metrics.timestamp == succeeded[s.iteration] for s in resumed if s.iteration in succeeded)
+    print("✅ Resume only repeats failed and missing iterations")
+
+
+def test_warmup_load_time():
+    """Test that the model load is reported as warm-up time and kept out of the iteration latencies."""
+    records = []
+    handler = logging.Handler()
+    handler.emit = lambda record: records.append(record.getMessage())
+    logging.getLogger().addHandler(handler)
+    # cli's logging.basicConfig does nothing when a test runner has already
+    # configured logging, so set the level the summary is logged at here
+    logger = logging.getLogger(run_benchmark.__module__)
+    level = logger.level
+    logger.setLevel(logging.INFO)
+    server = serve_in_thread(MockConfig(load_time=0.4))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            telemetry_path = Path(tmp) / "telemetry.jsonl"
+            run_benchmark(
+                [ModelRun("mock-model", 2)], [EndpointSpec(base_url=server.base_url)], warmup=2,
+                telemetry_path=telemetry_path, store_path=Path(tmp) / "results.db"
+            )
+            telemetry = [json.loads(line) for line in telemetry_path.read_text().splitlines()]
+    finally:
+        logger.setLevel(level)
+        logging.getLogger().removeHandler(handler)
+        server.shutdown()
+        server.server_close()
+
+    warmups = [m for m in telemetry if m["warmup"]]
+    iterations = [m for m in telemetry if not m["warmup"]]
+    assert len(warmups) == 2 and warmups[0]["latency"] >= 0.4 and warmups[1]["latency"] < 0.4
+    assert [m["iteration"] for m in iterations] == [1, 2] and all(m["latency"] < 0.4 for m in iterations)
+
+    (load_line,) = [r for r in records if r.startswith("Model load time (warm-up):")]
+    assert float(load_line.split(":")[1].strip().rstrip("s")) >= 0.4
+    (request_line,) = [r for r in records if r.startswith("Sum of request times:")]
+    assert float(request_line.split(":")[1].strip().rstrip("s")) < 0.4
+    print("✅ Warm-up load time reported separately")
+
+
+def test_warmup_uses_endpoint_transport():
+    """Test that warm-up goes through the endpoint's transport and leaves its connection pooled."""
+    suite = default_registry().get()
+    suite_run = SuiteRun(suite=suite, prompt_requests=build_requests(suite.prompt, PromptLayout.SINGLE))
+    server = serve_in_thread(MockConfig())
+    try:
+        # Not the transport "auto" would pick for this server
+        with EndpointPool([EndpointSpec(base_url=server.base_url)], transport="requests") as pool:
+            pool.check_health(["mock-model"])
+            transport = pool.endpoints[0].client.transport
+            sent = []
+            request = transport.request
+            transport.request = lambda *args, **kwargs: sent.append(args[:2]) or request(*args, **kwargs)
+            assert warm_up(pool, "mock-model", [suite_run], 2) is not None
+            assert len(sent) == 2 and all(method == "POST" for method, _ in sent)
+            # Still open for the measured iterations
+            response = pool.chat_completion(suite_run.prompt_requests[0].messages, model="mock-model")
+            assert response.choices[0].message.content and len(sent) == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Warm-up shares the endpoint's transport")
+
+
+def test_loaded_model_runs_first():
+    """Test that the model the server already has loaded is benchmarked before any swap."""
+    server = serve_in_thread(MockConfig(models=["model-a", "model-b"], loaded_model="model-b"))
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            run_benchmark(
+                [ModelRun("model-a", 1), ModelRun("model-b", 1)], [EndpointSpec(base_url=server.base_url)],
+                store_path=Path(tmp) / "results.db"
+            )
+        # Only the swap to model-a; the requested order would load both
+        assert server.stats.loads == 1 and server.loaded_model == "model-a"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    # Nothing loaded yet, and servers without LM Studio's REST API, give no hint
+    server = serve_in_thread(MockConfig())
+    try:
+        with LMStudioClient(base_url=server.base_url) as client:
+            assert client.get_loaded_models() == []
+            client.base_url = server.base_url + "/missing/v1"
+            assert client.get_loaded_models() == []
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Loaded model runs first")
+
+
+if __name__ == "__main__":
+    test_choices_share_request_time()
+    test_cached_iterations_not_timed()
+    test_resume_reruns_only_unfinished()
+    test_warmup_load_time()
+    test_warmup_uses_endpoint_transport()
+    test_loaded_model_runs_first()
+    print("✅ All tests passed!")
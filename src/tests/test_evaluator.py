@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for the evaluator's edit distance and scoring.
+"""
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.bulk import score_file
+from src.evaluator import MAX_LINE, AnswerExtractor, AnswerKey, extract_answers, levenshtein, match_line, score_lines
+from src.suites import SuiteRegistry
+
+GOLD = SuiteRegistry().get().answer_key.lines
+
+def reference_levenshtein(a: str, b: str) -> int:
+    """The original O(n*m) dynamic programming implementation."""
+    n, m = len(a), len(b)
+    if n == 0: return m
+    if m == 0: return n
+    prev = list(range(m + 1))
+    for i, ca in enumerate(a, 1):
+        curr = [i] + [0] * m
+        for j, cb in enumerate(b, 1):
+            curr[j] = min(
+                curr[j - 1] + 1,         # insertion
+                prev[j] + 1,             # deletion
+                prev[j - 1] + (ca != cb) # substitution
+            )
+        prev = curr
+    return prev[m]
+
+def reference_match_line(line: str, gold_line: str) -> float:
+    """The original match_line scoring, without output."""
+    total_dist = reference_levenshtein(line, gold_line)
+    max_dist = len(max(line, gold_line))
+    score = 0.0 if total_dist >= max_dist else (1 - (total_dist / max_dist)) * 100.0
+    return score / 2 if score < 100 else score
+
+def random_pairs(count: int, seed: int = 1234):
+    """Random string pairs, biased towards near-misses of the gold answers."""
+    rng = random.Random(seed)
+    alphabet = "abcQ:0123456789$,. -%MB"
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            gold = rng.choice(GOLD)
+            chars = list(gold)
+            for _ in range(rng.randint(0, 4)):
+                pos = rng.randint(0, len(chars))
+                op = rng.choice("ids")
+                if op == "i":
+                    chars.insert(pos, rng.choice(alphabet))
+                elif chars and pos < len(chars):
+                    if op == "d":
+                        del chars[pos]
+                    else:
+                        chars[pos] = rng.choice(alphabet)
+            yield "".join(chars), gold
+        else:
+            a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 90)))
+            b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 90)))
+            yield a, b
+
+def test_levenshtein_parity():
+    """Test that the bit-parallel distance matches the DP on random pairs."""
+    pairs = list(random_pairs(3000))
+    pairs += [("", ""), ("", "abc"), ("abc", ""), ("a", "a"), ("kitten", "sitting"),
+              ("x" * 200, "y" * 200), ("ab" * 100, "ba" * 100)]
+    for a, b in pairs:
+        expected = reference_levenshtein(a, b)
+        assert levenshtein(a, b) == expected, (a, b)
+        for cutoff in (0, 1, 3, 10):
+            capped = levenshtein(a, b, cutoff)
+            assert capped == (expected if expected <= cutoff else cutoff + 1), (a, b, cutoff)
+    print(f"✅ Distances match the reference on {len(pairs)} pairs")
+
+def test_match_line_parity():
+    """Test that match_line scores are unchanged."""
+    pairs = list(random_pairs(3000, seed=99))
+    pairs += [(gold, gold) for gold in GOLD] + [("", gold) for gold in GOLD]
+    pairs += [("Q4: 25 MB", "Q4: 25MB"), ("Z" * 500, "Q1: 2025-01-31"), ("", "")]
+    for line, gold in pairs:
+        assert match_line((line, gold), verbose=False) == reference_match_line(line, gold), (line, gold)
+    print(f"✅ Scores match the reference on {len(pairs)} pairs")
+
+def test_answer_key_parity():
+    """Test that a compiled answer key scores exactly like match_line."""
+    key = AnswerKey(GOLD + [""])
+    rng = random.Random(7)
+    for line, gold in random_pairs(2000, seed=5):
+        index = rng.randrange(len(key))
+        line = line if rng.random() < 0.5 else gold
+        expected = match_line((line, key.lines[index]), verbose=False)
+        assert key.score(index, line, verbose=False) == expected, (line, key.lines[index])
+    print("✅ Answer key scores match match_line")
+
+def test_score_lines():
+    """Test scoring the last answer lines of an output."""
+    key = AnswerKey(["Q1: a", "Q2: b"])
+    assert score_lines(["preamble", "Q1: a", "", "Q2: b"], key) == [100.0, 100.0]
+    # Only the last two lines count, so they are scored out of order
+    assert score_lines(["Q1: a", "Q2: x", "Q1: a"], key, verbose=False) == [30.0, 30.0]
+    assert score_lines([], key, verbose=False) == [0.0, 0.0]
+    print("✅ Last answer lines are scored")
+
+def test_partial_output():
+    """Test that questions without an answer line score 0 instead of being left out."""
+    key = AnswerKey(GOLD)
+    lines = ["Let me think.", GOLD[0], GOLD[1]]
+    scores = score_lines(lines, key, verbose=False)
+    assert scores == [100.0, 100.0] + [0.0] * (len(GOLD) - 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "partial.txt"
+        path.write_text("\n".join(lines) + "\n")
+        result = score_file(str(path), key)
+    assert result.scores == scores and abs(result.score - 200.0 / len(GOLD)) < 1e-9
+    print("✅ Partial outputs score missing answers as 0")
+
+def test_answer_extractor():
+    """Test skipping reasoning and tags split across chunks."""
+    text = "<think>\nQ1: draft\nQ2: draft\n</think>\nQ1: a\nQ2: b\n"
+    assert extract_answers([text], 2) == ["Q1: a", "Q2: b"]
+    # The same text in chunks of every size
+    for size in range(1, 12):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert extract_answers(chunks, 2) == ["Q1: a", "Q2: b"], size
+    # A closing tag alone drops the reasoning before it
+    assert extract_answers(["Q1: draft\nQ2: x</think>Q1: a\nQ2: b"], 2) == ["Q1: a", "Q2: b"]
+    assert extract_answers(["Q1: a\nQ2: b\n<think>Q2: more"], 2) == ["Q1: a", "Q2: b"]
+    assert extract_answers(["Question: no\nQ1: a <b>\n"], 2) == ["Q1: a <b>"]
+
+    extractor = AnswerExtractor(1, question=2)
+    for _ in range(1000):
+        extractor.feed("x" * 1000)
+    extractor.feed("\nQ2: b\nQ3: c\ntrailing")
+    extractor.finish()
+    assert list(extractor.answers) == ["Q2: b"] and extractor.last_line == "trailing"
+    assert len(extractor._line) <= MAX_LINE
+    print("✅ Streaming answer extraction")
+
+if __name__ == "__main__":
+    print("Testing evaluator...")
+    print("=" * 50)
+    
+    test_levenshtein_parity()
+    test_match_line_parity()
+    test_answer_key_parity()
+    test_score_lines()
+    test_partial_output()
+    test_answer_extractor()
+    
+    print("=" * 50)
+    print("✅ All tests passed!")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for the distributed job queue.
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.coordinator import QueueServer, RemoteQueue
+from src.jobqueue import MAX_ATTEMPTS, JobQueue, PlanSuite
+from src.scheduler import ModelRun
+from src.telemetry import RequestMetrics
+
+SUITE = PlanSuite(
+    name="tiny",
+    prompt="Rules.\n\n### Questions\n\nQ1: First?\n",
+    answers=["Q1: yes"],
+    prompt_hash="abc123",
+    sampling={"temperature": 0.1}
+)
+
+
+def make_queue(directory: str) -> JobQueue:
+    return JobQueue(Path(directory) / "results.db")
+
+
+def test_lease_and_complete():
+    """Test leasing in model order, model affinity, completion and the stored run."""
+    with tempfile.TemporaryDirectory() as tmp, make_queue(tmp) as queue:
+        plan_id = queue.create_plan([ModelRun("a", 2), ModelRun("b", 1)], [SUITE], "single")
+        assert queue.status(plan_id)[0].queued == 3
+
+        first = queue.lease("w1", ["a", "b"])
+        assert (first.model, first.iteration, first.answers, first.attempt) == ("a", 1, ["Q1: yes"], 1)
+        # A worker with b loaded takes b before the rest of a
+        assert queue.lease("w2", ["a", "b"], prefer="b").model == "b"
+        assert queue.lease("w3", ["c"]) is None
+
+        metrics = RequestMetrics(model="a", iteration=1, timestamp=1.0, latency=2.0, score=100.0)
+        assert queue.complete(first.id, "w1", "Q1: yes", ["Q1: yes"], [100.0], metrics)
+        # Only the lease holder can complete, and only once
+        assert not queue.complete(first.id, "w1", "Q1: yes", ["Q1: yes"], [100.0])
+        status = queue.status(plan_id)[0]
+        assert (status.queued, status.leased, status.done, status.workers) == (1, 1, 1, ["w2"])
+
+        run = queue.runs()[0]
+        assert run.params["plan"] == plan_id and run.params["models"] == {"a": 2, "b": 1}
+        assert run.finished is None
+        stored = queue.load_iterations(run.id)
+        assert [(s.model, s.iteration, s.scores) for s in stored] == [("a", 1, [100.0])]
+    print("✅ Lease and complete")
+
+
+def test_expiry_and_retries():
+    """Test re-queueing expired leases and failed jobs, up to MAX_ATTEMPTS."""
+    with tempfile.TemporaryDirectory() as tmp, make_queue(tmp) as queue:
+        plan_id = queue.create_plan([ModelRun("a", 1)], [SUITE], "single")
+        # An already expired lease, as from a worker that died
+        job = queue.lease("dead", ["a"], duration=-1)
+        assert not queue.renew(job.id, "other")
+        retry = queue.lease("w1", ["a"])
+        assert retry.id == job.id and retry.attempt == 2
+        assert not queue.complete(job.id, "dead", error="too late")
+
+        assert queue.complete(retry.id, "w1", error="server error")
+        last = queue.lease("w1", ["a"])
+        assert last.attempt == MAX_ATTEMPTS
+        assert queue.complete(last.id, "w1", error="server error")
+        status = queue.status(plan_id)[0]
+        assert (status.queued, status.failed) == (0, 1)
+
+        # The final failure is stored, so bench --resume can retry it
+        run = queue.runs()[0]
+        assert run.finished is not None
+        assert [s.error for s in queue.load_iterations(run.id, include_failed=True)] == ["server error"]
+    print("✅ Expired leases and retries")
+
+
+def test_remote_queue():
+    """Test a worker's calls through the coordinator service."""
+    with tempfile.TemporaryDirectory() as tmp, make_queue(tmp) as queue:
+        plan_id = queue.create_plan([ModelRun("a", 1)], [SUITE], "split")
+        server = QueueServer(("127.0.0.1", 0), queue)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            with RemoteQueue(server.url) as remote:
+                job = remote.lease("w1", ["a"])
+                assert (job.layout, job.sampling) == ("split", {"temperature": 0.1})
+                assert remote.renew(job.id, "w1")
+                metrics = RequestMetrics(model="a", iteration=1, timestamp=1.0, latency=2.0, score=100.0)
+                assert remote.complete(job.id, "w1", "Q1: yes", ["Q1: yes"], [100.0], metrics)
+                assert remote.lease("w1", ["a"]) is None
+                assert remote.status(plan_id)[0].done == 1
+        finally:
+            server.shutdown()
+            server.server_close()
+        stored = queue.load_iterations(queue.runs()[0].id)
+        assert stored[0].metrics.latency == 2.0
+    print("✅ Remote queue")
+
+
+if __name__ == "__main__":
+    test_lease_and_complete()
+    test_expiry_and_retries()
+    test_remote_queue()
+    print("✅ All tests passed!")
@@ -3,6 +3,12 @@
 Test script for the LM Studio client.
 """
 
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
 from src.llm_client import LMStudioClient, Message, Role
 
 def test_client_instantiation():
@@ -27,6 +33,22 @@ def test_client_with_custom_config():
     )
     print(f"✅ Custom client created with timeout: {client.timeout}")
 
+def test_payload_choices():
+    """Test that n is only sent when asking for several choices."""
+    client = LMStudioClient()
+    messages = [Message(role=Role.USER, content="Hi")]
+    sampling = dict(model=None, temperature=0.1, max_tokens=None, top_p=1.0,
+                    frequency_penalty=0.0, presence_penalty=0.0, stream=False, stop=None)
+    assert "n" not in client._build_payload(messages, **sampling)
+    assert client._build_payload(messages, n=4, **sampling)["n"] == 4
+    try:
+        client.chat_completion(messages, stream=True, n=2)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("several choices cannot be streamed")
+    print("✅ Choices per request in the payload")
+
 if __name__ == "__main__":
     print("Testing LM Studio Client Implementation...")
     print("=" * 50)
@@ -34,6 +56,7 @@ if __name__ == "__main__":
     test_client_instantiation()
     test_message_creation()
     test_client_with_custom_config()
+    test_payload_choices()
     
     print("=" * 50)
     print("✅ All tests passed! The client implementation is working correctly.")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the live benchmark metrics.
+"""
+
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import requests
+
+from src.balancer import EndpointPool, EndpointSpec
+from src.llm_client import Message, Role
+from src.metrics import BenchmarkMetrics, Counter, Histogram, Metric, MetricsServer
+from src.mock_server import MockConfig, serve_in_thread
+
+
+def test_text_format():
+    """Test counters, histograms and label escaping in the text format."""
+    counter = Counter("jobs_total", "Jobs", ("model",))
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    assert counter.render() == '# HELP jobs_total Jobs\n# TYPE jobs_total counter\njobs_total{model="a\\"b"} 3'
+
+    histogram = Histogram("latency_seconds", "Latency", ("model",), buckets=(1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe("m", value=value)
+    lines = histogram.render().split("\n")[2:]
+    assert lines == [
+        'latency_seconds_bucket{model="m",le="1"} 2',
+        'latency_seconds_bucket{model="m",le="5"} 3',
+        'latency_seconds_bucket{model="m",le="+Inf"} 4',
+        'latency_seconds_sum{model="m"} 14.5',
+        'latency_seconds_count{model="m"} 4',
+    ]
+
+    # Every kind of metric says how to list its samples
+    try:
+        Metric("untyped", "No samples")
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Metric.samples is abstract")
+    print("✅ Text format")
+
+
+def test_pool_metrics():
+    """Test request metrics recorded by the endpoint pool, and scraping them."""
+    config = MockConfig(error_rate=1.0, error_status=400)
+    bad = serve_in_thread(config)
+    good = serve_in_thread()
+    metrics = BenchmarkMetrics()
+    messages = [Message(role=Role.USER, content="Reply with OK.")]
+    try:
+        with EndpointPool([EndpointSpec(good.base_url)], metrics=metrics) as pool:
+            pool.chat_completion(messages, model="mock-model")
+            pool.stream_chat_completion(messages, model="mock-model").close()
+        with EndpointPool([EndpointSpec(bad.base_url)], metrics=metrics) as pool:
+            try:
+                pool.chat_completion(messages, model="mock-model")
+            except requests.RequestException:
+                pass
+        metrics.iteration_finished("mock-model", "suite", 1.5, score=87.5, decode_tokens_per_second=42.0)
+        metrics.iteration_finished("mock-model", "suite", 0.1)
+
+        with MetricsServer(("127.0.0.1", 0), metrics) as server:
+            text = requests.get(server.url, timeout=5).text
+        assert f'bench_requests_total{{model="mock-model",endpoint="{good.base_url}",outcome="ok"}} 2' in text
+        assert f'bench_requests_total{{model="mock-model",endpoint="{bad.base_url}",outcome="error"}} 1' in text
+        assert f'bench_requests_in_flight{{model="mock-model",endpoint="{good.base_url}"}} 0' in text
+        assert 'bench_iterations_total{model="mock-model",suite="suite",outcome="failed"} 1' in text
+        assert 'bench_score_percent_bucket{model="mock-model",suite="suite",le="90"} 1' in text
+        assert 'bench_decode_tokens_per_second_sum{model="mock-model",suite="suite"} 42' in text
+    finally:
+        for server in (bad, good):
+            server.shutdown()
+            server.server_close()
+    print("✅ Pool metrics")
+
+
+if __name__ == "__main__":
+    test_text_format()
+    test_pool_metrics()
+    print("✅ All tests passed!")
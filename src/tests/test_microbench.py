@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the harness microbenchmarks.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.microbench import (
+    BENCHMARKS, DEFAULT_BASELINE, MicroResult, compare, load_baseline, run_benchmarks, save_baseline
+)
+
+
+def test_benchmarks_run():
+    """Test that every benchmark sets up, checks its result and gets timed."""
+    results = run_benchmarks(min_time=0.001, repeat=2)
+    assert [r.name for r in results] == list(BENCHMARKS)
+    for r in results:
+        assert r.loops >= 1 and 0 < r.best_ns <= r.median_ns and r.reference_ns > 0
+    print(f"✅ {len(results)} benchmarks run")
+
+
+def test_baseline_in_repo():
+    """Test that the stored baseline covers every benchmark."""
+    baseline = load_baseline(DEFAULT_BASELINE)
+    assert sorted(baseline["results"]) == sorted(BENCHMARKS)
+    assert all(r["best_ns"] > 0 and r["reference_ns"] > 0 for r in baseline["results"].values())
+    print("✅ Stored baseline")
+
+
+def test_compare():
+    """Test saving, merging and flagging regressions relative to the reference loop."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "baseline.json"
+        save_baseline([MicroResult("a", 10, 100.0, 110.0, 50.0), MicroResult("b", 10, 100.0, 110.0, 50.0)], path)
+        save_baseline([MicroResult("b", 10, 200.0, 210.0, 50.0)], path)
+        baseline = load_baseline(path)
+        assert baseline["results"]["a"]["best_ns"] == 100.0
+        assert baseline["results"]["b"]["best_ns"] == 200.0
+
+        current = [
+            MicroResult("a", 10, 150.0, 150.0, 50.0),
+            # Twice as slow, but so was the reference loop: the machine, not the code
+            MicroResult("b", 10, 400.0, 400.0, 100.0),
+            MicroResult("c", 10, 10.0, 10.0, 50.0),
+        ]
+        comparisons = {c.name: c for c in compare(current, baseline)}
+        assert abs(comparisons["a"].change - 0.5) < 1e-9
+        assert comparisons["a"].status(0.25) == "REGRESSION"
+        assert comparisons["a"].status(0.6) == "ok"
+        assert abs(comparisons["b"].change) < 1e-9 and comparisons["b"].status(0.25) == "ok"
+        assert comparisons["c"].change is None and comparisons["c"].status(0.25) == "new"
+
+        path.write_text(json.dumps({"benchmarks": []}))
+        try:
+            load_baseline(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("files without results are rejected")
+    print("✅ Baseline comparison")
+
+
+if __name__ == "__main__":
+    test_benchmarks_run()
+    test_baseline_in_repo()
+    test_compare()
+    print("✅ All tests passed!")
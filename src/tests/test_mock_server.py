@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test script for the mock LM Studio server and the harness load test.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import requests
+
+from src.cli import run_iteration
+from src.llm_client import LMStudioClient
+from src.mock_server import MockConfig, correct_answer, serve_in_thread
+from src.prompts import PromptLayout, build_requests
+from src.suites import default_registry
+
+SUITE = default_registry().get()
+PROMPT_REQUESTS = build_requests(SUITE.prompt, PromptLayout.SINGLE)
+
+
+def test_client_modes():
+    """Test that plain and streamed completions return the suite's correct answers."""
+    server = serve_in_thread(MockConfig())
+    try:
+        with LMStudioClient(base_url=server.base_url) as client:
+            messages = PROMPT_REQUESTS[0].messages
+            expected = correct_answer(SUITE.answer_key.lines)
+
+            response = client.chat_completion(messages, model="mock-model")
+            assert response.choices[0].message.content == expected
+            assert response.usage.completion_tokens > 0 and response.usage.prompt_tokens > 0
+
+            with client.stream_chat_completion(messages, model="mock-model") as stream:
+                assert "".join(stream) == expected
+            assert stream.time_to_first_token is not None
+            assert stream.usage.completion_tokens == response.usage.completion_tokens
+        assert server.stats.completions == 2 and server.stats.errors == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Plain and streamed completions")
+
+
+def test_run_iteration():
+    """Test that a benchmark iteration against the mock scores 100%, streamed or not."""
+    server = serve_in_thread(MockConfig())
+    try:
+        with LMStudioClient(base_url=server.base_url) as client:
+            for stream in (False, True):
+                result = run_iteration(client, "mock-model", PROMPT_REQUESTS, SUITE.answer_key, 1, stream)
+                assert result.score == 100.0 and result.answer_lines == SUITE.answer_key.lines
+                assert result.error is None and result.elapsed > 0
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Iterations score 100% against the mock")
+
+
+def test_injected_errors():
+    """Test that injected server errors surface as RequestException with the status."""
+    server = serve_in_thread(MockConfig(error_rate=1.0, error_status=503))
+    try:
+        with LMStudioClient(base_url=server.base_url) as client:
+            try:
+                run_iteration(client, "mock-model", PROMPT_REQUESTS, SUITE.answer_key, 1)
+            except requests.RequestException as e:
+                assert e.response is not None and e.response.status_code == 503
+            else:
+                raise AssertionError("injected errors are raised")
+        assert server.stats.errors == 1 and server.stats.completions == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Injected errors")
+
+
+def test_loadtest_overhead_budget():
+    """Test that loadtest exits non-zero only when the overhead exceeds --max-overhead-ms."""
+    script = Path(__file__).resolve().parents[1] / "loadtest.py"
+    args = [sys.executable, str(script), "--requests", "5", "--concurrency", "1,2", "--json"]
+
+    within = subprocess.run(args + ["--max-overhead-ms", "10000"], capture_output=True, text=True)
+    assert within.returncode == 0, within.stderr
+    assert '"failures": 0' in within.stdout
+
+    over = subprocess.run(args + ["--max-overhead-ms", "0.0001"], capture_output=True, text=True)
+    assert over.returncode == 1 and "exceeds the limit" in over.stderr, over.stderr
+    print("✅ Load test overhead budget")
+
+
+if __name__ == "__main__":
+    test_client_modes()
+    test_run_iteration()
+    test_injected_errors()
+    test_loadtest_overhead_budget()
+    print("✅ All tests passed!")
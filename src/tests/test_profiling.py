@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for benchmark profiling.
+"""
+
+import json
+import pstats
+import sys
+import tempfile
+import threading
+import tracemalloc
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.profiling import EVALUATOR, profiled, span
+
+
+def work() -> int:
+    return sum(i * i for i in range(20000))
+
+
+def test_disabled():
+    """Test that spans cost nothing and record nothing without a profiler."""
+    with span("idle") as recorded:
+        work()
+    assert recorded is None
+    with profiled() as profiler:
+        assert profiler is None
+    print("✅ Disabled profiling")
+
+
+def test_trace_and_profiles():
+    """Test the Chrome trace, the evaluator CPU profile and the memory snapshot."""
+    with tempfile.TemporaryDirectory() as tmp:
+        trace_path, cpu_path, memory_path = (Path(tmp) / name for name in ("trace.json", "cpu.prof", "mem.snap"))
+        with profiled(trace_path, cpu_path, memory_path) as profiler:
+            def worker():
+                with span("iteration", model="m"):
+                    with span("score", EVALUATOR):
+                        with span("match", EVALUATOR):
+                            work()
+            threads = [threading.Thread(target=worker, name=f"worker-{i}") for i in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        trace = json.loads(trace_path.read_text())["traceEvents"]
+        spans = [e for e in trace if e["ph"] == "X"]
+        assert sorted(e["name"] for e in spans) == ["iteration"] * 3 + ["match"] * 3 + ["score"] * 3
+        assert {e["args"]["name"] for e in trace if e["ph"] == "M"} == {"worker-0", "worker-1", "worker-2"}
+        iteration = next(e for e in spans if e["name"] == "iteration")
+        assert iteration["args"] == {"model": "m"} and iteration["dur"] > 0
+        totals = {t["name"]: t["count"] for t in profiler.phase_totals()}
+        assert totals == {"iteration": 3, "score": 3, "match": 3}
+
+        functions = {name for _, _, name in pstats.Stats(str(cpu_path)).stats}
+        assert "work" in functions
+        assert tracemalloc.Snapshot.load(str(memory_path)).traces
+    assert not tracemalloc.is_tracing()
+    print("✅ Trace and profiles")
+
+
+if __name__ == "__main__":
+    test_disabled()
+    test_trace_and_profiles()
+    print("✅ All tests passed!")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test script for prompt layouts and per-question answers.
+"""
+
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.cli import FetchedResponse, combine_responses, extract_answer_lines
+from src.prompts import PromptLayout, build_requests, extract_question_answer
+from src.suites import default_registry
+
+
+def test_question_answer():
+    """Test the answer line of a per-question response."""
+    assert extract_question_answer("Thinking...\nQ2: draft\nQ2: 42", 2) == "Q2: 42"
+    assert extract_question_answer("<think>Q2: draft</think>\nThe answer is 42.\n", 2) == "Q2: The answer is 42."
+    assert extract_question_answer("", 2) == "Q2:"
+    print("✅ Per-question answer lines")
+
+
+def test_unprefixed_answer_keeps_alignment():
+    """Test that an answer without its "Qn:" prefix does not shift the later answers."""
+    suite = default_registry().get()
+    key = suite.answer_key
+    prompt_requests = build_requests(suite.prompt, PromptLayout.PER_QUESTION)
+    assert len(prompt_requests) == len(key)
+
+    parts = []
+    for request, gold in zip(prompt_requests, key.lines):
+        answer = gold.split(":", 1)[1].strip() if request.first_question == 3 else gold
+        parts.append(FetchedResponse(content=f"Let me check the documents.\n\n{answer}\n"))
+    combined = combine_responses(parts, prompt_requests)
+
+    answers = extract_answer_lines(combined.content, len(key))
+    assert answers == key.lines, answers
+    assert key.score_answers(answers, verbose=False) == [100.0] * len(key)
+    print("✅ Unprefixed per-question answer stays aligned")
+
+
+if __name__ == "__main__":
+    test_question_answer()
+    test_unprefixed_answer_keeps_alignment()
+    print("✅ All tests passed!")
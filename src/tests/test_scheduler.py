@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark scheduler.
+"""
+
+from src.scheduler import ModelRun, count_model_swaps, parse_model_spec, schedule_models
+
+def test_parse_model_spec():
+    """Test parsing NAME and NAME=N model specs."""
+    assert parse_model_spec("qwen/qwen3-1.7b", 3) == ModelRun("qwen/qwen3-1.7b", 3)
+    assert parse_model_spec("gemma-3-12b@q4_k_m=5", 3) == ModelRun("gemma-3-12b@q4_k_m", 5)
+    for bad in ("model=0", "model=x", "=4"):
+        try:
+            parse_model_spec(bad, 1)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} should be rejected")
+    print("✅ Model specs parsed")
+
+def test_schedule_groups_models():
+    """Test that repeated models are merged into a single batch."""
+    runs = [ModelRun("a", 2), ModelRun("b", 1), ModelRun("a", 3), ModelRun("c", 1), ModelRun("b", 1)]
+    batches = schedule_models(runs)
+    assert batches == [ModelRun("a", 5), ModelRun("b", 2), ModelRun("c", 1)]
+    assert count_model_swaps([r.model for r in runs]) == 5
+    assert count_model_swaps([b.model for b in batches]) == 3
+    # The input runs are left untouched
+    assert runs[0] == ModelRun("a", 2)
+    print(f"✅ Scheduled batches: {batches}")
+
+def test_schedule_loaded_model_first():
+    """Test that the already loaded model runs first."""
+    batches = schedule_models([ModelRun("a", 1), ModelRun("b", 1)], loaded_model="b")
+    assert [b.model for b in batches] == ["b", "a"]
+    assert count_model_swaps(["b", "a"], loaded_model="b") == 1
+    print("✅ Loaded model scheduled first")
+
+if __name__ == "__main__":
+    print("Testing benchmark scheduler...")
+    print("=" * 50)
+    
+    test_parse_model_spec()
+    test_schedule_groups_models()
+    test_schedule_loaded_model_first()
+    
+    print("=" * 50)
+    print("✅ All tests passed!")
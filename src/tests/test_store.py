@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the results store.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.store import ResultsStore, StoreFilter
+from src.telemetry import RequestMetrics
+
+
+def make_store(directory: str) -> ResultsStore:
+    return ResultsStore(Path(directory) / "results.db")
+
+
+def test_runs_and_summaries():
+    """Test storing iterations and aggregating them per model."""
+    with tempfile.TemporaryDirectory() as tmp, make_store(tmp) as store:
+        run_id = store.start_run("abc123", "single", {"sampling": {"temperature": 0.1}})
+        metrics = RequestMetrics(model="m1", iteration=1, timestamp=1.0, latency=2.0, score=75.0)
+        store.add_iteration(run_id, "m1", 1, "Q1: a\nQ2: b", ["Q1: a", "Q2: b"], [100.0, 50.0], metrics)
+        store.add_iteration(run_id, "m1", 2, "Q1: a\nQ2: x", ["Q1: a", "Q2: x"], [100.0, 0.0])
+        store.add_iteration(run_id, "m2", 1, error="read timed out")
+        store.finish_run(run_id)
+
+        summaries = store.model_summaries()
+        assert [s.model for s in summaries] == ["m1"]
+        assert summaries[0].iterations == 2
+        assert summaries[0].mean_score == 62.5
+        assert summaries[0].mean_latency == 2.0
+
+        runs = store.runs()
+        assert len(runs) == 1 and runs[0].id == run_id
+        assert runs[0].models == ["m1", "m2"]
+        assert runs[0].iterations == 3 and runs[0].failed == 1
+        assert runs[0].finished is not None
+    print("✅ Runs and per-model summaries")
+
+
+def test_question_accuracy_and_filters():
+    """Test per-question accuracy, replacing an iteration and query filters."""
+    with tempfile.TemporaryDirectory() as tmp, make_store(tmp) as store:
+        first = store.start_run("aaaa", "single", {})
+        second = store.start_run("bbbb", "split", {})
+        store.add_iteration(first, "m1", 1, "", ["Q1: a", "Q2: b"], [100.0, 0.0])
+        # Replaces the scores of the earlier call
+        store.add_iteration(first, "m1", 1, "", ["Q1: a", "Q2: b"], [100.0, 100.0])
+        store.add_iteration(second, "m2", 1, "", ["Q1: x", "Q2: b"], [0.0, 100.0])
+
+        accuracy = store.question_accuracy()
+        assert [(a.question, a.correct, a.evaluated) for a in accuracy] == [("Q1", 1, 2), ("Q2", 2, 2)]
+
+        assert [s.model for s in store.model_summaries(StoreFilter(prompt_hash="bb"))] == ["m2"]
+        assert [s.model for s in store.model_summaries(StoreFilter(run_id=first))] == ["m1"]
+        assert [s.model for s in store.model_summaries(StoreFilter(models=["m2"]))] == ["m2"]
+        assert store.model_summaries(StoreFilter(since=4102444800.0)) == []
+
+        third = store.start_run("cccc", "single", {}, suite="other")
+        store.add_iteration(third, "m1", 1, "", ["Q1: a"], [100.0])
+        assert [s.suite for s in store.model_summaries(StoreFilter(models=["m1"]))] == [None, "other"]
+        assert [s.iterations for s in store.model_summaries(StoreFilter(suites=["other"]))] == [1]
+    print("✅ Per-question accuracy and filters")
+
+
+def test_load_iterations():
+    """Test reading back a run's iterations for a resume."""
+    with tempfile.TemporaryDirectory() as tmp, make_store(tmp) as store:
+        run_id = store.start_run("abc123", "single", {"models": {"m1": 3}})
+        metrics = RequestMetrics(
+            model="m1", iteration=2, timestamp=1.0, latency=3.0, score=50.0, stopped_early=True, truncated=True
+        )
+        store.add_iteration(run_id, "m1", 2, "Q1: a\nQ2: x", ["Q1: a", "Q2: x"], [100.0, 0.0], metrics)
+        store.add_iteration(run_id, "m1", 1, error="read timed out")
+
+        done = store.load_iterations(run_id)
+        assert [(i.model, i.iteration) for i in done] == [("m1", 2)]
+        assert done[0].answer_lines == ["Q1: a", "Q2: x"] and done[0].scores == [100.0, 0.0]
+        assert done[0].metrics.latency == 3.0 and done[0].metrics.stopped_early
+        assert done[0].metrics.truncated
+        assert done[0].response == "Q1: a\nQ2: x"
+
+        everything = store.load_iterations(run_id, include_failed=True)
+        assert [(i.iteration, i.error) for i in everything] == [(1, "read timed out"), (2, None)]
+        assert store.get_run(run_id).params == {"models": {"m1": 3}}
+        assert store.get_run("missing") is None
+    print("✅ Iterations restored for resume")
+
+
+if __name__ == "__main__":
+    test_runs_and_summaries()
+    test_question_accuracy_and_filters()
+    test_load_iterations()
+    print("✅ All tests passed!")
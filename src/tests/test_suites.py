@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test script for the test suite registry.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.prompts import PromptLayout, build_requests
+from src.suites import DEFAULT_SUITE, SuiteRegistry
+
+
+def write_suite(directory: Path, name: str, answers: str) -> None:
+    path = directory / name
+    path.mkdir()
+    (path / "prompt.md").write_text("Docs.\n\n### Questions\n\nQ1: One?\nQ2: Two?\n", encoding="utf-8")
+    (path / "answers.txt").write_text(answers, encoding="utf-8")
+
+
+def test_default_suite():
+    """Test that the bundled suite loads and its prompt splits into questions."""
+    suite = SuiteRegistry().get()
+    assert suite.name == DEFAULT_SUITE
+    assert len(suite.answer_key) == 16
+    assert suite.answer_key.questions[0] == "Q1"
+    request = build_requests(suite.prompt, PromptLayout.SPLIT)[0]
+    assert request.question_count == len(suite.answer_key)
+    print(f"✅ Default suite: {suite.title}")
+
+
+def test_registry_lookup():
+    """Test discovery, lazy loading, precedence and validation."""
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = Path(tmp) / "first", Path(tmp) / "second"
+        first.mkdir()
+        second.mkdir()
+        write_suite(first, "alpha", "Q1: a\nQ2: b\n")
+        write_suite(second, "alpha", "Q1: x\nQ2: y\n")
+        write_suite(second, "broken", "Q1: a\nQ3: c\n")
+        (second / "not-a-suite").mkdir()
+
+        registry = SuiteRegistry([first, second])
+        assert registry.names() == ["alpha", "broken"]
+        alpha = registry.get("alpha")
+        assert registry.get("alpha") is alpha
+        assert alpha.answer_key.lines == ["Q1: a", "Q2: b"]
+        assert alpha.answer_key is alpha.answer_key
+        assert alpha.title == "alpha"
+        assert [s.name for s in registry.resolve("alpha, broken,alpha")] == ["alpha", "broken"]
+
+        for bad in ("missing", "alpha,missing"):
+            try:
+                registry.resolve(bad)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{bad} should be rejected")
+        try:
+            registry.get("broken").answer_key
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("answers out of order should be rejected")
+    print("✅ Registry lookup")
+
+
+if __name__ == "__main__":
+    test_default_suite()
+    test_registry_lookup()
+    print("✅ All tests passed!")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for sampling parameter sweeps.
+"""
+
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.sweep import SweepPoint, parse_max_tokens, sweep_grid
+
+
+def test_parse_max_tokens():
+    """Test max_tokens grid values."""
+    assert parse_max_tokens("auto") is None
+    assert parse_max_tokens("0") == 0
+    assert parse_max_tokens("2048") == 2048
+    for value in ["-1", "lots", ""]:
+        try:
+            parse_max_tokens(value)
+        except ValueError:
+            continue
+        raise AssertionError(f"{value!r} should be rejected")
+    print("✅ max_tokens values")
+
+
+def test_grid():
+    """Test every combination in order, without repeats, and range checks."""
+    points = sweep_grid([0.0, 0.7, 0.0], [1.0, 0.9], [None, 512])
+    assert len(points) == 8
+    assert points[0] == SweepPoint(0.0, 1.0, None)
+    assert points[1] == SweepPoint(0.0, 1.0, 512)
+    assert points[-1] == SweepPoint(0.7, 0.9, 512)
+    assert points[1].label == "temperature=0 top_p=1 max_tokens=512"
+    assert SweepPoint(0.1, 1.0, 0).label.endswith("max_tokens=none")
+    for temperatures, top_ps in [([2.5], [1.0]), ([0.1], [0.0]), ([0.1], [1.5])]:
+        try:
+            sweep_grid(temperatures, top_ps, [None])
+        except ValueError:
+            continue
+        raise AssertionError(f"{temperatures} {top_ps} should be rejected")
+    print("✅ Sweep grid")
+
+
+if __name__ == "__main__":
+    test_parse_max_tokens()
+    test_grid()
+    print("✅ All tests passed!")
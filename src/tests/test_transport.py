@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the HTTP transports and lazy imports.
+"""
+
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules in src/ import each other by their flat names
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import requests
+
+from src.llm_client import LMStudioClient, Message, Role
+from src.mock_server import MockConfig, serve_in_thread
+from src.transport import HTTPClientTransport, RequestsTransport, Transport, create_transport
+
+MESSAGES = [Message(role=Role.USER, content="Reply with OK.")]
+
+
+def test_auto_selection():
+    """Test that auto picks http.client only for plain HTTP to this machine."""
+    assert isinstance(create_transport("auto", "http://localhost:1234/v1", {}), HTTPClientTransport)
+    assert isinstance(create_transport("auto", "http://127.0.0.1:1234/v1", {}), HTTPClientTransport)
+    assert isinstance(create_transport("auto", "https://localhost:1234/v1", {}), RequestsTransport)
+    assert isinstance(create_transport("auto", "http://gpu2:1234/v1", {}), RequestsTransport)
+    try:
+        create_transport("curl", "http://localhost:1234/v1", {})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown transports are rejected")
+    print("✅ Transport selection")
+
+
+def test_abstract_request():
+    """Test that a transport without request() fails when created, not on its first request."""
+    class Incomplete(Transport):
+        pass
+
+    try:
+        Incomplete({})
+    except TypeError as e:
+        assert "request" in str(e)
+    else:
+        raise AssertionError("transports must implement request()")
+    print("✅ Transport.request is abstract")
+
+
+def test_transports():
+    """Test completions, streams, model listing and errors over both transports."""
+    good = serve_in_thread(MockConfig(answer="Q1: OK\n"))
+    bad = serve_in_thread(MockConfig(error_rate=1.0, error_status=400))
+    truncated = serve_in_thread(MockConfig(answer="Q1: OK\n", stream_cutoff=1))
+    try:
+        for name in ("http.client", "requests"):
+            with LMStudioClient(base_url=good.base_url, transport=name) as client:
+                assert [m.id for m in client.get_models().data] == ["mock-model"]
+                for _ in range(3):
+                    response = client.chat_completion(MESSAGES, model="mock-model")
+                    assert response.choices[0].message.content == "Q1: OK\n"
+                with client.stream_chat_completion(MESSAGES, model="mock-model") as stream:
+                    assert "".join(stream) == "Q1: OK\n"
+                assert stream.usage is not None
+                # Stopping a stream early must not break the next request
+                with client.stream_chat_completion(MESSAGES, model="mock-model") as stream:
+                    next(iter(stream))
+                assert client.chat_completion(MESSAGES, model="mock-model", stream=True).usage is not None
+
+            with LMStudioClient(base_url=bad.base_url, transport=name) as client:
+                try:
+                    client.chat_completion(MESSAGES, model="mock-model")
+                except requests.RequestException as e:
+                    assert e.response is not None and e.response.status_code == 400
+                else:
+                    raise AssertionError("errors are raised")
+            with LMStudioClient(base_url=truncated.base_url, transport=name) as client:
+                received = []
+                try:
+                    for delta in client.stream_chat_completion(MESSAGES, model="mock-model"):
+                        received.append(delta)
+                except requests.RequestException as e:
+                    assert e.response is None
+                else:
+                    raise AssertionError("a stream cut off mid-body is an error")
+                assert "".join(received) == "Q1:"
+            print(f"✅ {name} transport")
+    finally:
+        for server in (good, bad, truncated):
+            server.shutdown()
+            server.server_close()
+
+
+def test_keep_alive():
+    """Test that http.client connections are reused, and replaced once the server closes them."""
+    server = serve_in_thread(MockConfig(answer="OK"))
+    try:
+        with LMStudioClient(base_url=server.base_url, transport="http.client") as client:
+            client.chat_completion(MESSAGES)
+            (connection,) = client.transport._idle[("http", "127.0.0.1", server.server_address[1])]
+            client.chat_completion(MESSAGES)
+            client.simple_chat("Reply with OK.")
+            assert client.transport._idle[("http", "127.0.0.1", server.server_address[1])] == [connection]
+
+            connection.sock.shutdown(socket.SHUT_RDWR)
+            assert client.chat_completion(MESSAGES).choices[0].message.content == "OK"
+            (replacement,) = client.transport._idle[("http", "127.0.0.1", server.server_address[1])]
+            assert replacement is not connection
+        try:
+            LMStudioClient(base_url="http://127.0.0.1:9/v1", transport="http.client").get_models()
+        except requests.RequestException as e:
+            assert e.response is None
+        else:
+            raise AssertionError("unreachable servers raise RequestException")
+    finally:
+        server.shutdown()
+        server.server_close()
+    print("✅ Keep-alive connections")
+
+
+def test_lazy_startup():
+    """Test that loading the CLI does not import requests, the profilers, bulk scoring or any server or pool modules."""
+    src = Path(__file__).resolve().parents[1]
+    heavy = (
+        'requests', 'cProfile', 'pstats', 'tracemalloc', 'sqlite3', 'http.server', 'http.client',
+        'multiprocessing', 'ssl', 'metrics', 'coordinator', 'bulk', 'csv'
+    )
+    code = (
+        f"import sys; sys.path.insert(0, {str(src)!r}); import cli; "
+        f"print(sorted(m for m in {heavy!r} if m in sys.modules))"
+    )
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert loaded.strip() == "[]", loaded
+    print("✅ Lazy startup imports")
+
+
+if __name__ == "__main__":
+    test_auto_selection()
+    test_abstract_request()
+    test_transports()
+    test_keep_alive()
+    test_lazy_startup()
+    print("✅ All tests passed!")
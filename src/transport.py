@@ -0,0 +1,306 @@
+"""
+HTTP Transports
+
+The layer under LMStudioClient that sends requests and hands back responses.
+Two implementations:
+
+- RequestsTransport: a pooled requests Session. Honours proxy settings and
+  works with any server.
+- HTTPClientTransport: keep-alive connections from the standard library's
+  http.client. It skips importing requests (about 100ms of startup), and
+  sends each request with less Python work. It ignores proxy settings, so by
+  default it is only used for plain-HTTP servers on this machine.
+
+Both return responses with the subset of requests.Response the clients use
+(ok, status_code, reason, text, json(), iter_lines(), raise_for_status(),
+close()) and raise requests.RequestException, with .response set when the
+server answered. requests is loaded only when such an error is raised.
+"""
+
+import json
+import select
+import socket
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from lazy import lazy_import
+
+http_client = lazy_import("http.client")
+requests = lazy_import("requests")
+
+AUTO = "auto"
+REQUESTS = "requests"
+HTTP_CLIENT = "http.client"
+TRANSPORTS = (AUTO, REQUESTS, HTTP_CLIENT)
+
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+class Transport(ABC):
+    """Sends HTTP requests to API servers, reusing connections."""
+
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        timeout: Optional[float] = None,
+        stream: bool = False
+    ) -> Any:
+        """
+        Send a request.
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            body: Request body, sent with the transport's headers
+            timeout: Seconds to wait to connect and for each read
+            stream: Return once the headers arrive and leave the body to
+                response.iter_lines(); otherwise the body is read first
+
+        Returns:
+            The response; close it when done with a streamed one
+
+        Raises:
+            requests.RequestException: If the server cannot be reached or
+                the connection fails
+        """
+
+    def close(self) -> None:
+        """Close pooled connections."""
+
+
+class RequestsTransport(Transport):
+    """Transport over a requests Session."""
+
+    def __init__(self, headers: Dict[str, str], pool_size: int = 10):
+        super().__init__(headers)
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(headers)
+
+    def request(self, method, url, body=None, timeout=None, stream=False):
+        return self.session.request(method, url, data=body, timeout=timeout, stream=stream)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _connection_error(error: Exception) -> Exception:
+    """The requests exception for a connection-level failure."""
+    if isinstance(error, TimeoutError):
+        return requests.Timeout(str(error) or "timed out")
+    return requests.ConnectionError(str(error) or type(error).__name__)
+
+
+class HTTPClientResponse:
+    """A response from HTTPClientTransport, read whole or streamed by lines."""
+
+    def __init__(self, transport: "HTTPClientTransport", key: Tuple[str, str, int], connection: Any, raw: Any, url: str):
+        self.url = url
+        self.status_code: int = raw.status
+        self.reason: str = raw.reason
+        self.headers = raw.headers
+        self._transport = transport
+        self._key = key
+        self._connection = connection
+        self._raw = raw
+        self._content: Optional[bytes] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def content(self) -> bytes:
+        """The rest of the body, read on first use."""
+        if self._content is None:
+            try:
+                self._content = self._raw.read()
+            except (OSError, http_client.HTTPException) as e:
+                self._drop()
+                raise _connection_error(e)
+            self._release()
+        return self._content
+
+    @property
+    def text(self) -> str:
+        charset = self._raw.headers.get_content_charset() or "utf-8"
+        return self.content.decode(charset, errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def iter_lines(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the body line by line, without line endings, as it arrives."""
+        try:
+            while True:
+                line = self._raw.readline()
+                if not line:
+                    break
+                yield line.rstrip(b"\r\n")
+        except (OSError, http_client.HTTPException) as e:
+            self._drop()
+            raise _connection_error(e)
+        # readline() returns b"" when the connection drops mid-body instead
+        # of raising IncompleteRead as read() does
+        if not self._complete():
+            self._drop()
+            raise _connection_error(http_client.IncompleteRead(b""))
+        self._content = b""
+        self._release()
+
+    def _complete(self) -> bool:
+        """Whether the whole body was read: the last chunk, or Content-Length bytes."""
+        if self._raw.chunked:
+            return self._raw.chunk_left is None
+        return not self._raw.length
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} {self.reason} for url: {self.url}", response=self)
+
+    def close(self) -> None:
+        """Give the connection back if the body was read, otherwise drop it."""
+        if self._connection is None:
+            return
+        if self._raw.isclosed():
+            self._release()
+        else:
+            # Unread body, e.g. a stream stopped early: closing the
+            # connection is what tells the server to stop generating
+            self._drop()
+
+    def _release(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._transport._release(self._key, connection, reusable=not self._raw.will_close)
+
+    def _drop(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            self._raw.close()
+            connection.close()
+
+
+class HTTPClientTransport(Transport):
+    """
+    Transport over http.client keep-alive connections.
+
+    Idle connections are kept per host, at most pool_size of them; threads
+    take one for each request, so any number of threads can share the
+    transport. A connection goes back once its response body is read.
+    """
+
+    def __init__(self, headers: Dict[str, str], pool_size: int = 10):
+        super().__init__(headers)
+        self.pool_size = pool_size
+        self._idle: Dict[Tuple[str, str, int], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, key: Tuple[str, str, int], timeout: Optional[float]) -> Tuple[Any, bool]:
+        """An idle connection to the host, or a new one; and whether it is reused."""
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                connection = idle.pop()
+                # A readable idle socket has been closed by the server
+                if connection.sock is not None and not select.select([connection.sock], [], [], 0)[0]:
+                    connection.timeout = timeout
+                    connection.sock.settimeout(timeout)
+                    return connection, True
+                connection.close()
+        scheme, host, port = key
+        connection_class = http_client.HTTPSConnection if scheme == "https" else http_client.HTTPConnection
+        return connection_class(host, port, timeout=timeout), False
+
+    def _release(self, key: Tuple[str, str, int], connection: Any, reusable: bool = True) -> None:
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.pool_size:
+                    idle.append(connection)
+                    return
+        connection.close()
+
+    def request(self, method, url, body=None, timeout=None, stream=False):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise requests.exceptions.InvalidURL(f"Invalid URL: {url!r}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        while True:
+            connection, reused = self._acquire(key, timeout)
+            try:
+                if not reused:
+                    connection.connect()
+                    # http.client writes the headers and a large body
+                    # separately; without this, Nagle's algorithm and
+                    # delayed ACKs hold the body back ~40ms
+                    connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                connection.request(method, path, body=body, headers=self.headers)
+                raw = connection.getresponse()
+                break
+            except (ConnectionResetError, BrokenPipeError, http_client.RemoteDisconnected) as e:
+                connection.close()
+                # The server closed a kept-alive connection before reading
+                # the request: send it again on a fresh one
+                if not reused:
+                    raise _connection_error(e)
+            except (OSError, http_client.HTTPException) as e:
+                connection.close()
+                raise _connection_error(e)
+        response = HTTPClientResponse(self, key, connection, raw, url)
+        if not stream:
+            # Read the body now, which frees the connection
+            response.content
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+def is_local_http(url: str) -> bool:
+    """Whether the URL is plain HTTP to this machine."""
+    parts = urlsplit(url)
+    return parts.scheme == "http" and parts.hostname in LOOPBACK_HOSTS
+
+
+def create_transport(name: str, base_url: str, headers: Dict[str, str], pool_size: int = 10) -> Transport:
+    """
+    Create the transport for a client.
+
+    Args:
+        name: "requests", "http.client", or "auto" for http.client with
+            plain-HTTP servers on this machine and requests otherwise
+        base_url: Base URL of the server the client talks to
+        headers: Headers sent with every request
+        pool_size: Most idle connections kept open per server
+
+    Returns:
+        The transport
+
+    Raises:
+        ValueError: If the name is not a known transport
+    """
+    if name == AUTO:
+        name = HTTP_CLIENT if is_local_http(base_url) else REQUESTS
+    if name == HTTP_CLIENT:
+        return HTTPClientTransport(headers, pool_size=pool_size)
+    if name == REQUESTS:
+        return RequestsTransport(headers, pool_size=pool_size)
+    raise ValueError(f"Unknown transport {name!r}, expected one of: {', '.join(TRANSPORTS)}")